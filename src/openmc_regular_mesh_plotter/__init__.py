@@ -12,3 +12,11 @@ except PackageNotFoundError:
 __all__ = ["__version__"]
 
 from .core import *
+from .interactive import *
+from .export import *
+from .render import *
+from .aio import *
+from .statepoints import *
+from .live import *
+from .histogram import *
+from .tiles import *
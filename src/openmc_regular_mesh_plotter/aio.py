@@ -0,0 +1,236 @@
+import asyncio
+import functools
+import typing
+from tempfile import TemporaryDirectory
+
+import openmc.checkvalue as cv
+
+from .core import (
+    _BASES,
+    _default_outline_kwargs,
+    _get_extent,
+    _get_mesh,
+    _get_outline_model,
+    _get_outline_pixels,
+    _get_outline_plot,
+    _get_slice_window,
+    _plot_outline,
+    _read_outline_images,
+    plot_mesh_tally,
+)
+
+__all__ = ["aplot_mesh_tally", "aplot_mesh_tallies"]
+
+
+async def aplot_mesh_tally(
+    tally: typing.Union["openmc.Tally", typing.Sequence["openmc.Tally"]],
+    basis: str = "xy",
+    slice_index: typing.Optional[int] = None,
+    axis_units: str = "cm",
+    outline: bool = False,
+    outline_by: str = "cell",
+    geometry: typing.Optional["openmc.Geometry"] = None,
+    pixels: typing.Union[int, str] = 40000,
+    max_pixels: int = 1000000,
+    outline_kwargs: dict = _default_outline_kwargs,
+    region: typing.Optional[typing.Sequence[float]] = None,
+    index_range: typing.Optional[typing.Sequence[typing.Sequence[int]]] = None,
+    outline_method: str = "raster",
+    semaphore: typing.Optional[asyncio.Semaphore] = None,
+    openmc_exec: str = "openmc",
+    **kwargs,
+) -> "matplotlib.axes.Axes":
+    """Asynchronous version of :func:`plot_mesh_tally`.
+
+    The geometry outline is rasterised by an OpenMC subprocess started with
+    asyncio while the tally data is extracted and plotted in the event loop's
+    default executor, so neither blocks the event loop. Figures are created
+    without pyplot, unless use_pyplot or axes are passed, so that they are
+    safe to make in the executor threads.
+    Parameters
+    ----------
+    tally : openmc.Tally
+        The openmc tally to plot. Tally must contain a MeshFilter that uses a RegularMesh.
+    basis : {'xy', 'xz', 'yz'}
+        The basis directions for the plot
+    slice_index : int
+        The mesh index to plot
+    axis_units : {'km', 'm', 'cm', 'mm'}
+        Units used on the plot axis
+    outline : True
+        If set then an outline will be added to the plot. The outline can be
+        by cell or by material.
+    outline_by : {'cell', 'material'}
+        Indicate whether the plot should be colored by cell or by material
+    geometry : openmc.Geometry
+        The geometry to use for the outline.
+    pixels : int or 'auto'
+        This sets the total number of pixels in the outline, see
+        :func:`plot_mesh_tally`. With 'auto' the outline can only start once
+        the axes exist so it does not overlap with the data extraction.
+    max_pixels : int
+        The largest total number of outline pixels used when pixels is 'auto'.
+    outline_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.pyplot.contour`. Defaults
+        to "colors": "black", "linestyles": "solid", "linewidths": 1
+    region : tuple of floats
+        The (xmin, xmax, ymin, ymax) window to plot in the axis_units.
+    index_range : tuple of tuples of ints
+        The ((i0, i1), (j0, j1), (k0, k1)) block of mesh voxels to plot, see
+        :func:`plot_mesh_tally`. The outline covers the same window of the
+        block as the data.
+    outline_method : {'raster', 'vector'}
+        Whether the outline is rasterised by an OpenMC subprocess or drawn as
+        vector paths, see :func:`plot_mesh_tally`. The vector outline needs
+        no subprocess so it is drawn along with the data in the executor.
+    semaphore : asyncio.Semaphore
+        Limits the number of plots that are made at the same time.
+    openmc_exec : str
+        The OpenMC executable used to rasterise the outline.
+    **kwargs
+        Keyword arguments passed to :func:`plot_mesh_tally`.
+    Returns
+    -------
+    matplotlib.axes.Axes
+        The axes of the plot
+    """
+
+    if semaphore is not None:
+        async with semaphore:
+            return await aplot_mesh_tally(
+                tally,
+                basis=basis,
+                slice_index=slice_index,
+                axis_units=axis_units,
+                outline=outline,
+                outline_by=outline_by,
+                geometry=geometry,
+                pixels=pixels,
+                max_pixels=max_pixels,
+                outline_kwargs=outline_kwargs,
+                region=region,
+                index_range=index_range,
+                outline_method=outline_method,
+                openmc_exec=openmc_exec,
+                **kwargs,
+            )
+
+    cv.check_value("basis", basis, _BASES)
+    cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
+    cv.check_type("outline", outline, bool)
+    cv.check_value("outline_method", outline_method, ["raster", "vector"])
+    if "axes" not in kwargs:
+        kwargs.setdefault("use_pyplot", False)
+
+    loop = asyncio.get_running_loop()
+
+    mesh = _get_mesh(tally)
+    slice_index, window = _get_slice_window(
+        mesh, basis, slice_index, axis_units, region, index_range
+    )
+
+    # a raster outline is added once both the data plot and the raster are
+    # ready while a vector outline is drawn with the data
+    vector_outline = outline and outline_method == "vector"
+    plot_task = loop.run_in_executor(
+        None,
+        functools.partial(
+            plot_mesh_tally,
+            tally,
+            basis=basis,
+            slice_index=slice_index,
+            axis_units=axis_units,
+            outline=vector_outline,
+            outline_by=outline_by,
+            geometry=geometry,
+            pixels=pixels,
+            max_pixels=max_pixels,
+            outline_kwargs=outline_kwargs,
+            region=region,
+            index_range=index_range,
+            outline_method=outline_method,
+            **kwargs,
+        ),
+    )
+
+    if not outline or geometry is None or vector_outline:
+        return await plot_task
+
+    if pixels == "auto":
+        axes = await plot_task
+        pixels = _get_outline_pixels(axes, pixels, max_pixels)
+        plot = _get_outline_plot(mesh, basis, slice_index, pixels, outline_by, window)
+        image_value = (await _aget_outline_images(geometry, [plot], openmc_exec))[0]
+    else:
+        plot = _get_outline_plot(mesh, basis, slice_index, pixels, outline_by, window)
+        axes, image_values = await asyncio.gather(
+            plot_task, _aget_outline_images(geometry, [plot], openmc_exec)
+        )
+        image_value = image_values[0]
+
+    await loop.run_in_executor(
+        None,
+        _plot_outline,
+        axes,
+        image_value,
+        _get_extent(mesh, basis, axis_units, window),
+        outline_kwargs,
+    )
+    return axes
+
+
+async def aplot_mesh_tallies(
+    tallies: typing.Sequence["openmc.Tally"],
+    max_concurrent: int = 4,
+    **kwargs,
+) -> typing.List["matplotlib.axes.Axes"]:
+    """Plots each of the tallies with :func:`aplot_mesh_tally`, with at most
+    max_concurrent plots being made at the same time.
+    Parameters
+    ----------
+    tallies : sequence of openmc.Tally
+        The openmc tallies to plot, one plot is made for each tally.
+    max_concurrent : int
+        The largest number of plots that are made at the same time.
+    **kwargs
+        Keyword arguments passed to :func:`aplot_mesh_tally`.
+    Returns
+    -------
+    list of matplotlib.axes.Axes
+        The axes of the plots in the same order as the tallies
+    """
+
+    cv.check_greater_than("max_concurrent", max_concurrent, 0)
+    semaphore = asyncio.Semaphore(max_concurrent)
+    return await asyncio.gather(
+        *(aplot_mesh_tally(tally, semaphore=semaphore, **kwargs) for tally in tallies)
+    )
+
+
+async def _aget_outline_images(geometry, plots, openmc_exec="openmc"):
+    """Asynchronous version of _get_outline_images that runs OpenMC in
+    geometry plotting mode as an asyncio subprocess. Writing the XML files and
+    reading the images block, so they are run in the default executor."""
+
+    loop = asyncio.get_running_loop()
+    model = _get_outline_model(geometry, plots)
+
+    with TemporaryDirectory() as tmpdir:
+        await loop.run_in_executor(None, model.export_to_xml, tmpdir)
+
+        process = await asyncio.create_subprocess_exec(
+            openmc_exec,
+            "-p",
+            cwd=tmpdir,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            msg = (
+                f"OpenMC geometry plotting failed with return code "
+                f"{process.returncode}: {stderr.decode()}"
+            )
+            raise RuntimeError(msg)
+
+        return await loop.run_in_executor(None, _read_outline_images, tmpdir, plots)
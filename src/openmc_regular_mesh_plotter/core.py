@@ -1,4 +1,5 @@
 import math
+import os
 from pathlib import Path
 from tempfile import TemporaryDirectory
 import typing
@@ -6,7 +7,6 @@ import openmc
 import numpy as np
 import openmc
 import openmc.checkvalue as cv
-import matplotlib.pyplot as plt
 
 from packaging import version
 
@@ -19,8 +19,23 @@ if version.parse(openmc.__version__) < version.parse("0.13.3"):
 
 _BASES = ["xy", "xz", "yz"]
 
+# the indices of the horizontal and vertical axes of each basis
+_BASIS_AXES = {"xy": (0, 1), "xz": (0, 2), "yz": (1, 2)}
+
+_AXIS_SCALING_FACTORS = {"km": 0.00001, "m": 0.01, "cm": 1, "mm": 10}
+
 _default_outline_kwargs = {"colors": "black", "linestyles": "solid", "linewidths": 1}
 
+_default_hatch_kwargs = {"hatches": ["////"], "colors": "none"}
+
+_default_value_contour_kwargs = {
+    "colors": "white",
+    "linestyles": "solid",
+    "linewidths": 1,
+}
+
+_default_underlay_kwargs = {"alpha": 0.4}
+
 
 def _squeeze_end_of_array(array, dims_required=3):
     while len(array.shape) > dims_required:
@@ -39,12 +54,28 @@ def plot_mesh_tally(
     outline: bool = False,
     outline_by: str = "cell",
     geometry: typing.Optional["openmc.Geometry"] = None,
-    pixels: int = 40000,
+    pixels: typing.Union[int, str] = 40000,
     colorbar: bool = True,
     volume_normalization: bool = True,
     scaling_factor: typing.Optional[float] = None,
     colorbar_kwargs: dict = {},
     outline_kwargs: dict = _default_outline_kwargs,
+    rel_err_threshold: typing.Optional[float] = None,
+    rel_err_style: str = "mask",
+    hatch_kwargs: dict = _default_hatch_kwargs,
+    max_pixels: int = 1000000,
+    region: typing.Optional[typing.Sequence[float]] = None,
+    use_pyplot: bool = True,
+    sparse: bool = False,
+    mask: typing.Optional[typing.Union[str, typing.Sequence[int]]] = None,
+    outline_method: str = "raster",
+    index_range: typing.Optional[typing.Sequence[typing.Sequence[int]]] = None,
+    value_contours: typing.Optional[typing.Union[int, typing.Sequence[float]]] = None,
+    value_contour_kwargs: dict = _default_value_contour_kwargs,
+    value_contours_path: typing.Optional[typing.Union[str, Path]] = None,
+    underlay: typing.Optional[str] = None,
+    underlay_colors: typing.Optional[dict] = None,
+    underlay_kwargs: dict = _default_underlay_kwargs,
     **kwargs,
 ) -> "matplotlib.image.AxesImage":
     """Display a slice plot of the mesh tally score.
@@ -72,10 +103,12 @@ def plot_mesh_tally(
         Indicate whether the plot should be colored by cell or by material
     geometry : openmc.Geometry
         The geometry to use for the outline.
-    pixels : int
+    pixels : int or 'auto'
         This sets the total number of pixels in the plot and the number of
         pixels in each basis direction is calculated from this total and
-        the image aspect ratio.
+        the image aspect ratio. If set to 'auto' then the total matches the
+        number of screen pixels covered by the axes at the figure dpi,
+        limited to max_pixels.
     colorbar : bool
         Whether or not to add a colorbar to the plot.
     volume_normalization : bool, optional
@@ -87,6 +120,76 @@ def plot_mesh_tally(
     outline_kwargs : dict
         Keyword arguments passed to :func:`matplotlib.pyplot.contour`. Defaults
         to "colors": "black", "linestyles": "solid", "linewidths": 1
+    rel_err_threshold : float
+        If set then the mean and std_dev are extracted together and voxels
+        with a relative error above this threshold (or with a zero mean) are
+        masked or hatched on the plotted image.
+    rel_err_style : {'mask', 'hatch'}
+        Whether voxels above the rel_err_threshold are masked out of the image
+        or hatched over the top of the image.
+    hatch_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.pyplot.contourf` when
+        rel_err_style is 'hatch'. Defaults to "hatches": ["////"], "colors": "none"
+    max_pixels : int
+        The largest total number of outline pixels used when pixels is 'auto'.
+    region : tuple of floats
+        The (xmin, xmax, ymin, ymax) window to plot in the axis_units. Only
+        the mesh voxels covering the window are extracted and the outline
+        is rasterised over the window alone.
+    use_pyplot : bool
+        Whether a new figure is created with pyplot, when axes is not given,
+        or as a standalone matplotlib.figure.Figure with an Agg canvas that
+        is never registered with pyplot and is safe to render from threads.
+    sparse : bool
+        Whether the tally data is held as the indices and values of the
+        non-zero voxels when extracting, combining and slicing, which saves
+        memory and time for mostly empty tallies. The 'rel_err' value is not
+        supported as it is undefined for empty voxels.
+    mask : {'void', 'outside'} or sequence of ints
+        Masks the voxels whose center is in a void cell, outside of the
+        geometry or in one of the listed material ids. The geometry is
+        rasterised once by cell and the same image is used for the mask and
+        the outline.
+    outline_method : {'raster', 'vector'}
+        Whether the outline is contoured from an image rasterised by OpenMC
+        or drawn as vector paths found by cutting each surface with the
+        slice plane. In the vector outline planes are drawn as straight
+        lines clipped exactly to the plot, while the curved cuts of other
+        quadrics are polylines through 256 points of the conic, which are
+        not refined when zooming in. It falls back to the raster outline for
+        geometries with surfaces that are not quadrics or with cells filled
+        by universes or lattices.
+    index_range : tuple of tuples of ints
+        The ((i0, i1), (j0, j1), (k0, k1)) block of mesh voxels to plot, with
+        the stop indices excluded. Only the voxels of the block are taken
+        from the tally results and the slice_index, which defaults to the
+        middle of the block, must be within the block.
+    value_contours : int or sequence of floats
+        The values to draw iso-value lines of the plotted data at, or the
+        number of levels to space evenly within the color scale, which are
+        log spaced when the norm is a LogNorm. The lines are contoured on the
+        voxel centers of the plotted slice.
+    value_contour_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.pyplot.contour` for the
+        value_contours. Defaults to "colors": "white", "linestyles": "solid",
+        "linewidths": 1
+    value_contours_path : str or pathlib.Path
+        A .npz file to save the value_contours lines to, as a "levels" array
+        and a (number of points, 2) array of the line coordinates in the
+        axis_units for each line named "level_<level number>_<line number>".
+    underlay : {'material', 'cell'}
+        If set then the geometry, colored by material or by cell, is drawn
+        over the tally image. The geometry is rasterised once by cell and the
+        same image is used for the underlay, the mask and the outline. Void
+        cells and the outside of the geometry are left transparent.
+    underlay_colors : dict
+        The matplotlib colors of the material or cell ids in the underlay.
+        Ids that are not given a color are colored from the tab20 colormap.
+    underlay_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.pyplot.imshow` for the
+        underlay. Defaults to "alpha": 0.4. Passing "zorder": -1 draws the
+        underlay beneath the tally image, where it shows through masked
+        voxels or a tally image drawn with an alpha.
     **kwargs
         Keyword arguments passed to :func:`matplotlib.pyplot.imshow`. Defaults
         to {"interpolation", "none"}.
@@ -100,278 +203,1740 @@ def plot_mesh_tally(
     cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
     cv.check_type("volume_normalization", volume_normalization, bool)
     cv.check_type("outline", outline, bool)
+    cv.check_type("use_pyplot", use_pyplot, bool)
+    cv.check_type("sparse", sparse, bool)
+    cv.check_value("rel_err_style", rel_err_style, ["mask", "hatch"])
+    cv.check_value("outline_method", outline_method, ["raster", "vector"])
+    if rel_err_threshold is not None:
+        cv.check_greater_than("rel_err_threshold", rel_err_threshold, 0.0)
+    if isinstance(mask, str):
+        cv.check_value("mask", mask, ["void", "outside"])
+    elif mask is not None:
+        cv.check_iterable_type("mask", mask, int)
+    if mask is not None and geometry is None:
+        raise ValueError("geometry must be specified when masking the tally data")
+    if underlay is not None:
+        cv.check_value("underlay", underlay, ["material", "cell"])
+        if geometry is None:
+            raise ValueError("geometry must be specified when underlaying the geometry")
 
-    if isinstance(tally, typing.Sequence):
-        mesh_ids = []
-        for one_tally in tally:
-            _check_tally_for_energy_filters_with_multiple_bins(one_tally)
-            mesh = one_tally.find_filter(filter_type=openmc.MeshFilter).mesh
-            # TODO check the tallies use the same mesh
-            mesh_ids.append(mesh.id)
-        if not all(i == mesh_ids[0] for i in mesh_ids):
-            raise ValueError(
-                f"mesh ids {mesh_ids} are different, please use same mesh when combining tallies"
-            )
-    else:
-        mesh = tally.find_filter(filter_type=openmc.MeshFilter).mesh
-        _check_tally_for_energy_filters_with_multiple_bins(tally)
-
-    if isinstance(mesh, openmc.CylindricalMesh):
-        raise NotImplemented(
-            f"Only RegularMesh are supported, not {type(mesh)}, try the openmc_cylindrical_mesh_plotter package available at https://github.com/fusion-energy/openmc_cylindrical_mesh_plotter/"
-        )
-    if not isinstance(mesh, openmc.RegularMesh):
-        raise NotImplemented(f"Only RegularMesh are supported, not {type(mesh)}")
+    mesh = _get_mesh(tally)
 
-    axis_scaling_factor = {"km": 0.00001, "m": 0.01, "cm": 1, "mm": 10}[axis_units]
+    slice_index, window = _get_slice_window(
+        mesh, basis, slice_index, axis_units, region, index_range
+    )
 
-    x_min, x_max, y_min, y_max = [
-        i * axis_scaling_factor for i in mesh.bounding_box.extent[basis]
-    ]
+    x_min, x_max, y_min, y_max = _get_extent(mesh, basis, axis_units, window)
 
-    if basis == "xz":
-        xlabel, ylabel = f"x [{axis_units}]", f"z [{axis_units}]"
-    elif basis == "yz":
-        xlabel, ylabel = f"y [{axis_units}]", f"z [{axis_units}]"
-    else:  # basis == 'xy'
-        xlabel, ylabel = f"x [{axis_units}]", f"y [{axis_units}]"
+    xlabel, ylabel = _get_axis_labels(basis, axis_units)
 
     if axes is None:
-        fig, axes = plt.subplots()
+        fig, axes = _get_figure(use_pyplot)
         axes.set_xlabel(xlabel)
         axes.set_ylabel(ylabel)
 
-    basis_to_index = {"xy": 2, "xz": 1, "yz": 0}[basis]
-    if slice_index is None:
-        # finds the mid index
-        slice_index = int(mesh.dimension[basis_to_index] / 2)
+    default_imshow_kwargs = _get_imshow_kwargs(kwargs)
 
-    # zero values with logscale produce noise / fuzzy on the time but setting interpolation to none solves this
-    default_imshow_kwargs = {"interpolation": "none"}
-    default_imshow_kwargs.update(kwargs)
+    if rel_err_threshold is None:
+        values = [value]
+    else:
+        # mean and std_dev are needed for the relative error so they are
+        # extracted alongside the plotted value from the same tally slice
+        values = list(dict.fromkeys([value, "mean", "std_dev"]))
 
-    if isinstance(tally, typing.Sequence):
-        for counter, one_tally in enumerate(tally):
-            new_data = _get_tally_data(
-                scaling_factor,
-                mesh,
-                basis,
-                one_tally,
-                value,
-                volume_normalization,
-                score,
-                slice_index,
-            )
-            if counter == 0:
-                data = np.zeros(shape=new_data.shape)
-            data = data + new_data
-    else:  # single tally
-        data = _get_tally_data(
-            scaling_factor,
+    if sparse:
+        from .sparse import _get_sparse_tally_slices
+
+        slices = _get_sparse_tally_slices(
             mesh,
             basis,
             tally,
-            value,
-            volume_normalization,
+            values,
             score,
             slice_index,
+            window,
+        )
+    else:
+        slices = _sum_tally_data(
+            tally,
+            lambda one_tally: _get_tally_slices(
+                mesh, basis, one_tally, values, score, slice_index, window
+            ),
         )
 
-    im = axes.imshow(data, extent=(x_min, x_max, y_min, y_max), **default_imshow_kwargs)
-
-    if colorbar:
-        fig.colorbar(im, **colorbar_kwargs)
+    data = _normalize_data(
+        slices[value],
+        mesh,
+        volume_normalization,
+        scaling_factor,
+        basis,
+        slice_index,
+        window,
+    )
 
-    if outline and geometry is not None:
-        import matplotlib.image as mpimg
-
-        # code to make sure geometry outline is in the middle of the mesh voxel
-        # two of the three dimensions are just in the center of the mesh
-        # but the slice can move one axis off the center so this needs calculating
-        x0, y0, z0 = mesh.lower_left
-        x1, y1, z1 = mesh.upper_right
-        nx, ny, nz = mesh.dimension
-        center_of_mesh = mesh.bounding_box.center
-
-        if basis == "xy":
-            zarr = np.linspace(z0, z1, nz + 1)
-            center_of_mesh_slice = [
-                center_of_mesh[0],
-                center_of_mesh[1],
-                (zarr[slice_index] + zarr[slice_index + 1]) / 2,
-            ]
-        if basis == "xz":
-            yarr = np.linspace(y0, y1, ny + 1)
-            center_of_mesh_slice = [
-                center_of_mesh[0],
-                (yarr[slice_index] + yarr[slice_index + 1]) / 2,
-                center_of_mesh[2],
-            ]
-        if basis == "yz":
-            xarr = np.linspace(x0, x1, nx + 1)
-            center_of_mesh_slice = [
-                (xarr[slice_index] + xarr[slice_index + 1]) / 2,
-                center_of_mesh[1],
-                center_of_mesh[2],
-            ]
+    if rel_err_threshold is not None:
+        rel_err = _get_relative_error(slices["mean"], slices["std_dev"])
+        unreliable = rel_err > rel_err_threshold
+        if rel_err_style == "mask":
+            data = np.ma.masked_where(unreliable, data)
 
-        model = openmc.Model()
-        model.geometry = geometry
-        plot = openmc.Plot()
-        plot.origin = center_of_mesh_slice
-        bb_width = mesh.bounding_box.extent[basis]
-        plot.width = (bb_width[0] - bb_width[1], bb_width[2] - bb_width[3])
-        aspect_ratio = (bb_width[0] - bb_width[1]) / (bb_width[2] - bb_width[3])
-        pixels_y = math.sqrt(pixels / aspect_ratio)
-        pixels = (int(pixels / pixels_y), int(pixels_y))
-        plot.pixels = pixels
-        plot.basis = basis
-        plot.color_by = outline_by
-        model.plots.append(plot)
+    id_images = None
+    if mask is not None or underlay is not None:
+        # the cell and material id images are also used for the outline
+        cells = list(geometry.get_all_cells().values())
+        pixels = _get_outline_pixels(axes, pixels, max_pixels)
+        plot = _get_outline_plot(mesh, basis, slice_index, pixels, "cell", window)
+        _set_plot_id_colors(plot, cells)
+        id_images = _get_id_images(_get_outline_images(geometry, [plot])[0], cells)
 
-        with TemporaryDirectory() as tmpdir:
-            # Run OpenMC in geometry plotting mode
-            model.plot_geometry(False, cwd=tmpdir)
+    if mask is not None:
+        material_ids = _sample_voxel_centers(id_images["material"], mesh, basis, window)
+        data = np.ma.masked_where(_get_id_mask(material_ids, mask), data)
 
-            # Read image from file
-            img_path = Path(tmpdir) / f"plot_{plot.id}.png"
-            if not img_path.is_file():
-                img_path = img_path.with_suffix(".ppm")
-            img = mpimg.imread(str(img_path))
+    im = _plot_slice(
+        axes, data, mesh, basis, axis_units, window, **default_imshow_kwargs
+    )
 
-        # Combine R, G, B values into a single int
-        rgb = (img * 256).astype(int)
-        image_value = (rgb[..., 0] << 16) + (rgb[..., 1] << 8) + (rgb[..., 2])
+    if colorbar:
+        axes.figure.colorbar(im, ax=axes, **colorbar_kwargs)
 
-        if basis == "xz":
-            image_value = np.rot90(image_value, 2)
-        elif basis == "yz":
-            image_value = np.rot90(image_value, 2)
-        else:  # basis == 'xy'
-            image_value = np.rot90(image_value, 2)
-
-        # Plot image and return the axes
-        axes.contour(
-            image_value,
-            origin="upper",
-            levels=np.unique(image_value),
+    if underlay is not None:
+        if underlay == "cell":
+            ids = [cell.id for cell in cells]
+        else:
+            ids = [_get_material_id(cell) for cell in cells]
+        axes.imshow(
+            _get_underlay_image(id_images[underlay], ids, underlay_colors),
             extent=(x_min, x_max, y_min, y_max),
-            **outline_kwargs,
+            # the underlay_kwargs may override the defaults
+            **{
+                "interpolation": "nearest",
+                "aspect": axes.get_aspect(),
+                **underlay_kwargs,
+            },
+        )
+
+    if rel_err_threshold is not None and rel_err_style == "hatch":
+        if unreliable.any():
+            # each voxel is sampled just inside both of its edges so the
+            # boundaries of the hatching follow the voxel edges
+            horizontal_edges, vertical_edges = _get_slice_edges(
+                mesh, basis, axis_units, window
+            )
+            samples = np.repeat(np.repeat(unreliable[::-1], 2, axis=0), 2, axis=1)
+            axes.contourf(
+                _get_voxel_edge_grid(horizontal_edges),
+                _get_voxel_edge_grid(vertical_edges),
+                samples.astype(float),
+                levels=[0.5, 1.5],
+                **hatch_kwargs,
+            )
+
+    if value_contours is not None:
+        contour_set = _plot_value_contours(
+            axes,
+            data,
+            im.norm,
+            value_contours,
+            mesh,
+            basis,
+            axis_units,
+            window,
+            value_contour_kwargs,
+        )
+        if value_contours_path is not None:
+            _save_contour_lines(value_contours_path, contour_set)
+
+    vector_outline = None
+    if outline and geometry is not None and outline_method == "vector":
+        from .vector import _plot_vector_outline
+
+        vector_outline = _plot_vector_outline(
+            axes,
+            geometry,
+            mesh,
+            basis,
+            slice_index,
+            outline_by,
+            window,
+            axis_units,
+            outline_kwargs,
         )
 
+    if outline and geometry is not None and vector_outline is None:
+        if id_images is None:
+            pixels = _get_outline_pixels(axes, pixels, max_pixels)
+            plot = _get_outline_plot(
+                mesh, basis, slice_index, pixels, outline_by, window
+            )
+            image_value = _get_outline_images(geometry, [plot])[0]
+        else:
+            image_value = id_images[outline_by]
+        _plot_outline(axes, image_value, (x_min, x_max, y_min, y_max), outline_kwargs)
+
+    if region is not None:
+        axes.set_xlim(region[0], region[1])
+        axes.set_ylim(region[2], region[3])
+
     return axes
 
 
-# TODO currently we allow slice index, but this code will be useful if want to
-# allow slicing by axis values / coordinates.
-def get_index_where(self, value: float, basis: str = "xy"):
-    """Gets the mesh cell index nearest to the specified axis value.
+def get_mesh_tally_slice(
+    tally: typing.Union["openmc.Tally", typing.Sequence["openmc.Tally"]],
+    basis: str = "xy",
+    slice_index: typing.Optional[int] = None,
+    score: typing.Optional[str] = None,
+    value: str = "mean",
+    axis_units: str = "cm",
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    region: typing.Optional[typing.Sequence[float]] = None,
+    index_range: typing.Optional[typing.Sequence[typing.Sequence[int]]] = None,
+) -> typing.Tuple["numpy.ndarray", typing.List[float]]:
+    """Returns a slice of the mesh tally score, oriented, normalised and
+    scaled in the same way as the data plotted by :func:`plot_mesh_tally`,
+    along with its extent, without using matplotlib.
+
+    Only the voxels of the slice are taken from the tally results and they
+    are normalised in place, so the array returned is a rotated or flipped
+    view of the extracted slice rather than a further copy.
     Parameters
     ----------
+    tally : openmc.Tally
+        The openmc tally to slice. Tally must contain a MeshFilter that uses
+        a RegularMesh or RectilinearMesh.
     basis : {'xy', 'xz', 'yz'}
         The basis directions for the slice
+    slice_index : int
+        The mesh index of the slice
+    score : str
+        Score to slice, e.g. 'flux'
     value : str
         A string for the type of value to return  - 'mean' (default),
         'std_dev', 'rel_err', 'sum', or 'sum_sq' are accepted
+    axis_units : {'km', 'm', 'cm', 'mm'}
+        Units used for the extent and region
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data.
+    region : tuple of floats
+        The (xmin, xmax, ymin, ymax) window to slice in the axis_units.
+    index_range : tuple of tuples of ints
+        The ((i0, i1), (j0, j1), (k0, k1)) block of mesh voxels to slice, see
+        :func:`plot_mesh_tally`.
     Returns
     -------
-    int
-        the index of the mesh cell
+    numpy.ndarray
+        The slice with the first row at the top, as shown by imshow
+    list of floats
+        The (xmin, xmax, ymin, ymax) extent of the slice in the axis_units
     """
 
-    index_of_basis = {"xy": 2, "xz": 1, "yz": 0}[basis]
-
-    if value < self.lower_left[index_of_basis]:
-        msg = f"value [{value}] is smaller than the mesh.lower_left [{self.lower_left}]"
-        raise ValueError(msg)
-    if value > self.upper_right[index_of_basis]:
-        msg = (
-            f"value [{value}] is bigger than the mesh.upper_right [{self.upper_right}]"
-        )
-        raise ValueError(msg)
+    cv.check_value("basis", basis, _BASES)
+    cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
+    cv.check_value("value", value, ["mean", "std_dev", "rel_err", "sum", "sum_sq"])
+    cv.check_type("volume_normalization", volume_normalization, bool)
 
-    voxel_axis_vals = np.linspace(
-        self.lower_left[index_of_basis],
-        self.upper_right[index_of_basis],
-        self.dimension[index_of_basis],
-        endpoint=True,
+    mesh = _get_mesh(tally)
+    slice_index, window = _get_slice_window(
+        mesh, basis, slice_index, axis_units, region, index_range
     )
-    slice_index = (np.abs(voxel_axis_vals - value)).argmin()
 
-    return slice_index
+    data = _sum_tally_data(
+        tally,
+        lambda one_tally: _get_tally_slices(
+            mesh, basis, one_tally, [value], score, slice_index, window
+        ),
+    )[value]
+    # the extracted slice is not shared so is normalised without a copy
+    data = _normalize_data(
+        data,
+        mesh,
+        volume_normalization,
+        scaling_factor,
+        basis,
+        slice_index,
+        window,
+        copy=False,
+    )
 
+    return data, _get_extent(mesh, basis, axis_units, window)
 
-def _check_tally_for_energy_filters_with_multiple_bins(tally):
-    for current_filter in tally.filters:
-        if isinstance(current_filter, openmc.EnergyFilter):
-            if isinstance(current_filter, openmc.EnergyFilter):
-                if current_filter.num_bins > 1:
-                    msg = (
-                        "An EnergyFilter was found on the tally with more "
-                        "than a single bin. EnergyFilter.num_bins="
-                        f"{current_filter.num_bins}. Either reduce the number "
-                        "of energy bins to 1 or remove the EnergyFilter to "
-                        "plot this tally. EnergyFilter with more than 1 energy "
-                        "bin are unsupported"
-                    )
-                    raise ValueError(msg)
 
+def plot_mesh_tally_orthoslices(
+    tally: typing.Union["openmc.Tally", typing.Sequence["openmc.Tally"]],
+    point: typing.Optional[typing.Sequence[float]] = None,
+    slice_indices: typing.Optional[typing.Sequence[int]] = None,
+    score: typing.Optional[str] = None,
+    axis_units: str = "cm",
+    value: str = "mean",
+    outline: bool = False,
+    outline_by: str = "cell",
+    geometry: typing.Optional["openmc.Geometry"] = None,
+    pixels: typing.Union[int, str] = 40000,
+    colorbar: bool = True,
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    colorbar_kwargs: dict = {},
+    outline_kwargs: dict = _default_outline_kwargs,
+    max_pixels: int = 1000000,
+    use_pyplot: bool = True,
+    **kwargs,
+) -> "numpy.ndarray":
+    """Display the xy, xz and yz slices of the mesh tally score that pass
+    through the same point side by side with a shared color scale.
+    Parameters
+    ----------
+    tally : openmc.Tally
+        The openmc tally to plot. Tally must contain a MeshFilter that uses a RegularMesh.
+    point : tuple of floats
+        The x, y, z coordinates that all three slices pass through. Defaults
+        to the center of the mesh.
+    slice_indices : tuple of ints
+        The x, y, z mesh indices of the slices, alternative to point.
+    score : str
+        Score to plot, e.g. 'flux'
+    axis_units : {'km', 'm', 'cm', 'mm'}
+        Units used on the plot axis
+    value : str
+        A string for the type of value to return  - 'mean' (default),
+        'std_dev', 'rel_err', 'sum', or 'sum_sq' are accepted
+    outline : True
+        If set then an outline will be added to each plot. The outline can be
+        by cell or by material.
+    outline_by : {'cell', 'material'}
+        Indicate whether the plot should be colored by cell or by material
+    geometry : openmc.Geometry
+        The geometry to use for the outline.
+    pixels : int or 'auto'
+        This sets the total number of pixels in each outline and the number of
+        pixels in each basis direction is calculated from this total and
+        the image aspect ratio. If set to 'auto' then the total matches the
+        number of screen pixels covered by each axes at the figure dpi,
+        limited to max_pixels.
+    colorbar : bool
+        Whether or not to add a colorbar shared by the plots.
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to ploting.
+    colorbar_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.colorbar.Colorbar`.
+    outline_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.pyplot.contour`. Defaults
+        to "colors": "black", "linestyles": "solid", "linewidths": 1
+    max_pixels : int
+        The largest total number of outline pixels used when pixels is 'auto'.
+    use_pyplot : bool
+        Whether the figure is created with pyplot or as a standalone
+        matplotlib.figure.Figure with an Agg canvas that is never registered
+        with pyplot and is safe to render from threads.
+    **kwargs
+        Keyword arguments passed to :func:`matplotlib.pyplot.imshow`. Defaults
+        to {"interpolation", "none"}.
+    Returns
+    -------
+    numpy.ndarray
+        The xy, xz and yz matplotlib.Axes
+    """
+    cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
+    cv.check_type("volume_normalization", volume_normalization, bool)
+    cv.check_type("outline", outline, bool)
+    cv.check_type("use_pyplot", use_pyplot, bool)
+    if point is not None and slice_indices is not None:
+        raise ValueError("Only one of point and slice_indices can be specified")
 
-def _get_tally_data(
-    scaling_factor, mesh, basis, tally, value, volume_normalization, score, slice_index
-):
+    mesh = _get_mesh(tally)
 
-    # if score is not specified and tally has a single score then we know which score to use
-    if score is None:
-        if len(tally.scores) == 1:
-            score = tally.scores[0]
-        else:
-            msg = "score was not specified and there are multiple scores in the tally."
-            raise ValueError(msg)
+    for basis in _BASES:
+        _check_mesh_dimension(mesh, basis)
 
-    tally_slice = tally.get_slice(scores=[score])
+    if point is not None:
+        slice_indices = _get_index_of_point(mesh, point)
+    elif slice_indices is None:
+        # finds the mid indices
+        slice_indices = [int(dimension / 2) for dimension in mesh.dimension]
+    cv.check_length("slice_indices", slice_indices, 3, 3)
 
-    if 1 in mesh.dimension:
-        index_of_2d = mesh.dimension.index(1)
-        axis_of_2d = {0: "x", 1: "y", 2: "z"}[index_of_2d]
-        if (
-            axis_of_2d in basis
-        ):  # checks if the axis is being plotted, e.g is 'x' in 'xy'
-            raise ValueError(
-                "The selected tally has a mesh that has 1 dimension in the "
-                f"{axis_of_2d} axis, minimum of 2 needed to plot with a basis "
-                f"of {basis}."
-            )
+    # the 3D array is extracted once and all three slices are taken from it
+    tally_data = _sum_tally_data(
+        tally, lambda one_tally: _get_tally_arrays(mesh, one_tally, [value], score)
+    )[value]
+    tally_data = _normalize_data(tally_data, mesh, volume_normalization, scaling_factor)
 
-    # TODO check if 1 appears twice or three times, raise value error if so
+    basis_to_index = {"xy": 2, "xz": 1, "yz": 0}
+    all_data = [
+        _orient_slice(tally_data, basis, slice_indices[basis_to_index[basis]])
+        for basis in _BASES
+    ]
 
-    tally_data = tally_slice.get_reshaped_data(
-        expand_dims=True, value=value
-    )  # .squeeze()
+    default_imshow_kwargs = _get_imshow_kwargs(kwargs)
 
-    tally_data = _squeeze_end_of_array(tally_data, dims_required=3)
+    # a single norm scaled to all three slices keeps the colors comparable
+    norm = _pop_norm(default_imshow_kwargs)
+    norm.autoscale_None(np.concatenate([data.ravel() for data in all_data]))
 
-    # if len(tally_data.shape) == 3:
-    if mesh.n_dimension == 3:
-        if basis == "xz":
-            slice_data = tally_data[:, slice_index, :]
-            data = np.flip(np.rot90(slice_data, -1))
-        elif basis == "yz":
-            slice_data = tally_data[slice_index, :, :]
-            data = np.flip(np.rot90(slice_data, -1))
-        else:  # basis == 'xy'
-            slice_data = tally_data[:, :, slice_index]
-            data = np.rot90(slice_data, -3)
+    fig, axes = _get_figure(use_pyplot, ncols=3, constrained_layout=True)
 
-    else:
-        raise ValueError(
-            f"mesh n_dimension is not 3 but is {mesh.n_dimension} which is not supported"
+    for axis, basis, data in zip(axes, _BASES, all_data):
+        xlabel, ylabel = _get_axis_labels(basis, axis_units)
+        axis.set_xlabel(xlabel)
+        axis.set_ylabel(ylabel)
+        im = _plot_slice(
+            axis, data, mesh, basis, axis_units, norm=norm, **default_imshow_kwargs
         )
 
-    if volume_normalization:
-        # in a regular mesh all volumes are the same so we just divide by the first
-        data = data / mesh.volumes[0][0][0]
+    if colorbar:
+        fig.colorbar(im, ax=axes, **colorbar_kwargs)
 
-    if scaling_factor:
-        data = data * scaling_factor
-    return data
+    if outline and geometry is not None:
+        plots = [
+            _get_outline_plot(
+                mesh,
+                basis,
+                slice_indices[basis_to_index[basis]],
+                _get_outline_pixels(axis, pixels, max_pixels),
+                outline_by,
+            )
+            for axis, basis in zip(axes, _BASES)
+        ]
+        # all three outlines are rasterised in a single OpenMC plotting run
+        image_values = _get_outline_images(geometry, plots)
+        for axis, basis, image_value in zip(axes, _BASES, image_values):
+            _plot_outline(
+                axis, image_value, _get_extent(mesh, basis, axis_units), outline_kwargs
+            )
+
+    return axes
+
+
+def plot_mesh_tally_comparison(
+    tally_a: typing.Union["openmc.Tally", typing.Sequence["openmc.Tally"]],
+    tally_b: typing.Union["openmc.Tally", typing.Sequence["openmc.Tally"]],
+    mode: str = "diff",
+    basis: str = "xy",
+    slice_index: typing.Optional[int] = None,
+    score: typing.Optional[str] = None,
+    axes: typing.Optional[str] = None,
+    axis_units: str = "cm",
+    value: str = "mean",
+    outline: bool = False,
+    outline_by: str = "cell",
+    geometry: typing.Optional["openmc.Geometry"] = None,
+    pixels: typing.Union[int, str] = 40000,
+    colorbar: bool = True,
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    colorbar_kwargs: dict = {},
+    outline_kwargs: dict = _default_outline_kwargs,
+    max_pixels: int = 1000000,
+    region: typing.Optional[typing.Sequence[float]] = None,
+    use_pyplot: bool = True,
+    index_range: typing.Optional[typing.Sequence[typing.Sequence[int]]] = None,
+    **kwargs,
+) -> "matplotlib.axes.Axes":
+    """Display a slice plot comparing the mesh tally score of two tallies,
+    such as the same tally from two design variants.
+
+    The mean and std_dev of each tally are extracted together and the
+    uncertainty of the comparison is propagated from them assuming the two
+    tallies are independent. Voxels where a ratio is undefined, because the
+    mean of tally_b is zero, are masked.
+    Parameters
+    ----------
+    tally_a : openmc.Tally
+        The openmc tally to compare. Tally must contain a MeshFilter that uses a RegularMesh.
+    tally_b : openmc.Tally
+        The openmc tally compared against, which must use a mesh with the
+        same dimension and bounds as tally_a.
+    mode : {'diff', 'ratio', 'rel_diff'}
+        Whether to plot tally_a - tally_b, tally_a / tally_b or
+        (tally_a - tally_b) / tally_b
+    basis : {'xy', 'xz', 'yz'}
+        The basis directions for the plot
+    slice_index : int
+        The mesh index to plot
+    score : str
+        Score to plot, e.g. 'flux'
+    axes : matplotlib.Axes
+        Axes to draw to
+    axis_units : {'km', 'm', 'cm', 'mm'}
+        Units used on the plot axis
+    value : {'mean', 'std_dev'}
+        Whether to plot the comparison or its propagated standard deviation
+    outline : True
+        If set then an outline will be added to the plot. The outline can be
+        by cell or by material.
+    outline_by : {'cell', 'material'}
+        Indicate whether the plot should be colored by cell or by material
+    geometry : openmc.Geometry
+        The geometry to use for the outline.
+    pixels : int or 'auto'
+        This sets the total number of pixels in the outline, see
+        :func:`plot_mesh_tally`.
+    colorbar : bool
+        Whether or not to add a colorbar to the plot.
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to ploting.
+    colorbar_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.colorbar.Colorbar`.
+    outline_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.pyplot.contour`. Defaults
+        to "colors": "black", "linestyles": "solid", "linewidths": 1
+    max_pixels : int
+        The largest total number of outline pixels used when pixels is 'auto'.
+    region : tuple of floats
+        The (xmin, xmax, ymin, ymax) window to plot in the axis_units.
+    use_pyplot : bool
+        Whether a new figure is created with pyplot, when axes is not given,
+        or as a standalone matplotlib.figure.Figure with an Agg canvas.
+    index_range : tuple of tuples of ints
+        The ((i0, i1), (j0, j1), (k0, k1)) block of mesh voxels to plot, see
+        :func:`plot_mesh_tally`.
+    **kwargs
+        Keyword arguments passed to :func:`matplotlib.pyplot.imshow`. Defaults
+        to {"interpolation", "none"} and, when value is 'mean', a "RdBu_r"
+        cmap with a norm centered on no change.
+    Returns
+    -------
+    matplotlib.axes.Axes
+        The axes of the plot
+    """
+    import matplotlib.colors
+
+    cv.check_value("mode", mode, ["diff", "ratio", "rel_diff"])
+    cv.check_value("value", value, ["mean", "std_dev"])
+    cv.check_value("basis", basis, _BASES)
+    cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
+    cv.check_type("volume_normalization", volume_normalization, bool)
+    cv.check_type("outline", outline, bool)
+    cv.check_type("use_pyplot", use_pyplot, bool)
+
+    mesh = _get_mesh(tally_a)
+    _check_meshes_match(mesh, _get_mesh(tally_b))
+
+    slice_index, window = _get_slice_window(
+        mesh, basis, slice_index, axis_units, region, index_range
+    )
+
+    extent = _get_extent(mesh, basis, axis_units, window)
+
+    if axes is None:
+        fig, axes = _get_figure(use_pyplot)
+        xlabel, ylabel = _get_axis_labels(basis, axis_units)
+        axes.set_xlabel(xlabel)
+        axes.set_ylabel(ylabel)
+
+    all_slices = []
+    for tally in [tally_a, tally_b]:
+        slices = _sum_tally_data(
+            tally,
+            lambda one_tally: _get_tally_slices(
+                mesh, basis, one_tally, ["mean", "std_dev"], score, slice_index, window
+            ),
+        )
+        all_slices.append(
+            {
+                key: _normalize_data(
+                    val,
+                    mesh,
+                    volume_normalization,
+                    scaling_factor,
+                    basis,
+                    slice_index,
+                    window,
+                )
+                for key, val in slices.items()
+            }
+        )
+
+    comparison, std_dev = _compare_data(
+        all_slices[0]["mean"],
+        all_slices[0]["std_dev"],
+        all_slices[1]["mean"],
+        all_slices[1]["std_dev"],
+        mode,
+    )
+    data = np.ma.masked_invalid({"mean": comparison, "std_dev": std_dev}[value])
+
+    defaults = {}
+    if value == "mean":
+        # a diverging colormap centered on no change shows gains and losses
+        defaults["cmap"] = "RdBu_r"
+        if "vmin" not in kwargs and "vmax" not in kwargs:
+            defaults["norm"] = matplotlib.colors.CenteredNorm(
+                vcenter={"diff": 0.0, "ratio": 1.0, "rel_diff": 0.0}[mode]
+            )
+    default_imshow_kwargs = _get_imshow_kwargs(kwargs, **defaults)
+
+    im = _plot_slice(
+        axes, data, mesh, basis, axis_units, window, **default_imshow_kwargs
+    )
+
+    if colorbar:
+        axes.figure.colorbar(im, ax=axes, **colorbar_kwargs)
+
+    if outline and geometry is not None:
+        pixels = _get_outline_pixels(axes, pixels, max_pixels)
+        plot = _get_outline_plot(mesh, basis, slice_index, pixels, outline_by, window)
+        image_value = _get_outline_images(geometry, [plot])[0]
+        _plot_outline(axes, image_value, extent, outline_kwargs)
+
+    if region is not None:
+        axes.set_xlim(region[0], region[1])
+        axes.set_ylim(region[2], region[3])
+
+    return axes
+
+
+def plot_mesh_tally_scores(
+    tally: typing.Union["openmc.Tally", typing.Sequence["openmc.Tally"]],
+    scores: typing.Optional[typing.Sequence[str]] = None,
+    basis: str = "xy",
+    slice_index: typing.Optional[int] = None,
+    axis_units: str = "cm",
+    value: str = "mean",
+    outline: bool = False,
+    outline_by: str = "cell",
+    geometry: typing.Optional["openmc.Geometry"] = None,
+    pixels: typing.Union[int, str] = 40000,
+    colorbar: bool = True,
+    shared_norm: bool = False,
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    colorbar_kwargs: dict = {},
+    outline_kwargs: dict = _default_outline_kwargs,
+    max_pixels: int = 1000000,
+    ncols: typing.Optional[int] = None,
+    use_pyplot: bool = True,
+    **kwargs,
+) -> "numpy.ndarray":
+    """Display the same slice of several scores of a mesh tally as a grid of
+    plots, with the tally data reshaped once for all of the scores.
+    Parameters
+    ----------
+    tally : openmc.Tally
+        The openmc tally to plot. Tally must contain a MeshFilter that uses a RegularMesh.
+    scores : sequence of str
+        Scores to plot, e.g. ['flux', 'heating']. Defaults to all the scores
+        of the tally.
+    basis : {'xy', 'xz', 'yz'}
+        The basis directions for the plot
+    slice_index : int
+        The mesh index to plot
+    axis_units : {'km', 'm', 'cm', 'mm'}
+        Units used on the plot axis
+    value : str
+        A string for the type of value to return  - 'mean' (default),
+        'std_dev', 'rel_err', 'sum', or 'sum_sq' are accepted
+    outline : True
+        If set then an outline will be added to each plot. The outline can be
+        by cell or by material.
+    outline_by : {'cell', 'material'}
+        Indicate whether the plot should be colored by cell or by material
+    geometry : openmc.Geometry
+        The geometry to use for the outline.
+    pixels : int or 'auto'
+        This sets the total number of pixels in the outline, see
+        :func:`plot_mesh_tally`. The outline is rasterised once and drawn on
+        every plot.
+    colorbar : bool
+        Whether or not to add colorbars to the plots.
+    shared_norm : bool
+        Whether all the scores share a single color scale and colorbar or
+        each score has its own.
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to ploting.
+    colorbar_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.colorbar.Colorbar`.
+    outline_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.pyplot.contour`. Defaults
+        to "colors": "black", "linestyles": "solid", "linewidths": 1
+    max_pixels : int
+        The largest total number of outline pixels used when pixels is 'auto'.
+    ncols : int
+        The number of columns in the grid of plots. Defaults to a roughly
+        square grid.
+    use_pyplot : bool
+        Whether the figure is created with pyplot or as a standalone
+        matplotlib.figure.Figure with an Agg canvas.
+    **kwargs
+        Keyword arguments passed to :func:`matplotlib.pyplot.imshow`. Defaults
+        to {"interpolation", "none"}.
+    Returns
+    -------
+    numpy.ndarray
+        The matplotlib.Axes of each score
+    """
+    cv.check_value("basis", basis, _BASES)
+    cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
+    cv.check_type("volume_normalization", volume_normalization, bool)
+    cv.check_type("outline", outline, bool)
+    cv.check_type("shared_norm", shared_norm, bool)
+    cv.check_type("use_pyplot", use_pyplot, bool)
+
+    mesh = _get_mesh(tally)
+    _check_mesh_dimension(mesh, basis)
+
+    if scores is None:
+        first_tally = tally[0] if isinstance(tally, typing.Sequence) else tally
+        scores = list(first_tally.scores)
+    cv.check_length("scores", scores, 1)
+
+    if slice_index is None:
+        # finds the mid index
+        basis_to_index = {"xy": 2, "xz": 1, "yz": 0}[basis]
+        slice_index = int(mesh.dimension[basis_to_index] / 2)
+
+    slices = _sum_tally_data(
+        tally,
+        lambda one_tally: _get_tally_score_slices(
+            mesh, basis, one_tally, value, scores, slice_index
+        ),
+    )
+    all_data = [
+        _normalize_data(
+            slices[score],
+            mesh,
+            volume_normalization,
+            scaling_factor,
+            basis,
+            slice_index,
+        )
+        for score in scores
+    ]
+
+    default_imshow_kwargs = _get_imshow_kwargs(kwargs)
+
+    if shared_norm:
+        # a single norm scaled to all the scores keeps the colors comparable
+        norm = _pop_norm(default_imshow_kwargs)
+        norm.autoscale_None(np.concatenate([data.ravel() for data in all_data]))
+        default_imshow_kwargs["norm"] = norm
+
+    if ncols is None:
+        ncols = math.ceil(math.sqrt(len(scores)))
+    nrows = math.ceil(len(scores) / ncols)
+    fig, axes = _get_figure(
+        use_pyplot,
+        nrows=nrows,
+        ncols=ncols,
+        figsize=(4 * ncols, 3.5 * nrows),
+        constrained_layout=True,
+    )
+    axes = np.array(axes).flatten()
+    for axis in axes[len(scores) :]:
+        axis.set_axis_off()
+    axes = axes[: len(scores)]
+
+    extent = _get_extent(mesh, basis, axis_units)
+    xlabel, ylabel = _get_axis_labels(basis, axis_units)
+    for axis, score, data in zip(axes, scores, all_data):
+        axis.set_xlabel(xlabel)
+        axis.set_ylabel(ylabel)
+        axis.set_title(score)
+        im = _plot_slice(axis, data, mesh, basis, axis_units, **default_imshow_kwargs)
+        if colorbar and not shared_norm:
+            fig.colorbar(im, ax=axis, **colorbar_kwargs)
+
+    if colorbar and shared_norm:
+        fig.colorbar(im, ax=axes.tolist(), **colorbar_kwargs)
+
+    if outline and geometry is not None:
+        # every score is the same slice so one outline raster serves them all
+        pixels = _get_outline_pixels(axes[0], pixels, max_pixels)
+        plot = _get_outline_plot(mesh, basis, slice_index, pixels, outline_by)
+        image_value = _get_outline_images(geometry, [plot])[0]
+        for axis in axes:
+            _plot_outline(axis, image_value, extent, outline_kwargs)
+
+    return axes
+
+
+# TODO currently we allow slice index, but this code will be useful if want to
+# allow slicing by axis values / coordinates.
+def get_index_where(self, value: float, basis: str = "xy"):
+    """Gets the mesh cell index nearest to the specified axis value.
+    Parameters
+    ----------
+    basis : {'xy', 'xz', 'yz'}
+        The basis directions for the slice
+    value : str
+        A string for the type of value to return  - 'mean' (default),
+        'std_dev', 'rel_err', 'sum', or 'sum_sq' are accepted
+    Returns
+    -------
+    int
+        the index of the mesh cell
+    """
+
+    index_of_basis = {"xy": 2, "xz": 1, "yz": 0}[basis]
+
+    if value < self.lower_left[index_of_basis]:
+        msg = f"value [{value}] is smaller than the mesh.lower_left [{self.lower_left}]"
+        raise ValueError(msg)
+    if value > self.upper_right[index_of_basis]:
+        msg = (
+            f"value [{value}] is bigger than the mesh.upper_right [{self.upper_right}]"
+        )
+        raise ValueError(msg)
+
+    voxel_axis_vals = np.linspace(
+        self.lower_left[index_of_basis],
+        self.upper_right[index_of_basis],
+        self.dimension[index_of_basis],
+        endpoint=True,
+    )
+    slice_index = (np.abs(voxel_axis_vals - value)).argmin()
+
+    return slice_index
+
+
+def _check_tally_for_energy_filters_with_multiple_bins(tally):
+    for current_filter in tally.filters:
+        if isinstance(current_filter, openmc.EnergyFilter):
+            if isinstance(current_filter, openmc.EnergyFilter):
+                if current_filter.num_bins > 1:
+                    msg = (
+                        "An EnergyFilter was found on the tally with more "
+                        "than a single bin. EnergyFilter.num_bins="
+                        f"{current_filter.num_bins}. Either reduce the number "
+                        "of energy bins to 1 or remove the EnergyFilter to "
+                        "plot this tally. EnergyFilter with more than 1 energy "
+                        "bin are unsupported"
+                    )
+                    raise ValueError(msg)
+
+
+def _get_mesh(tally):
+    """Finds the RegularMesh used by the tally, or shared by all the tallies
+    when a sequence of tallies is combined."""
+
+    if isinstance(tally, typing.Sequence):
+        mesh_ids = []
+        for one_tally in tally:
+            _check_tally_for_energy_filters_with_multiple_bins(one_tally)
+            mesh = one_tally.find_filter(filter_type=openmc.MeshFilter).mesh
+            # TODO check the tallies use the same mesh
+            mesh_ids.append(mesh.id)
+        if not all(i == mesh_ids[0] for i in mesh_ids):
+            raise ValueError(
+                f"mesh ids {mesh_ids} are different, please use same mesh when combining tallies"
+            )
+    else:
+        mesh = tally.find_filter(filter_type=openmc.MeshFilter).mesh
+        _check_tally_for_energy_filters_with_multiple_bins(tally)
+
+    if isinstance(mesh, openmc.CylindricalMesh):
+        raise NotImplementedError(
+            f"Only RegularMesh and RectilinearMesh are supported, not {type(mesh)}, try the openmc_cylindrical_mesh_plotter package available at https://github.com/fusion-energy/openmc_cylindrical_mesh_plotter/"
+        )
+    if not isinstance(mesh, (openmc.RegularMesh, openmc.RectilinearMesh)):
+        raise NotImplementedError(
+            f"Only RegularMesh and RectilinearMesh are supported, not {type(mesh)}"
+        )
+
+    return mesh
+
+
+def _check_regular_mesh(mesh):
+    if not isinstance(mesh, openmc.RegularMesh):
+        raise NotImplementedError(
+            f"Only RegularMesh are supported by this function, not {type(mesh)}"
+        )
+
+
+def _get_extent(mesh, basis, axis_units, window=None):
+    axis_scaling_factor = _AXIS_SCALING_FACTORS[axis_units]
+
+    if window is None:
+        extent = mesh.bounding_box.extent[basis]
+    else:
+        extent = _get_window_extent(mesh, basis, window)
+
+    return [i * axis_scaling_factor for i in extent]
+
+
+def _get_slice_window(mesh, basis, slice_index, axis_units, region, index_range):
+    """Returns the slice_index, defaulting to the middle of the mesh or of
+    the index_range, and the window of voxel indices covering the region
+    cropped to the index_range, or None for the whole slice."""
+
+    if region is None:
+        window = None
+    else:
+        cv.check_length("region", region, 4, 4)
+        axis_scaling_factor = _AXIS_SCALING_FACTORS[axis_units]
+        window = _get_window(mesh, basis, [i / axis_scaling_factor for i in region])
+
+    basis_to_index = {"xy": 2, "xz": 1, "yz": 0}[basis]
+    if index_range is None:
+        start, stop = 0, mesh.dimension[basis_to_index]
+    else:
+        index_range = _check_index_range(mesh, index_range)
+        window = _crop_window(mesh, basis, window, index_range)
+        start, stop = index_range[basis_to_index]
+
+    if slice_index is None:
+        # finds the mid index
+        slice_index = int((start + stop) / 2)
+    elif index_range is not None and not start <= slice_index < stop:
+        msg = f"slice_index {slice_index} is outside of the index_range {index_range}"
+        raise ValueError(msg)
+    return slice_index, window
+
+
+def _get_window(mesh, basis, region):
+    """Finds the ((start, stop), (start, stop)) ranges of horizontal and
+    vertical voxel indices that cover the (xmin, xmax, ymin, ymax) region,
+    which is given in cm."""
+
+    window = []
+    for axis, lower, upper in zip(_BASIS_AXES[basis], region[0::2], region[1::2]):
+        if lower >= upper:
+            msg = f"region {region} must be ordered as (xmin, xmax, ymin, ymax)"
+            raise ValueError(msg)
+        edges = _get_voxel_edges(mesh, axis)
+        start = max(int(np.searchsorted(edges, lower, side="right")) - 1, 0)
+        stop = min(int(np.searchsorted(edges, upper, side="left")), len(edges) - 1)
+        if start >= stop:
+            msg = f"region {region} does not overlap the mesh"
+            raise ValueError(msg)
+        window.append((start, stop))
+    return window
+
+
+def _get_window_extent(mesh, basis, window):
+    """Returns the extent in cm of the voxels within the window."""
+
+    extent = []
+    for axis, (start, stop) in zip(_BASIS_AXES[basis], window):
+        edges = _get_voxel_edges(mesh, axis)
+        extent += [edges[start], edges[stop]]
+    return extent
+
+
+def _get_voxel_edges(mesh, axis):
+    if isinstance(mesh, openmc.RectilinearMesh):
+        return np.asarray([mesh.x_grid, mesh.y_grid, mesh.z_grid][axis])
+    return np.linspace(
+        mesh.lower_left[axis], mesh.upper_right[axis], mesh.dimension[axis] + 1
+    )
+
+
+def _get_voxel_widths(mesh, axis):
+    return np.diff(_get_voxel_edges(mesh, axis))
+
+
+def _get_slice_edges(mesh, basis, axis_units, window=None):
+    """Returns the horizontal and vertical voxel edges of the slice, or the
+    window of the slice, in the axis_units."""
+
+    axis_scaling_factor = _AXIS_SCALING_FACTORS[axis_units]
+    if window is None:
+        window = [(0, mesh.dimension[axis]) for axis in _BASIS_AXES[basis]]
+    return [
+        _get_voxel_edges(mesh, axis)[start : stop + 1] * axis_scaling_factor
+        for axis, (start, stop) in zip(_BASIS_AXES[basis], window)
+    ]
+
+
+def _get_voxel_edge_grid(edges):
+    """Returns two coordinates for each voxel, on its edges moved inwards by
+    a tiny fraction of its width except at the outer edges. Values repeated
+    at both coordinates of each voxel are contoured along the voxel edges."""
+
+    inset = 1e-6 * np.diff(edges)
+    lower, upper = edges[:-1] + inset, edges[1:] - inset
+    lower[0], upper[-1] = edges[0], edges[-1]
+    return np.column_stack([lower, upper]).ravel()
+
+
+def _plot_slice(axes, data, mesh, basis, axis_units, window=None, **kwargs):
+    """Draws the oriented slice with imshow, or with pcolormesh on the
+    voxel edges when the voxels of a RectilinearMesh are not uniform."""
+
+    if isinstance(mesh, openmc.RegularMesh):
+        return axes.imshow(
+            data, extent=_get_extent(mesh, basis, axis_units, window), **kwargs
+        )
+
+    horizontal_edges, vertical_edges = _get_slice_edges(mesh, basis, axis_units, window)
+    # imshow only options are dropped and the image aspect ratio is kept
+    kwargs.pop("interpolation", None)
+    axes.set_aspect(kwargs.pop("aspect", "equal"))
+    # the first row of the oriented slice is the top of the plot
+    return axes.pcolormesh(horizontal_edges, vertical_edges, data[::-1], **kwargs)
+
+
+def _get_imshow_kwargs(kwargs, **defaults):
+    """Returns the imshow keyword arguments, where the kwargs given by the
+    user override the defaults."""
+
+    # zero values with logscale produce noise / fuzzy on the time but setting interpolation to none solves this
+    return {"interpolation": "none", **defaults, **kwargs}
+
+
+def _pop_norm(imshow_kwargs):
+    """Removes the norm, or the vmin and vmax, from the imshow keyword
+    arguments and returns them as a single norm that can be shared between
+    images or rescaled later."""
+    import matplotlib.colors
+
+    norm = imshow_kwargs.pop("norm", None)
+    if norm is None:
+        norm = matplotlib.colors.Normalize(
+            vmin=imshow_kwargs.pop("vmin", None),
+            vmax=imshow_kwargs.pop("vmax", None),
+        )
+    return norm
+
+
+def _get_figure(use_pyplot, nrows=1, ncols=1, **kwargs):
+    """Creates a figure and subplots, either through pyplot or as a
+    standalone Figure with an Agg canvas that pyplot knows nothing about."""
+
+    if use_pyplot:
+        import matplotlib.pyplot as plt
+
+        return plt.subplots(nrows, ncols, **kwargs)
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots(nrows, ncols)
+
+
+def _get_axis_labels(basis, axis_units):
+    if basis == "xz":
+        xlabel, ylabel = f"x [{axis_units}]", f"z [{axis_units}]"
+    elif basis == "yz":
+        xlabel, ylabel = f"y [{axis_units}]", f"z [{axis_units}]"
+    else:  # basis == 'xy'
+        xlabel, ylabel = f"x [{axis_units}]", f"y [{axis_units}]"
+    return xlabel, ylabel
+
+
+def _get_outline_pixels(axes, pixels, max_pixels):
+    """Returns the total number of outline pixels, working out the number of
+    screen pixels the axes covers when pixels is 'auto'."""
+
+    if pixels != "auto":
+        cv.check_type("pixels", pixels, int)
+        return pixels
+
+    cv.check_greater_than("max_pixels", max_pixels, 0)
+    # the axes shrinks to the image aspect ratio when the figure is drawn
+    axes.apply_aspect()
+    bbox = axes.get_window_extent()
+    return max(1, min(int(bbox.width * bbox.height), max_pixels))
+
+
+def _get_outline_plot(mesh, basis, slice_index, pixels, outline_by, window=None):
+    """Makes an openmc.Plot that covers the mesh slice, or the window of the
+    mesh slice, so that the geometry outline is in the middle of the mesh
+    voxel."""
+
+    # two of the three dimensions are just in the center of the mesh
+    # but the slice can move one axis off the center so this needs calculating
+    center_of_mesh = mesh.bounding_box.center
+
+    if basis == "xy":
+        zarr = _get_voxel_edges(mesh, 2)
+        center_of_mesh_slice = [
+            center_of_mesh[0],
+            center_of_mesh[1],
+            (zarr[slice_index] + zarr[slice_index + 1]) / 2,
+        ]
+    if basis == "xz":
+        yarr = _get_voxel_edges(mesh, 1)
+        center_of_mesh_slice = [
+            center_of_mesh[0],
+            (yarr[slice_index] + yarr[slice_index + 1]) / 2,
+            center_of_mesh[2],
+        ]
+    if basis == "yz":
+        xarr = _get_voxel_edges(mesh, 0)
+        center_of_mesh_slice = [
+            (xarr[slice_index] + xarr[slice_index + 1]) / 2,
+            center_of_mesh[1],
+            center_of_mesh[2],
+        ]
+
+    if window is None:
+        bb_width = mesh.bounding_box.extent[basis]
+    else:
+        bb_width = _get_window_extent(mesh, basis, window)
+        # moves the in plane center of the plot to the center of the window
+        horizontal_axis, vertical_axis = _BASIS_AXES[basis]
+        center_of_mesh_slice[horizontal_axis] = (bb_width[0] + bb_width[1]) / 2
+        center_of_mesh_slice[vertical_axis] = (bb_width[2] + bb_width[3]) / 2
+
+    plot = openmc.Plot()
+    plot.origin = center_of_mesh_slice
+    plot.width = (bb_width[0] - bb_width[1], bb_width[2] - bb_width[3])
+    aspect_ratio = (bb_width[0] - bb_width[1]) / (bb_width[2] - bb_width[3])
+    pixels_y = math.sqrt(pixels / aspect_ratio)
+    pixels = (int(pixels / pixels_y), int(pixels_y))
+    plot.pixels = pixels
+    plot.basis = basis
+    plot.color_by = outline_by
+    return plot
+
+
+def _get_outline_images(geometry, plots):
+    """Rasterises all the plots in a single OpenMC geometry plotting run and
+    returns an image of combined RGB values for each plot, oriented to match
+    the tally data."""
+
+    model = _get_outline_model(geometry, plots)
+
+    with TemporaryDirectory() as tmpdir:
+        # Run OpenMC in geometry plotting mode
+        model.plot_geometry(False, cwd=tmpdir)
+
+        return _read_outline_images(tmpdir, plots)
+
+
+def _get_outline_model(geometry, plots):
+    model = openmc.Model()
+    model.geometry = geometry
+    for plot in plots:
+        model.plots.append(plot)
+    return model
+
+
+def _read_outline_images(directory, plots):
+    """Reads the images written by an OpenMC geometry plotting run."""
+    import matplotlib.image as mpimg
+
+    image_values = []
+    for plot in plots:
+        # Read image from file
+        img_path = Path(directory) / f"plot_{plot.id}.png"
+        if not img_path.is_file():
+            img_path = img_path.with_suffix(".ppm")
+        img = mpimg.imread(str(img_path))
+
+        # Combine R, G, B values into a single int
+        rgb = (img * 256).astype(int)
+        image_value = (rgb[..., 0] << 16) + (rgb[..., 1] << 8) + (rgb[..., 2])
+
+        image_values.append(np.rot90(image_value, 2))
+
+    return image_values
+
+
+def _set_plot_id_colors(plot, cells):
+    """Colors the plot by cell with a unique color for each of the cells that
+    encodes its position in the cells, counting from 1, and a black
+    background outside of the geometry. The colors have no channel of 255 so
+    _read_outline_images combines them into exactly the encoded number."""
+
+    plot.color_by = "cell"
+    plot.background = (0, 0, 0)
+    plot.colors = {
+        cell: (number // 255**2 % 255, number // 255 % 255, number % 255)
+        for number, cell in enumerate(cells, start=1)
+    }
+
+
+def _get_id_images(image_value, cells):
+    """Decodes an image colored by _set_plot_id_colors into images of cell
+    ids and material ids. Both images are -1 outside of the geometry and the
+    material image is 0 in void cells and -2 in cells without a single
+    material fill."""
+
+    numbers = (
+        (image_value >> 16) * 255**2
+        + (image_value >> 8 & 255) * 255
+        + (image_value & 255)
+    )
+    cell_lut = np.array([-1] + [cell.id for cell in cells])
+    material_lut = np.array([-1] + [_get_material_id(cell) for cell in cells])
+    # pixels with any other color, such as overlaps, match no cell
+    known = numbers < len(cells) + 1
+    numbers = np.where(known, numbers, 0)
+    return {
+        "cell": np.where(known, cell_lut[numbers], -2),
+        "material": np.where(known, material_lut[numbers], -2),
+    }
+
+
+def _get_material_id(cell):
+    if cell.fill is None:
+        return 0
+    if isinstance(cell.fill, openmc.Material):
+        return cell.fill.id
+    return -2
+
+
+def _sample_voxel_centers(image, mesh, basis, window=None):
+    """Samples the image, which covers the slice or window of the slice, at
+    the centers of the voxels."""
+
+    indices = []
+    for axis, (start, stop), size in zip(
+        _BASIS_AXES[basis],
+        window or [(0, mesh.dimension[axis]) for axis in _BASIS_AXES[basis]],
+        [image.shape[1], image.shape[0]],
+    ):
+        edges = _get_voxel_edges(mesh, axis)[start : stop + 1]
+        centers = (edges[:-1] + edges[1:]) / 2
+        fractions = (centers - edges[0]) / (edges[-1] - edges[0])
+        indices.append(np.minimum((fractions * size).astype(int), size - 1))
+    columns, rows = indices
+    # the top row of the image is the largest vertical position
+    rows = image.shape[0] - 1 - rows[::-1]
+    return image[rows[:, np.newaxis], columns]
+
+
+def _get_underlay_image(id_image, ids, colors=None):
+    """Colors an image of cell or material ids with a lookup table of the
+    positive ids, returning an RGBA image that is transparent in void cells,
+    outside of the geometry and where no single material fills the cell."""
+
+    import matplotlib as mpl
+
+    colors = colors or {}
+    lut_ids = np.unique([id for id in ids if id > 0])
+    cmap = mpl.colormaps["tab20"]
+    lut = np.zeros((len(lut_ids) + 1, 4))
+    for position, id in enumerate(lut_ids):
+        lut[position] = mpl.colors.to_rgba(colors.get(id, cmap(position % cmap.N)))
+    # the last row of the lookup table is transparent for unknown ids, which
+    # never match the non-positive id padding the end of the ids
+    positions = np.minimum(np.searchsorted(lut_ids, id_image), len(lut_ids))
+    known = np.append(lut_ids, 0)[positions] == id_image
+    return lut[np.where(known, positions, len(lut_ids))]
+
+
+def _get_id_mask(material_ids, mask):
+    if mask == "void":
+        return material_ids == 0
+    if mask == "outside":
+        return material_ids == -1
+    return np.isin(material_ids, list(mask))
+
+
+def _plot_outline(axes, image_value, extent, outline_kwargs):
+    return axes.contour(
+        image_value,
+        origin="upper",
+        levels=np.unique(image_value),
+        extent=extent,
+        **outline_kwargs,
+    )
+
+
+def _plot_value_contours(
+    axes, data, norm, levels, mesh, basis, axis_units, window, contour_kwargs
+):
+    """Contours the plotted data on the voxel centers of the slice, at the
+    levels or at a number of levels spaced within the limits of the norm."""
+    import matplotlib.colors
+
+    if isinstance(levels, int):
+        cv.check_greater_than("value_contours", levels, 0)
+        # the end points are the limits of the color scale so are left out
+        if isinstance(norm, matplotlib.colors.LogNorm):
+            levels = np.geomspace(norm.vmin, norm.vmax, levels + 2)[1:-1]
+        else:
+            levels = np.linspace(norm.vmin, norm.vmax, levels + 2)[1:-1]
+    else:
+        levels = np.sort(levels)
+
+    horizontal_edges, vertical_edges = _get_slice_edges(mesh, basis, axis_units, window)
+    return axes.contour(
+        (horizontal_edges[:-1] + horizontal_edges[1:]) / 2,
+        (vertical_edges[:-1] + vertical_edges[1:]) / 2,
+        np.ma.masked_invalid(data[::-1]),
+        levels=levels,
+        **contour_kwargs,
+    )
+
+
+def _save_contour_lines(path, contour_set):
+    """Saves the lines of each level of the contour set to a .npz file."""
+    arrays = {"levels": np.asarray(contour_set.levels)}
+    for level_number, lines in enumerate(contour_set.allsegs):
+        for line_number, line in enumerate(lines):
+            arrays[f"level_{level_number}_{line_number}"] = line
+    np.savez(path, **arrays)
+
+
+def _get_tally_slices(mesh, basis, tally, values, score, slice_index, window=None):
+    """Returns a dictionary of oriented 2D slices, one for each of the values,
+    extracted from just the voxels of the tally in the slice and window."""
+
+    _check_mesh_dimension(mesh, basis)
+    if mesh.n_dimension != 3:
+        raise ValueError(
+            f"mesh n_dimension is not 3 but is {mesh.n_dimension} which is not supported"
+        )
+
+    index_range = _get_slice_index_range(mesh.dimension, basis, slice_index, window)
+    tally_blocks = _get_tally_block(mesh, tally, values, score, index_range)
+
+    # the block is the slice of the window so is oriented without cropping
+    return {
+        value: _orient_slice(tally_block, basis, 0)
+        for value, tally_block in tally_blocks.items()
+    }
+
+
+def _get_tally_arrays(mesh, tally, values, score):
+    """Returns a dictionary of 3D arrays indexed by [x, y, z], one for each of
+    the values, extracted from a single slice of the tally."""
+
+    score = _get_score(tally, score)
+
+    tally_slice = tally.get_slice(scores=[score])
+
+    # TODO check if 1 appears twice or three times, raise value error if so
+
+    if mesh.n_dimension != 3:
+        raise ValueError(
+            f"mesh n_dimension is not 3 but is {mesh.n_dimension} which is not supported"
+        )
+
+    tally_arrays = {}
+    for value in values:
+        tally_data = tally_slice.get_reshaped_data(
+            expand_dims=True, value=value
+        )  # .squeeze()
+
+        tally_arrays[value] = _squeeze_end_of_array(tally_data, dims_required=3)
+
+    return tally_arrays
+
+
+def _get_tally_score_slices(mesh, basis, tally, value, scores, slice_index):
+    """Returns a dictionary of oriented 2D slices, one for each of the scores,
+    from a single reshape of the tally data with the scores on the last axis."""
+
+    if mesh.n_dimension != 3:
+        raise ValueError(
+            f"mesh n_dimension is not 3 but is {mesh.n_dimension} which is not supported"
+        )
+    for score in scores:
+        cv.check_value("score", score, tally.scores)
+
+    tally_data = tally.get_reshaped_data(expand_dims=True, value=value)
+    # filters other than the MeshFilter have a single bin so the data can be
+    # viewed as [x, y, z, nuclide, score]
+    tally_data = tally_data.reshape(tuple(mesh.dimension) + (-1, len(tally.scores)))
+    if tally_data.shape[3] != 1:
+        raise ValueError("Only tallies with a single nuclide are supported")
+
+    return {
+        score: _orient_slice(
+            tally_data[:, :, :, 0, tally.scores.index(score)], basis, slice_index
+        )
+        for score in scores
+    }
+
+
+def _get_tally_block(mesh, tally, values, score, index_range):
+    """Returns a dictionary of 3D arrays indexed by [x, y, z], one for each of
+    the values, of the block of voxels within the index_range. Only the rows
+    of the tally results within the block are taken and, when the results of
+    the tally have not been loaded from its statepoint yet, only those rows
+    are read from the statepoint file."""
+
+    score = _get_score(tally, score)
+    cv.check_value("score", score, tally.scores)
+    if len(tally.nuclides) != 1:
+        raise ValueError("Only tallies with a single nuclide are supported")
+    column = tally.scores.index(score)
+    _check_single_bin_filters(tally.filters)
+
+    statepoint = _get_unread_statepoint(tally)
+    if statepoint is not None:
+        sums, sums_sq = _read_statepoint_block(
+            statepoint, tally.id, mesh.dimension, index_range, column
+        )
+    else:
+        rows = _get_block_mesh_indices(mesh.dimension, index_range)
+        sums = tally.sum
+        if sums is not None:
+            sums = sums[rows, 0, column]
+            sums_sq = tally.sum_sq[rows, 0, column]
+
+    if sums is None:
+        # derived tallies only have the mean and std_dev
+        if {"sum", "sum_sq"}.intersection(values):
+            raise ValueError("The sum and sum_sq of a derived tally are unknown")
+        mean = tally.mean[rows, 0, column]
+        std_dev = tally.std_dev[rows, 0, column]
+        block = {"mean": mean, "std_dev": std_dev}
+    else:
+        mean, std_dev = _get_mean_and_std_dev(sums, sums_sq, tally.num_realizations)
+        block = {"mean": mean, "std_dev": std_dev, "sum": sums, "sum_sq": sums_sq}
+    if "rel_err" in values:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            block["rel_err"] = std_dev / mean
+
+    shape = [stop - start for start, stop in index_range]
+    return {value: block[value].reshape(shape, order="F") for value in values}
+
+
+def _check_single_bin_filters(filters, mesh_filter_type=openmc.MeshFilter):
+    """Checks that the filters other than the mesh filter have a single bin,
+    so the filter bin of each row of the tally results is its flat mesh
+    index. The filters of openmc.lib tallies, which count their bins with
+    n_bins, are also accepted along with the openmc.lib.MeshFilter type."""
+
+    for tally_filter in filters:
+        if isinstance(tally_filter, mesh_filter_type):
+            continue
+        num_bins = getattr(tally_filter, "num_bins", None)
+        if num_bins is None:
+            num_bins = tally_filter.n_bins
+        if num_bins != 1:
+            msg = (
+                f"The tally {type(tally_filter).__name__} has {num_bins} bins. "
+                "Filters other than the MeshFilter must have a single bin, "
+                "otherwise the results of their bins would be combined in the "
+                "mesh voxels."
+            )
+            raise ValueError(msg)
+
+
+def _get_unread_statepoint(tally):
+    """Returns the path of the statepoint the tally was read from when its
+    results have not been loaded into memory yet, otherwise None, in which
+    case the results are taken from the public Tally.sum and Tally.sum_sq.
+
+    This is the only place that relies on the private _sp_filename and
+    _results_read attributes that openmc.Tally uses to load its results
+    lazily, which were checked against OpenMC 0.13 to 0.15. When either is
+    missing or is not of the expected type the public results are used."""
+
+    statepoint = getattr(tally, "_sp_filename", None)
+    results_read = getattr(tally, "_results_read", None)
+    if not isinstance(statepoint, (str, os.PathLike)):
+        return None
+    if not isinstance(results_read, bool) or results_read:
+        return None
+    if getattr(tally, "derived", False) or not Path(statepoint).is_file():
+        return None
+    return statepoint
+
+
+def _read_statepoint_block(statepoint, tally_id, dimension, index_range, column):
+    """Reads the sum and sum_sq of the voxels in the block, with x varying
+    fastest, from the results of the tally in the statepoint. Each z layer of
+    the block is read as one hyperslab of the rows of its y range, so only
+    the block is ever held in memory."""
+    import h5py
+
+    (i0, i1), (j0, j1), (k0, k1) = index_range
+    nx, ny, _ = dimension
+    with h5py.File(statepoint, "r") as f:
+        results = f[f"tallies/tally {tally_id}/results"]
+        layers = [
+            results[
+                h5py.MultiBlockSlice(
+                    start=i0 + j0 * nx + k * nx * ny,
+                    stride=nx,
+                    count=j1 - j0,
+                    block=i1 - i0,
+                ),
+                column,
+                :,
+            ]
+            for k in range(k0, k1)
+        ]
+    block = np.concatenate(layers)
+    return block[:, 0], block[:, 1]
+
+
+def _get_block_mesh_indices(dimension, index_range):
+    """Returns the sorted flat mesh indices of the voxels in the block, with
+    x varying fastest."""
+
+    voxels = np.meshgrid(
+        *[range(*axis_range) for axis_range in index_range], indexing="ij"
+    )
+    return np.ravel_multi_index(voxels, dimension, order="F").ravel(order="F")
+
+
+def _get_slice_mesh_indices(dimension, basis, slice_index):
+    """Returns the sorted flat mesh indices of the voxels in the slice, with
+    x varying fastest."""
+
+    return _get_block_mesh_indices(
+        dimension, _get_slice_index_range(dimension, basis, slice_index)
+    )
+
+
+def _get_slice_index_range(dimension, basis, slice_index, window=None):
+    """Returns the index_range of the block of voxels in the slice, or in the
+    window of the slice."""
+
+    basis_to_index = {"xy": 2, "xz": 1, "yz": 0}[basis]
+    index_range = [(0, size) for size in dimension]
+    index_range[basis_to_index] = (slice_index, slice_index + 1)
+    if window is not None:
+        for axis, axis_range in zip(_BASIS_AXES[basis], window):
+            index_range[axis] = tuple(axis_range)
+    return index_range
+
+
+def _check_index_range(mesh, index_range):
+    """Checks the ((i0, i1), (j0, j1), (k0, k1)) index_range is within the
+    mesh and returns it as a list of tuples."""
+
+    cv.check_length("index_range", index_range, 3, 3)
+    checked = []
+    for axis, axis_range in enumerate(index_range):
+        cv.check_length("index_range", axis_range, 2, 2)
+        start, stop = axis_range
+        if not 0 <= start < stop <= mesh.dimension[axis]:
+            msg = (
+                f"index_range {index_range} must have 0 <= start < stop <= "
+                f"{mesh.dimension[axis]} along axis {axis}"
+            )
+            raise ValueError(msg)
+        checked.append((int(start), int(stop)))
+    return checked
+
+
+def _crop_window(mesh, basis, window, index_range):
+    """Crops the window, which may be None for the whole slice, to the in
+    plane ranges of the index_range."""
+
+    cropped = []
+    for axis, axis_range in zip(_BASIS_AXES[basis], window or [None, None]):
+        start, stop = index_range[axis]
+        if axis_range is not None:
+            start, stop = max(start, axis_range[0]), min(stop, axis_range[1])
+        if start >= stop:
+            raise ValueError(
+                f"The region does not overlap the index_range {index_range}"
+            )
+        cropped.append((start, stop))
+    return cropped
+
+
+def _get_mean_and_std_dev(sums, sums_sq, num_realizations):
+    """Derives the mean and std_dev from the accumulated sum and sum of
+    squares of the realizations."""
+
+    n = num_realizations
+    if n == 0:
+        return np.zeros_like(sums), np.zeros_like(sums)
+    mean = sums / n
+    if n > 1:
+        variance = (sums_sq / n - mean**2) / (n - 1)
+        std_dev = np.sqrt(np.clip(variance, 0, None))
+    else:
+        std_dev = np.zeros_like(mean)
+    return mean, std_dev
+
+
+def _get_score(tally, score):
+    # if score is not specified and tally has a single score then we know which score to use
+    if score is None:
+        if len(tally.scores) == 1:
+            score = tally.scores[0]
+        else:
+            msg = "score was not specified and there are multiple scores in the tally."
+            raise ValueError(msg)
+    return score
+
+
+def _check_mesh_dimension(mesh, basis):
+    if 1 in mesh.dimension:
+        index_of_2d = mesh.dimension.index(1)
+        axis_of_2d = {0: "x", 1: "y", 2: "z"}[index_of_2d]
+        if (
+            axis_of_2d in basis
+        ):  # checks if the axis is being plotted, e.g is 'x' in 'xy'
+            raise ValueError(
+                "The selected tally has a mesh that has 1 dimension in the "
+                f"{axis_of_2d} axis, minimum of 2 needed to plot with a basis "
+                f"of {basis}."
+            )
+
+
+def _sum_tally_data(tally, get_data):
+    """Calls get_data for the tally, or for each tally in a sequence of
+    tallies, and adds the resulting dictionaries of arrays together."""
+
+    if not isinstance(tally, typing.Sequence):
+        return get_data(tally)
+
+    for counter, one_tally in enumerate(tally):
+        new_data = get_data(one_tally)
+        if counter == 0:
+            combined = {key: np.zeros(shape=val.shape) for key, val in new_data.items()}
+        for key, val in new_data.items():
+            combined[key] = combined[key] + val
+    return combined
+
+
+def _get_index_of_point(mesh, point):
+    """Finds the [x, y, z] indices of the mesh voxel that contains the point."""
+
+    indices = []
+    for axis, coordinate in enumerate(point):
+        edges = _get_voxel_edges(mesh, axis)
+        lower, upper = edges[0], edges[-1]
+        if coordinate < lower or coordinate > upper:
+            msg = (
+                f"point {'xyz'[axis]} value [{coordinate}] is outside of the "
+                f"mesh which spans from {lower} to {upper}"
+            )
+            raise ValueError(msg)
+        index = int(np.searchsorted(edges, coordinate, side="right")) - 1
+        # points on the upper boundary belong to the last voxel
+        indices.append(min(index, len(edges) - 2))
+    return indices
+
+
+def _orient_slice(tally_data, basis, slice_index, window=None):
+    """Takes a slice of a 3D array indexed by [x, y, z], crops it to the
+    window and orients it so that it can be displayed with imshow."""
+
+    if basis == "xz":
+        slice_data = tally_data[:, slice_index, :]
+    elif basis == "yz":
+        slice_data = tally_data[slice_index, :, :]
+    else:  # basis == 'xy'
+        slice_data = tally_data[:, :, slice_index]
+
+    if window is not None:
+        (start_h, stop_h), (start_v, stop_v) = window
+        slice_data = slice_data[start_h:stop_h, start_v:stop_v]
+
+    if basis == "xy":
+        data = np.rot90(slice_data, -3)
+    else:
+        data = np.flip(np.rot90(slice_data, -1))
+    return data
+
+
+def _normalize_data(
+    data,
+    mesh,
+    volume_normalization,
+    scaling_factor,
+    basis=None,
+    slice_index=None,
+    window=None,
+    copy=True,
+):
+    """Divides the data by the voxel volumes and applies the scaling factor.
+    The data is either a 3D array indexed by [x, y, z] or an oriented slice,
+    in which case the basis and slice_index are needed for a RectilinearMesh.
+    Without copy the float data is modified in place and returned."""
+
+    divisors = []
+    if volume_normalization:
+        if isinstance(mesh, openmc.RegularMesh):
+            # in a regular mesh all volumes are the same so the volume of one
+            # voxel is found without making the array of all the volumes
+            divisors = [np.prod(mesh.width)]
+        elif np.ndim(data) == 3:
+            # the widths along each axis are broadcast against the data
+            widths = [_get_voxel_widths(mesh, axis) for axis in range(3)]
+            divisors = [
+                widths[0][:, np.newaxis, np.newaxis],
+                widths[1][np.newaxis, :, np.newaxis],
+                widths[2][np.newaxis, np.newaxis, :],
+            ]
+        else:
+            divisors = [_get_slice_volumes(mesh, basis, slice_index, window)]
+
+    for divisor in divisors:
+        if copy:
+            data = data / divisor
+        else:
+            data /= divisor
+
+    if scaling_factor:
+        if copy:
+            data = data * scaling_factor
+        else:
+            data *= scaling_factor
+    return data
+
+
+def _get_slice_volumes(mesh, basis, slice_index, window=None):
+    """Returns the voxel volumes of the slice oriented like the data."""
+
+    horizontal_axis, vertical_axis = _BASIS_AXES[basis]
+    normal_axis = ({0, 1, 2} - {horizontal_axis, vertical_axis}).pop()
+    if window is None:
+        window = [
+            (0, mesh.dimension[horizontal_axis]),
+            (0, mesh.dimension[vertical_axis]),
+        ]
+    (start_h, stop_h), (start_v, stop_v) = window
+    horizontal_widths = _get_voxel_widths(mesh, horizontal_axis)[start_h:stop_h]
+    # the top row of the image is the largest vertical index
+    vertical_widths = _get_voxel_widths(mesh, vertical_axis)[start_v:stop_v][::-1]
+    normal_width = _get_voxel_widths(mesh, normal_axis)[slice_index]
+    return np.outer(vertical_widths * normal_width, horizontal_widths)
+
+
+def _get_relative_error(mean, std_dev):
+    """Derives the relative error from the mean and std_dev. Voxels with a
+    zero mean have no statistical information so are given an infinite
+    relative error."""
+    return np.divide(
+        std_dev,
+        np.abs(mean),
+        out=np.full(np.shape(mean), np.inf),
+        where=mean != 0,
+    )
+
+
+def _check_meshes_match(mesh_a, mesh_b):
+    """Checks that two meshes have the same voxels, meshes read from
+    different statepoints can match without being the same object."""
+
+    if tuple(mesh_a.dimension) != tuple(mesh_b.dimension) or not all(
+        np.allclose(_get_voxel_edges(mesh_a, axis), _get_voxel_edges(mesh_b, axis))
+        for axis in range(3)
+    ):
+        msg = (
+            f"The meshes do not match, mesh {mesh_a.id} has dimension "
+            f"{mesh_a.dimension} from {mesh_a.lower_left} to "
+            f"{mesh_a.upper_right} and mesh {mesh_b.id} has dimension "
+            f"{mesh_b.dimension} from {mesh_b.lower_left} to {mesh_b.upper_right}"
+        )
+        raise ValueError(msg)
+
+
+def _compare_data(mean_a, std_dev_a, mean_b, std_dev_b, mode):
+    """Compares the mean values of two independent tallies and propagates
+    their standard deviations. Ratios are nan where mean_b is zero."""
+
+    if mode == "diff":
+        return mean_a - mean_b, np.sqrt(std_dev_a**2 + std_dev_b**2)
+
+    nonzero = mean_b != 0
+    ratio = np.divide(
+        mean_a, mean_b, out=np.full(np.shape(mean_b), np.nan), where=nonzero
+    )
+    # d(a/b) = da / b - a db / b**2, written so that a zero mean_a is safe
+    std_dev = np.divide(
+        np.sqrt(std_dev_a**2 + (ratio * std_dev_b) ** 2),
+        np.abs(mean_b),
+        out=np.full(np.shape(mean_b), np.nan),
+        where=nonzero,
+    )
+    if mode == "ratio":
+        return ratio, std_dev
+    # mode == 'rel_diff'
+    return ratio - 1, std_dev
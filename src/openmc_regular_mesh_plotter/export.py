@@ -0,0 +1,179 @@
+import typing
+from pathlib import Path
+
+import openmc
+import openmc.checkvalue as cv
+
+from .core import (
+    _BASES,
+    _BASIS_AXES,
+    _check_index_range,
+    _check_mesh_dimension,
+    _get_axis_labels,
+    _get_extent,
+    _get_mesh,
+    _get_slice_edges,
+    _get_tally_block,
+    _normalize_data,
+    _orient_slice,
+    _sum_tally_data,
+)
+
+__all__ = ["export_mesh_tally"]
+
+# the largest number of voxels read from the tally at a time
+_CHUNK_VOXELS = 1000000
+
+
+def export_mesh_tally(
+    tally: typing.Union["openmc.Tally", typing.Sequence["openmc.Tally"]],
+    path: typing.Union[str, Path],
+    bases: typing.Sequence[str] = ("xy", "xz", "yz"),
+    values: typing.Sequence[str] = ("mean", "std_dev"),
+    score: typing.Optional[str] = None,
+    axis_units: str = "cm",
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    compression: str = "gzip",
+    compression_opts: typing.Optional[int] = 4,
+    index_range: typing.Optional[typing.Sequence[typing.Sequence[int]]] = None,
+) -> Path:
+    """Writes every slice of the mesh tally, oriented, normalised and scaled
+    in the same way as the plotted data, to a HDF5 file.
+
+    Each basis and value is stored as a dataset at "<basis>/<value>" with a
+    shape of (number of slices, rows, columns) that is chunked by slice, so a
+    single slice can be read without loading the rest. The tally results are
+    read and written in chunks of slices, so only a chunk is held in memory.
+    Parameters
+    ----------
+    tally : openmc.Tally
+        The openmc tally to export. Tally must contain a MeshFilter that uses a RegularMesh.
+    path : str or pathlib.Path
+        The HDF5 file to write
+    bases : sequence of {'xy', 'xz', 'yz'}
+        The basis directions to export slices for
+    values : sequence of str
+        The types of value to export - 'mean', 'std_dev', 'rel_err', 'sum',
+        or 'sum_sq' are accepted
+    score : str
+        Score to export, e.g. 'flux'
+    axis_units : {'km', 'm', 'cm', 'mm'}
+        Units used for the extent stored with each dataset
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to exporting.
+    compression : str
+        The h5py compression filter applied to each dataset
+    compression_opts : int
+        The options for the compression filter, the gzip level by default
+    index_range : tuple of tuples of ints
+        The ((i0, i1), (j0, j1), (k0, k1)) block of mesh voxels to export,
+        with the stop indices excluded. Only the voxels of the block are
+        taken from the tally results and the slices of each basis are those
+        within the block.
+    Returns
+    -------
+    pathlib.Path
+        The path of the HDF5 file written
+    """
+    import h5py
+
+    for basis in bases:
+        cv.check_value("basis", basis, _BASES)
+    for value in values:
+        cv.check_value("value", value, ["mean", "std_dev", "rel_err", "sum", "sum_sq"])
+    cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
+    cv.check_type("volume_normalization", volume_normalization, bool)
+
+    mesh = _get_mesh(tally)
+    for basis in bases:
+        _check_mesh_dimension(mesh, basis)
+    if index_range is None:
+        index_range = [(0, size) for size in mesh.dimension]
+    else:
+        index_range = _check_index_range(mesh, index_range)
+
+    if score is None:
+        first_tally = tally[0] if isinstance(tally, typing.Sequence) else tally
+        if len(first_tally.scores) != 1:
+            msg = "score was not specified and there are multiple scores in the tally."
+            raise ValueError(msg)
+        score = first_tally.scores[0]
+
+    basis_to_index = {"xy": 2, "xz": 1, "yz": 0}
+
+    path = Path(path)
+    with h5py.File(path, "w") as f:
+        f.attrs["score"] = score
+        f.attrs["mesh_id"] = mesh.id
+        f.attrs["mesh_dimension"] = list(mesh.dimension)
+        f.attrs["mesh_lower_left"] = list(mesh.lower_left)
+        f.attrs["mesh_upper_right"] = list(mesh.upper_right)
+        f.attrs["index_range"] = index_range
+        f.attrs["axis_units"] = axis_units
+        f.attrs["volume_normalization"] = volume_normalization
+        if scaling_factor:
+            f.attrs["scaling_factor"] = scaling_factor
+
+        for basis in bases:
+            normal_axis = basis_to_index[basis]
+            start, stop = index_range[normal_axis]
+            window = [index_range[axis] for axis in _BASIS_AXES[basis]]
+            (h_start, h_stop), (v_start, v_stop) = window
+            slice_shape = (v_stop - v_start, h_stop - h_start)
+
+            xlabel, ylabel = _get_axis_labels(basis, axis_units)
+            datasets = {}
+            for value in values:
+                dataset = f.require_group(basis).create_dataset(
+                    value,
+                    shape=(stop - start,) + slice_shape,
+                    dtype=float,
+                    chunks=(1,) + slice_shape,
+                    compression=compression,
+                    compression_opts=compression_opts,
+                )
+                dataset.attrs["extent"] = _get_extent(mesh, basis, axis_units, window)
+                dataset.attrs["first_slice_index"] = start
+                dataset.attrs["xlabel"] = xlabel
+                dataset.attrs["ylabel"] = ylabel
+                if isinstance(mesh, openmc.RectilinearMesh):
+                    # the extent alone does not describe graded voxels
+                    horizontal_edges, vertical_edges = _get_slice_edges(
+                        mesh, basis, axis_units, window
+                    )
+                    dataset.attrs["horizontal_edges"] = horizontal_edges
+                    dataset.attrs["vertical_edges"] = vertical_edges
+                datasets[value] = dataset
+
+            # the index_range is narrowed to a chunk of slices along the normal
+            # of the basis, which is all that is read from the tally at a time
+            chunk_size = max(1, _CHUNK_VOXELS // (slice_shape[0] * slice_shape[1]))
+            for chunk_start in range(start, stop, chunk_size):
+                chunk_stop = min(chunk_start + chunk_size, stop)
+                chunk_range = list(index_range)
+                chunk_range[normal_axis] = (chunk_start, chunk_stop)
+                chunk = _sum_tally_data(
+                    tally,
+                    lambda one_tally: _get_tally_block(
+                        mesh, one_tally, values, score, chunk_range
+                    ),
+                )
+
+                for value, dataset in datasets.items():
+                    for slice_index in range(chunk_start, chunk_stop):
+                        dataset[slice_index - start] = _normalize_data(
+                            _orient_slice(
+                                chunk[value], basis, slice_index - chunk_start
+                            ),
+                            mesh,
+                            volume_normalization,
+                            scaling_factor,
+                            basis,
+                            slice_index,
+                            window,
+                        )
+
+    return path
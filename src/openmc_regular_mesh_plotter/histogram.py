@@ -0,0 +1,335 @@
+import typing
+
+import numpy as np
+import openmc
+import openmc.checkvalue as cv
+
+from .core import (
+    _get_figure,
+    _get_id_images,
+    _get_mesh,
+    _get_outline_images,
+    _get_outline_plot,
+    _get_relative_error,
+    _get_score,
+    _get_tally_block,
+    _get_voxel_widths,
+    _sample_voxel_centers,
+    _set_plot_id_colors,
+)
+
+__all__ = ["get_mesh_tally_histogram", "plot_mesh_tally_histogram"]
+
+
+def get_mesh_tally_histogram(
+    tally: "openmc.Tally",
+    bins: typing.Union[int, typing.Sequence[float]] = 50,
+    score: typing.Optional[str] = None,
+    value: str = "mean",
+    value_range: typing.Optional[typing.Tuple[float, float]] = None,
+    log_bins: bool = False,
+    by_material: bool = False,
+    geometry: typing.Optional["openmc.Geometry"] = None,
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    chunk_size: typing.Optional[int] = None,
+) -> typing.Tuple["numpy.ndarray", dict, dict]:
+    """Bins the values of every voxel of the mesh tally by the voxel volume,
+    optionally split by the material at the center of each voxel.
+
+    The mesh is walked in chunks of z layers, which are contiguous in the
+    tally results, so only one chunk of values is held in memory at a time.
+    When the results of a tally read from a statepoint have not been
+    accessed yet, each chunk is read directly from the statepoint file
+    instead of loading the full results. With an integer number of bins and
+    no value_range the mesh is walked twice, first to find the range.
+    Parameters
+    ----------
+    tally : openmc.Tally
+        The openmc tally to bin. Tally must contain a MeshFilter that uses a
+        RegularMesh or RectilinearMesh.
+    bins : int or sequence of floats
+        The number of bins or the bin edges.
+    score : str
+        Score to bin, e.g. 'flux'
+    value : {'mean', 'std_dev', 'rel_err'}
+        The type of value to bin
+    value_range : tuple of floats
+        The (min, max) values covered by the bins when bins is an int.
+    log_bins : bool
+        Whether the bins are logarithmically spaced when bins is an int.
+    by_material : bool
+        Whether to make a histogram for each material rather than one for
+        the whole mesh. Voxels with a void or no material at the center are
+        left out.
+    geometry : openmc.Geometry
+        The geometry used to find the material of each voxel.
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to binning.
+    chunk_size : int
+        The number of z layers in each chunk. Defaults to the number of
+        layers in about a million voxels.
+    Returns
+    -------
+    numpy.ndarray
+        The bin edges
+    dict
+        The volume of the voxels in each bin, by material id when
+        by_material is set otherwise under the key "all"
+    dict
+        The total volume of the voxels of each material id, or "all",
+        including the voxels with values outside of the bins
+    """
+
+    cv.check_value("value", value, ["mean", "std_dev", "rel_err"])
+    cv.check_type("volume_normalization", volume_normalization, bool)
+    cv.check_type("by_material", by_material, bool)
+    if by_material and geometry is None:
+        raise ValueError("A geometry is needed to split the histogram by_material")
+
+    mesh = _get_mesh(tally)
+    if mesh.n_dimension != 3:
+        raise ValueError(
+            f"mesh n_dimension is not 3 but is {mesh.n_dimension} which is not supported"
+        )
+    nx, ny, nz = mesh.dimension
+    if chunk_size is None:
+        chunk_size = max(1, 1000000 // (nx * ny))
+    cv.check_greater_than("chunk_size", chunk_size, 0)
+
+    chunks = lambda: _iter_histogram_chunks(
+        tally, mesh, score, value, volume_normalization, scaling_factor, chunk_size
+    )
+
+    if isinstance(bins, int):
+        if value_range is None:
+            value_range = (np.inf, -np.inf)
+            for _, values, _ in chunks():
+                values = values[np.isfinite(values)]
+                if log_bins:
+                    values = values[values > 0]
+                if values.size:
+                    value_range = (
+                        min(value_range[0], values.min()),
+                        max(value_range[1], values.max()),
+                    )
+            if value_range[0] > value_range[1]:
+                raise ValueError("There are no values that can be binned")
+        if log_bins:
+            edges = np.geomspace(value_range[0], value_range[1], bins + 1)
+        else:
+            edges = np.linspace(value_range[0], value_range[1], bins + 1)
+    else:
+        edges = np.asarray(bins, dtype=float)
+    num_bins = len(edges) - 1
+
+    if by_material:
+        cells = list(geometry.get_all_cells().values())
+        groups = np.array(sorted(geometry.get_all_materials()))
+    else:
+        groups = np.array(["all"], dtype=object)
+
+    histograms = np.zeros((len(groups), num_bins))
+    volumes = np.zeros(len(groups))
+    for layers, values, voxel_volumes in chunks():
+        if by_material:
+            material_ids = _get_material_ids(geometry, cells, mesh, layers)
+            group_indices = np.searchsorted(groups, material_ids)
+            group_indices = np.minimum(group_indices, len(groups) - 1)
+            # void, outside and unknown voxels match no material
+            in_group = groups[group_indices] == material_ids
+        else:
+            group_indices = np.zeros(values.shape, dtype=int)
+            in_group = np.ones(values.shape, dtype=bool)
+
+        volumes += np.bincount(
+            group_indices[in_group],
+            weights=voxel_volumes[in_group],
+            minlength=len(groups),
+        )
+
+        # the last bin includes its upper edge, as with numpy.histogram
+        bin_indices = np.searchsorted(edges, values, side="right") - 1
+        bin_indices[values == edges[-1]] = num_bins - 1
+        binned = in_group & (bin_indices >= 0) & (bin_indices < num_bins)
+        histograms += np.bincount(
+            group_indices[binned] * num_bins + bin_indices[binned],
+            weights=voxel_volumes[binned],
+            minlength=len(groups) * num_bins,
+        ).reshape(len(groups), num_bins)
+
+    return (
+        edges,
+        dict(zip(groups.tolist(), histograms)),
+        dict(zip(groups.tolist(), volumes)),
+    )
+
+
+def plot_mesh_tally_histogram(
+    tally: "openmc.Tally",
+    bins: typing.Union[int, typing.Sequence[float]] = 50,
+    score: typing.Optional[str] = None,
+    value: str = "mean",
+    value_range: typing.Optional[typing.Tuple[float, float]] = None,
+    log_bins: bool = False,
+    cumulative: bool = True,
+    by_material: bool = False,
+    geometry: typing.Optional["openmc.Geometry"] = None,
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    chunk_size: typing.Optional[int] = None,
+    axes: typing.Optional["matplotlib.axes.Axes"] = None,
+    use_pyplot: bool = True,
+    **kwargs,
+) -> "matplotlib.axes.Axes":
+    """Plots the fraction of the mesh volume in each bin of values of the
+    mesh tally, or with the cumulative option the fraction of the volume at
+    or above each value, optionally with a line for each material.
+
+    The histogram is made with :func:`get_mesh_tally_histogram`, which walks
+    the mesh in chunks.
+    Parameters
+    ----------
+    tally : openmc.Tally
+        The openmc tally to plot. Tally must contain a MeshFilter that uses a
+        RegularMesh or RectilinearMesh.
+    bins : int or sequence of floats
+        The number of bins or the bin edges.
+    score : str
+        Score to plot, e.g. 'flux'
+    value : {'mean', 'std_dev', 'rel_err'}
+        The type of value to plot
+    value_range : tuple of floats
+        The (min, max) values covered by the bins when bins is an int.
+    log_bins : bool
+        Whether the bins are logarithmically spaced, and the value axis log
+        scaled, when bins is an int.
+    cumulative : bool
+        Whether to plot the fraction of the volume at or above the lower edge
+        of each bin rather than in each bin.
+    by_material : bool
+        Whether to plot a line for each material rather than one for the
+        whole mesh, with fractions of the volume of each material.
+    geometry : openmc.Geometry
+        The geometry used to find the material of each voxel.
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to ploting.
+    chunk_size : int
+        The number of z layers in each chunk.
+    axes : matplotlib.Axes
+        Axes to draw to
+    use_pyplot : bool
+        Whether a new figure is created with pyplot, when axes is not given,
+        or as a standalone matplotlib.figure.Figure with an Agg canvas.
+    **kwargs
+        Keyword arguments passed to :func:`matplotlib.pyplot.stairs`.
+    Returns
+    -------
+    matplotlib.axes.Axes
+        The axes of the plot
+    """
+
+    edges, histograms, volumes = get_mesh_tally_histogram(
+        tally,
+        bins=bins,
+        score=score,
+        value=value,
+        value_range=value_range,
+        log_bins=log_bins,
+        by_material=by_material,
+        geometry=geometry,
+        volume_normalization=volume_normalization,
+        scaling_factor=scaling_factor,
+        chunk_size=chunk_size,
+    )
+
+    if axes is None:
+        fig, axes = _get_figure(use_pyplot)
+        axes.set_xlabel(f"{_get_score(tally, score)} {value}")
+        if cumulative:
+            axes.set_ylabel("volume fraction at or above value")
+        else:
+            axes.set_ylabel("volume fraction")
+
+    if by_material:
+        materials = geometry.get_all_materials()
+
+    for group, histogram in histograms.items():
+        if volumes[group] == 0:
+            continue
+        fractions = histogram / volumes[group]
+        if cumulative:
+            fractions = np.cumsum(fractions[::-1])[::-1]
+        if by_material:
+            label = materials[group].name or f"Material {group}"
+        else:
+            label = None
+        axes.stairs(fractions, edges, label=label, **kwargs)
+
+    if log_bins:
+        axes.set_xscale("log")
+    if by_material:
+        axes.legend()
+
+    return axes
+
+
+def _iter_histogram_chunks(
+    tally, mesh, score, value, volume_normalization, scaling_factor, chunk_size
+):
+    """Yields the z layers of each chunk with the flat values and volumes of
+    their voxels, in the order of the tally results with x varying fastest.
+    Each chunk is read from the statepoint when the results of the tally have
+    not been loaded, and derived tallies fall back on their mean and std_dev."""
+
+    nx, ny, nz = mesh.dimension
+    widths = [_get_voxel_widths(mesh, axis) for axis in range(3)]
+    layer_volumes = np.outer(widths[0], widths[1]).ravel(order="F")
+
+    for start in range(0, nz, chunk_size):
+        layers = range(start, min(start + chunk_size, nz))
+        # whole z layers are a contiguous block of the tally results
+        index_range = ((0, nx), (0, ny), (start, layers.stop))
+        block = _get_tally_block(mesh, tally, ["mean", "std_dev"], score, index_range)
+        mean = block["mean"].ravel(order="F")
+        std_dev = block["std_dev"].ravel(order="F")
+
+        voxel_volumes = np.concatenate(
+            [layer_volumes * widths[2][layer] for layer in layers]
+        )
+
+        if value == "rel_err":
+            values = _get_relative_error(mean, std_dev)
+        else:
+            values = {"mean": mean, "std_dev": std_dev}[value]
+            if volume_normalization:
+                values = values / voxel_volumes
+            if scaling_factor:
+                values = values * scaling_factor
+
+        yield layers, values, voxel_volumes
+
+
+def _get_material_ids(geometry, cells, mesh, layers):
+    """Finds the material at the center of each voxel of the z layers, in the
+    order of the tally results, from one geometry plotting run."""
+
+    nx, ny, _ = mesh.dimension
+    plots = []
+    for layer in layers:
+        plot = _get_outline_plot(mesh, "xy", layer, 9 * nx * ny, "cell")
+        # three pixels along each voxel puts the middle pixel on the center
+        plot.pixels = (3 * nx, 3 * ny)
+        _set_plot_id_colors(plot, cells)
+        plots.append(plot)
+
+    material_ids = []
+    for image_value in _get_outline_images(geometry, plots):
+        image = _get_id_images(image_value, cells)["material"]
+        # the sampled image is oriented for display with y decreasing down
+        material_ids.append(np.rot90(_sample_voxel_centers(image, mesh, "xy"), -1))
+    return np.stack(material_ids, axis=2).ravel(order="F")
@@ -0,0 +1,433 @@
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import openmc.checkvalue as cv
+
+from .core import (
+    _BASES,
+    _default_outline_kwargs,
+    _check_mesh_dimension,
+    _check_regular_mesh,
+    _get_axis_labels,
+    _get_extent,
+    _get_imshow_kwargs,
+    _get_mesh,
+    _get_outline_images,
+    _get_outline_pixels,
+    _get_outline_plot,
+    _get_tally_arrays,
+    _normalize_data,
+    _orient_slice,
+    _plot_outline,
+    _pop_norm,
+    _sum_tally_data,
+)
+
+__all__ = ["MeshTallyBrowser", "browse_mesh_tally"]
+
+_BASIS_TO_INDEX = {"xy": 2, "xz": 1, "yz": 0}
+
+
+def browse_mesh_tally(
+    tally: typing.Union["openmc.Tally", typing.Sequence["openmc.Tally"]],
+    basis: str = "xy",
+    slice_index: typing.Optional[int] = None,
+    score: typing.Optional[str] = None,
+    axis_units: str = "cm",
+    value: str = "mean",
+    outline: bool = False,
+    outline_by: str = "cell",
+    geometry: typing.Optional["openmc.Geometry"] = None,
+    pixels: typing.Union[int, str] = 40000,
+    colorbar: bool = True,
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    colorbar_kwargs: dict = {},
+    outline_kwargs: dict = _default_outline_kwargs,
+    widgets: str = "matplotlib",
+    outlines_per_run: int = 16,
+    max_pixels: int = 1000000,
+    **kwargs,
+) -> "MeshTallyBrowser":
+    """Display an interactive slice plot of the mesh tally score with
+    controls for the basis and slice index.
+    Parameters
+    ----------
+    tally : openmc.Tally
+        The openmc tally to plot. Tally must contain a MeshFilter that uses a RegularMesh.
+    basis : {'xy', 'xz', 'yz'}
+        The basis directions to start the browser on
+    slice_index : int
+        The mesh index to start the browser on
+    score : str
+        Score to plot, e.g. 'flux'
+    axis_units : {'km', 'm', 'cm', 'mm'}
+        Units used on the plot axis
+    value : str
+        A string for the type of value to return  - 'mean' (default),
+        'std_dev', 'rel_err', 'sum', or 'sum_sq' are accepted
+    outline : True
+        If set then an outline will be added to the plot. The outline can be
+        by cell or by material.
+    outline_by : {'cell', 'material'}
+        Indicate whether the plot should be colored by cell or by material
+    geometry : openmc.Geometry
+        The geometry to use for the outline.
+    pixels : int or 'auto'
+        This sets the total number of pixels in each outline and the number of
+        pixels in each basis direction is calculated from this total and
+        the image aspect ratio. If set to 'auto' then the total matches the
+        number of screen pixels covered by the axes at the figure dpi,
+        limited to max_pixels.
+    colorbar : bool
+        Whether or not to add a colorbar to the plot.
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to ploting.
+    colorbar_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.colorbar.Colorbar`.
+    outline_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.pyplot.contour`. Defaults
+        to "colors": "black", "linestyles": "solid", "linewidths": 1
+    widgets : {'matplotlib', 'ipywidgets'}
+        The widget toolkit used for the controls. ipywidgets needs the
+        ipywidgets package and an interactive backend such as ipympl.
+    outlines_per_run : int
+        The number of slice outlines rasterised by each background OpenMC
+        geometry plotting run.
+    max_pixels : int
+        The largest total number of outline pixels used when pixels is 'auto'.
+    **kwargs
+        Keyword arguments passed to :func:`matplotlib.pyplot.imshow`. Defaults
+        to {"interpolation", "none"}.
+    Returns
+    -------
+    MeshTallyBrowser
+        The browser, which must be kept referenced for the controls to work
+    """
+
+    return MeshTallyBrowser(
+        tally=tally,
+        basis=basis,
+        slice_index=slice_index,
+        score=score,
+        axis_units=axis_units,
+        value=value,
+        outline=outline,
+        outline_by=outline_by,
+        geometry=geometry,
+        pixels=pixels,
+        colorbar=colorbar,
+        volume_normalization=volume_normalization,
+        scaling_factor=scaling_factor,
+        colorbar_kwargs=colorbar_kwargs,
+        outline_kwargs=outline_kwargs,
+        widgets=widgets,
+        outlines_per_run=outlines_per_run,
+        max_pixels=max_pixels,
+        **kwargs,
+    )
+
+
+class MeshTallyBrowser:
+    """Interactive slice viewer for a mesh tally, see :func:`browse_mesh_tally`.
+
+    The normalised 3D tally array is extracted once and each slice is taken
+    from it as a view. Outline images are rasterised by OpenMC in a
+    background thread, a batch of slices at a time, so moving the controls
+    only updates the data of the existing image and redraws the outline.
+    """
+
+    def __init__(
+        self,
+        tally,
+        basis="xy",
+        slice_index=None,
+        score=None,
+        axis_units="cm",
+        value="mean",
+        outline=False,
+        outline_by="cell",
+        geometry=None,
+        pixels=40000,
+        colorbar=True,
+        volume_normalization=True,
+        scaling_factor=None,
+        colorbar_kwargs={},
+        outline_kwargs=_default_outline_kwargs,
+        widgets="matplotlib",
+        outlines_per_run=16,
+        max_pixels=1000000,
+        **kwargs,
+    ):
+        import matplotlib.pyplot as plt
+
+        cv.check_value("basis", basis, _BASES)
+        cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
+        cv.check_type("volume_normalization", volume_normalization, bool)
+        cv.check_type("outline", outline, bool)
+        cv.check_value("widgets", widgets, ["matplotlib", "ipywidgets"])
+        cv.check_greater_than("outlines_per_run", outlines_per_run, 0)
+
+        self.mesh = _get_mesh(tally)
+        _check_regular_mesh(self.mesh)
+        self.axis_units = axis_units
+        self.outline = outline and geometry is not None
+        self.outline_by = outline_by
+        self.geometry = geometry
+        self.pixels = pixels
+        self.max_pixels = max_pixels
+        self.outline_kwargs = outline_kwargs
+        self.outlines_per_run = outlines_per_run
+
+        self._bases = [b for b in _BASES if _is_plottable(self.mesh, b)]
+        if basis not in self._bases:
+            _check_mesh_dimension(self.mesh, basis)
+
+        tally_data = _sum_tally_data(
+            tally,
+            lambda one_tally: _get_tally_arrays(self.mesh, one_tally, [value], score),
+        )[value]
+        self._data = _normalize_data(
+            tally_data, self.mesh, volume_normalization, scaling_factor
+        )
+
+        # outline images are keyed by (basis, slice_index)
+        self._outlines = {}
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(max_workers=1) if self.outline else None
+        self._contour = None
+
+        default_imshow_kwargs = _get_imshow_kwargs(kwargs)
+
+        # a single norm scaled to the whole mesh keeps slices comparable
+        norm = _pop_norm(default_imshow_kwargs)
+        norm.autoscale_None(self._data)
+
+        self.basis = basis
+        if slice_index is None:
+            slice_index = self._mid_index(basis)
+        self.slice_index = slice_index
+
+        self.figure, self.axes = plt.subplots()
+        if widgets == "matplotlib":
+            self.figure.subplots_adjust(bottom=0.2, left=0.3)
+        self._image = self.axes.imshow(
+            self._get_slice(),
+            extent=_get_extent(self.mesh, basis, axis_units),
+            norm=norm,
+            **default_imshow_kwargs,
+        )
+        self._set_labels()
+
+        if colorbar:
+            self.figure.colorbar(self._image, ax=self.axes, **colorbar_kwargs)
+
+        if self.outline:
+            self._draw_outline()
+            self._prefetch_outlines()
+
+        if widgets == "matplotlib":
+            self._add_matplotlib_widgets()
+        else:
+            self._add_ipywidgets()
+
+    def set_basis(self, basis: str):
+        """Changes the basis, moving to the mid slice of the new basis."""
+        cv.check_value("basis", basis, self._bases)
+        if basis == self.basis:
+            return
+        self.basis = basis
+        self.slice_index = self._mid_index(basis)
+
+        self._image.set_data(self._get_slice())
+        self._image.set_extent(_get_extent(self.mesh, basis, self.axis_units))
+        self._set_labels()
+        self._update_slice_control()
+        if self.outline:
+            self._draw_outline()
+            self._prefetch_outlines()
+        self.figure.canvas.draw_idle()
+
+    def set_slice_index(self, slice_index: int):
+        """Changes the slice index within the current basis."""
+        slice_index = int(slice_index)
+        cv.check_greater_than("slice_index", slice_index, 0, equality=True)
+        cv.check_less_than(
+            "slice_index", slice_index, self._num_slices(self.basis), equality=False
+        )
+        if slice_index == self.slice_index:
+            return
+        self.slice_index = slice_index
+
+        self._image.set_data(self._get_slice())
+        if self.outline:
+            self._draw_outline()
+        self.figure.canvas.draw_idle()
+
+    def close(self):
+        """Stops any background outline rasterisation."""
+        if self._executor is not None:
+            for future in set(self._pending.values()):
+                future.cancel()
+            self._executor.shutdown(wait=False)
+
+    def _get_slice(self):
+        return _orient_slice(self._data, self.basis, self.slice_index)
+
+    def _num_slices(self, basis):
+        return self.mesh.dimension[_BASIS_TO_INDEX[basis]]
+
+    def _mid_index(self, basis):
+        return int(self._num_slices(basis) / 2)
+
+    def _set_labels(self):
+        xlabel, ylabel = _get_axis_labels(self.basis, self.axis_units)
+        self.axes.set_xlabel(xlabel)
+        self.axes.set_ylabel(ylabel)
+
+    def _outline_pixels(self):
+        return _get_outline_pixels(self.axes, self.pixels, self.max_pixels)
+
+    def _get_outline(self, basis, slice_index):
+        key = (basis, slice_index)
+        future = self._pending.get(key)
+        if key not in self._outlines and future is not None:
+            try:
+                future.result()
+            except Exception:
+                # a failed or cancelled batch is rasterised again below
+                pass
+        if key not in self._outlines:
+            plot = _get_outline_plot(
+                self.mesh,
+                basis,
+                slice_index,
+                self._outline_pixels(),
+                self.outline_by,
+            )
+            self._outlines[key] = _get_outline_images(self.geometry, [plot])[0]
+        return self._outlines[key]
+
+    def _prefetch_outlines(self):
+        """Queues the outlines of the remaining slices of the current basis,
+        nearest to the current slice first, in batches per OpenMC run."""
+        basis = self.basis
+        pixels = self._outline_pixels()
+        slice_indices = sorted(
+            (
+                i
+                for i in range(self._num_slices(basis))
+                if (basis, i) not in self._outlines and (basis, i) not in self._pending
+            ),
+            key=lambda i: abs(i - self.slice_index),
+        )
+        for start in range(0, len(slice_indices), self.outlines_per_run):
+            batch = slice_indices[start : start + self.outlines_per_run]
+            plots = [
+                _get_outline_plot(self.mesh, basis, i, pixels, self.outline_by)
+                for i in batch
+            ]
+            future = self._executor.submit(self._rasterise, basis, batch, plots)
+            for i in batch:
+                self._pending[(basis, i)] = future
+
+    def _rasterise(self, basis, slice_indices, plots):
+        try:
+            image_values = _get_outline_images(self.geometry, plots)
+            for slice_index, image_value in zip(slice_indices, image_values):
+                self._outlines[(basis, slice_index)] = image_value
+        finally:
+            # failed slices are no longer pending so they can be queued again
+            for slice_index in slice_indices:
+                self._pending.pop((basis, slice_index), None)
+
+    def _draw_outline(self):
+        image_value = self._get_outline(self.basis, self.slice_index)
+        if self._contour is not None:
+            _remove_contour(self._contour)
+        self._contour = _plot_outline(
+            self.axes,
+            image_value,
+            _get_extent(self.mesh, self.basis, self.axis_units),
+            self.outline_kwargs,
+        )
+
+    def _add_matplotlib_widgets(self):
+        from matplotlib.widgets import RadioButtons, Slider
+
+        basis_axes = self.figure.add_axes([0.02, 0.4, 0.15, 0.2])
+        self._basis_control = RadioButtons(
+            basis_axes, self._bases, active=self._bases.index(self.basis)
+        )
+        self._basis_control.on_clicked(self.set_basis)
+
+        slider_axes = self.figure.add_axes([0.3, 0.05, 0.55, 0.04])
+        self._slice_control = Slider(
+            slider_axes,
+            "slice index",
+            0,
+            self._num_slices(self.basis) - 1,
+            valinit=self.slice_index,
+            valstep=1,
+        )
+        self._slice_control.on_changed(self.set_slice_index)
+
+    def _add_ipywidgets(self):
+        try:
+            import ipywidgets
+        except ImportError:
+            msg = (
+                "The ipywidgets package is needed for widgets='ipywidgets', "
+                "install it with pip install ipywidgets"
+            )
+            raise ImportError(msg)
+        from IPython.display import display
+
+        self._basis_control = ipywidgets.Dropdown(
+            options=self._bases, value=self.basis, description="basis"
+        )
+        self._basis_control.observe(
+            lambda change: self.set_basis(change["new"]), names="value"
+        )
+        self._slice_control = ipywidgets.IntSlider(
+            value=self.slice_index,
+            min=0,
+            max=self._num_slices(self.basis) - 1,
+            description="slice index",
+            continuous_update=True,
+        )
+        self._slice_control.observe(
+            lambda change: self.set_slice_index(change["new"]), names="value"
+        )
+        display(ipywidgets.HBox([self._basis_control, self._slice_control]))
+
+    def _update_slice_control(self):
+        control = self._slice_control
+        max_index = self._num_slices(self.basis) - 1
+        if hasattr(control, "valmax"):  # matplotlib Slider
+            control.valmax = max_index
+            control.ax.set_xlim(control.valmin, max_index)
+            control.set_val(self.slice_index)
+        else:  # ipywidgets IntSlider
+            control.max = max_index
+            control.value = self.slice_index
+
+
+def _is_plottable(mesh, basis):
+    try:
+        _check_mesh_dimension(mesh, basis)
+    except ValueError:
+        return False
+    return True
+
+
+def _remove_contour(contour_set):
+    # ContourSet became a single artist in matplotlib 3.8
+    if hasattr(contour_set, "collections") and not hasattr(contour_set, "get_paths"):
+        for collection in contour_set.collections:
+            collection.remove()
+    else:
+        contour_set.remove()
@@ -0,0 +1,260 @@
+import typing
+
+import openmc
+import openmc.checkvalue as cv
+
+from .core import (
+    _BASES,
+    _check_mesh_dimension,
+    _check_single_bin_filters,
+    _get_axis_labels,
+    _get_extent,
+    _get_figure,
+    _get_imshow_kwargs,
+    _get_mean_and_std_dev,
+    _get_relative_error,
+    _get_slice_mesh_indices,
+    _normalize_data,
+    _pop_norm,
+)
+from .sparse import _get_sparse_slices
+from .statepoints import _update_limits
+
+__all__ = ["LiveMeshTallyPlot", "plot_mesh_tally_live"]
+
+
+def plot_mesh_tally_live(
+    tally_id: int,
+    basis: str = "xy",
+    slice_index: typing.Optional[int] = None,
+    score: typing.Optional[str] = None,
+    axes: typing.Optional["matplotlib.axes.Axes"] = None,
+    axis_units: str = "cm",
+    value: str = "mean",
+    colorbar: bool = True,
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    colorbar_kwargs: dict = {},
+    use_pyplot: bool = True,
+    **kwargs,
+) -> "LiveMeshTallyPlot":
+    """Display a slice plot of a mesh tally of a simulation that is running
+    in memory with openmc.lib, which is updated between batches.
+
+    The simulation must have been initialised with openmc.lib.init and
+    openmc.lib.simulation_init. Each call to LiveMeshTallyPlot.update copies
+    only the results of the slice from openmc.lib, without any statepoint
+    being written, and updates the data of the existing image.
+
+    .. code-block:: python
+
+        openmc.lib.init()
+        openmc.lib.simulation_init()
+        live = plot_mesh_tally_live(tally_id=1, basis="xz")
+        for _ in openmc.lib.iter_batches():
+            live.update()
+        openmc.lib.simulation_finalize()
+        openmc.lib.finalize()
+
+    Parameters
+    ----------
+    tally_id : int
+        The id of the mesh tally in the running simulation. Tally must
+        contain a MeshFilter that uses a RegularMesh.
+    basis : {'xy', 'xz', 'yz'}
+        The basis directions for the plot
+    slice_index : int
+        The mesh index to plot
+    score : str
+        Score to plot, e.g. 'flux'
+    axes : matplotlib.Axes
+        Axes to draw to
+    axis_units : {'km', 'm', 'cm', 'mm'}
+        Units used on the plot axis
+    value : {'mean', 'std_dev', 'rel_err'}
+        The type of value to plot
+    colorbar : bool
+        Whether or not to add a colorbar to the plot.
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to ploting.
+    colorbar_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.colorbar.Colorbar`.
+    use_pyplot : bool
+        Whether a new figure is created with pyplot, when axes is not given,
+        or as a standalone matplotlib.figure.Figure with an Agg canvas.
+    **kwargs
+        Keyword arguments passed to :func:`matplotlib.pyplot.imshow`. Defaults
+        to {"interpolation", "none"}.
+    Returns
+    -------
+    LiveMeshTallyPlot
+        The live plot, call its update method to refresh it
+    """
+
+    return LiveMeshTallyPlot(
+        tally_id=tally_id,
+        basis=basis,
+        slice_index=slice_index,
+        score=score,
+        axes=axes,
+        axis_units=axis_units,
+        value=value,
+        colorbar=colorbar,
+        volume_normalization=volume_normalization,
+        scaling_factor=scaling_factor,
+        colorbar_kwargs=colorbar_kwargs,
+        use_pyplot=use_pyplot,
+        **kwargs,
+    )
+
+
+class LiveMeshTallyPlot:
+    """Slice plot of a mesh tally in a running openmc.lib simulation, see
+    :func:`plot_mesh_tally_live`.
+
+    The rows of the tally results that belong to the slice are found once
+    and each update copies just those rows from the results array that
+    openmc.lib shares with the simulation.
+    """
+
+    def __init__(
+        self,
+        tally_id,
+        basis="xy",
+        slice_index=None,
+        score=None,
+        axes=None,
+        axis_units="cm",
+        value="mean",
+        colorbar=True,
+        volume_normalization=True,
+        scaling_factor=None,
+        colorbar_kwargs={},
+        use_pyplot=True,
+        **kwargs,
+    ):
+        import openmc.lib
+
+        cv.check_value("basis", basis, _BASES)
+        cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
+        cv.check_value("value", value, ["mean", "std_dev", "rel_err"])
+        cv.check_type("volume_normalization", volume_normalization, bool)
+
+        self.tally = openmc.lib.tallies[tally_id]
+        self.basis = basis
+        self.value = value
+        self.volume_normalization = volume_normalization
+        self.scaling_factor = scaling_factor
+
+        self.mesh = _get_lib_mesh(self.tally)
+        _check_mesh_dimension(self.mesh, basis)
+        if slice_index is None:
+            # finds the mid index
+            basis_to_index = {"xy": 2, "xz": 1, "yz": 0}[basis]
+            slice_index = int(self.mesh.dimension[basis_to_index] / 2)
+        self.slice_index = slice_index
+
+        if score is None:
+            if len(self.tally.scores) != 1:
+                msg = "score was not specified and there are multiple scores in the tally."
+                raise ValueError(msg)
+            score = self.tally.scores[0]
+        cv.check_value("score", score, self.tally.scores)
+        if len(self.tally.nuclides) != 1:
+            raise ValueError("Only tallies with a single nuclide are supported")
+        self._column = list(self.tally.scores).index(score)
+
+        _check_single_bin_filters(self.tally.filters, openmc.lib.MeshFilter)
+        self._indices = _get_slice_mesh_indices(self.mesh.dimension, basis, slice_index)
+
+        default_imshow_kwargs = _get_imshow_kwargs(kwargs)
+
+        # the limits of the norm follow the data unless they are given
+        norm = _pop_norm(default_imshow_kwargs)
+        self._autoscale = norm.vmin is None, norm.vmax is None
+
+        if axes is None:
+            fig, axes = _get_figure(use_pyplot)
+            xlabel, ylabel = _get_axis_labels(basis, axis_units)
+            axes.set_xlabel(xlabel)
+            axes.set_ylabel(ylabel)
+        self.axes = axes
+        self.figure = axes.figure
+
+        self.image = axes.imshow(
+            self._get_slice(),
+            extent=_get_extent(self.mesh, basis, axis_units),
+            norm=norm,
+            **default_imshow_kwargs,
+        )
+        if colorbar:
+            self.figure.colorbar(self.image, ax=axes, **colorbar_kwargs)
+
+    def update(self) -> "matplotlib.image.AxesImage":
+        """Reads the current results of the slice from openmc.lib and redraws
+        the image with them."""
+
+        data = self._get_slice()
+        self.image.set_data(data)
+
+        norm = self.image.norm
+        vmin, vmax = _update_limits(None, None, data, norm)
+        autoscale_vmin, autoscale_vmax = self._autoscale
+        if not autoscale_vmin or vmin is None:
+            vmin = norm.vmin
+        if not autoscale_vmax or vmax is None:
+            vmax = norm.vmax
+        # both limits change together so the colorbar never sees vmin > vmax
+        self.image.set_clim(vmin, vmax)
+
+        self.axes.set_title(f"{self.tally.num_realizations} realizations")
+        self.figure.canvas.draw_idle()
+        self.figure.canvas.flush_events()
+        return self.image
+
+    def _get_slice(self):
+        # fancy indexing copies just the slice from the shared results
+        results = self.tally.results[self._indices, self._column, 1:]
+        mean, std_dev = _get_mean_and_std_dev(
+            results[:, 0], results[:, 1], self.tally.num_realizations
+        )
+        slices = _get_sparse_slices(
+            self._indices,
+            {"mean": mean, "std_dev": std_dev},
+            self.mesh.dimension,
+            self.basis,
+            self.slice_index,
+        )
+        if self.value == "rel_err":
+            return _get_relative_error(slices["mean"], slices["std_dev"])
+        return _normalize_data(
+            slices[self.value],
+            self.mesh,
+            self.volume_normalization,
+            self.scaling_factor,
+        )
+
+
+def _get_lib_mesh(lib_tally):
+    """Makes an openmc.RegularMesh matching the mesh of the openmc.lib tally."""
+    import openmc.lib
+
+    for lib_filter in lib_tally.filters:
+        if isinstance(lib_filter, openmc.lib.MeshFilter):
+            lib_mesh = lib_filter.mesh
+            break
+    else:
+        raise ValueError(f"Tally {lib_tally.id} does not have a MeshFilter")
+
+    if not isinstance(lib_mesh, openmc.lib.RegularMesh):
+        raise NotImplementedError(
+            f"Only RegularMesh are supported, not {type(lib_mesh)}"
+        )
+
+    mesh = openmc.RegularMesh()
+    mesh.dimension = list(lib_mesh.dimension)
+    mesh.lower_left = list(lib_mesh.lower_left)
+    mesh.upper_right = list(lib_mesh.upper_right)
+    return mesh
@@ -0,0 +1,187 @@
+import copy
+import io
+import typing
+
+import numpy as np
+import openmc.checkvalue as cv
+
+from .core import (
+    _BASES,
+    _check_regular_mesh,
+    _get_mesh,
+    _get_outline_images,
+    _get_outline_plot,
+    _get_tally_slices,
+    _normalize_data,
+    _sum_tally_data,
+)
+
+__all__ = ["render_mesh_tally_image"]
+
+
+def render_mesh_tally_image(
+    tally: typing.Union["openmc.Tally", typing.Sequence["openmc.Tally"]],
+    basis: str = "xy",
+    slice_index: typing.Optional[int] = None,
+    score: typing.Optional[str] = None,
+    value: str = "mean",
+    cmap: typing.Union[str, "matplotlib.colors.Colormap"] = "viridis",
+    norm: typing.Optional["matplotlib.colors.Normalize"] = None,
+    outline: bool = False,
+    outline_by: str = "cell",
+    geometry: typing.Optional["openmc.Geometry"] = None,
+    outline_color: typing.Sequence[int] = (0, 0, 0, 255),
+    scale: int = 1,
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    compress_level: int = 1,
+) -> bytes:
+    """Renders a slice of the mesh tally score straight to PNG bytes without
+    creating a matplotlib figure, axes or colorbar.
+
+    The slice is colored with a lookup table made from the colormap and the
+    geometry outline, if requested, is drawn over it as a single color.
+    Parameters
+    ----------
+    tally : openmc.Tally
+        The openmc tally to render. Tally must contain a MeshFilter that uses a RegularMesh.
+    basis : {'xy', 'xz', 'yz'}
+        The basis directions for the image
+    slice_index : int
+        The mesh index to render
+    score : str
+        Score to render, e.g. 'flux'
+    value : str
+        A string for the type of value to return  - 'mean' (default),
+        'std_dev', 'rel_err', 'sum', or 'sum_sq' are accepted
+    cmap : str or matplotlib.colors.Colormap
+        The colormap used to color the tally values
+    norm : matplotlib.colors.Normalize
+        The normalization used to map the tally values to the colormap.
+        Defaults to a linear scale between the minimum and maximum values.
+    outline : True
+        If set then an outline will be added to the image. The outline can be
+        by cell or by material.
+    outline_by : {'cell', 'material'}
+        Indicate whether the outline should be by cell or by material
+    geometry : openmc.Geometry
+        The geometry to use for the outline.
+    outline_color : tuple of ints
+        The RGBA color of the outline with values from 0 to 255
+    scale : int
+        The number of image pixels along each side of a mesh voxel.
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to rendering.
+    compress_level : int
+        The zlib compression level from 0 to 9 used for the PNG.
+    Returns
+    -------
+    bytes
+        The PNG encoded image
+    """
+    import matplotlib
+    import matplotlib.colors
+    from PIL import Image
+
+    cv.check_value("basis", basis, _BASES)
+    cv.check_type("volume_normalization", volume_normalization, bool)
+    cv.check_type("outline", outline, bool)
+    cv.check_type("scale", scale, int)
+    cv.check_greater_than("scale", scale, 0)
+    cv.check_length("outline_color", outline_color, 4, 4)
+
+    mesh = _get_mesh(tally)
+    _check_regular_mesh(mesh)
+
+    basis_to_index = {"xy": 2, "xz": 1, "yz": 0}[basis]
+    if slice_index is None:
+        # finds the mid index
+        slice_index = int(mesh.dimension[basis_to_index] / 2)
+
+    data = _sum_tally_data(
+        tally,
+        lambda one_tally: _get_tally_slices(
+            mesh, basis, one_tally, [value], score, slice_index
+        ),
+    )[value]
+    data = _normalize_data(data, mesh, volume_normalization, scaling_factor)
+
+    if isinstance(cmap, str):
+        cmap = _get_colormap(cmap)
+    if norm is None:
+        norm = matplotlib.colors.Normalize()
+    elif not norm.scaled():
+        # a deep copy is autoscaled so that neither the caller's norm nor its
+        # callbacks are changed
+        norm = copy.deepcopy(norm)
+    norm.autoscale_None(data)
+
+    rgba = _get_colormap_lut(cmap)[_get_lut_indices(norm(data), cmap.N)]
+
+    shape = (data.shape[0] * scale, data.shape[1] * scale)
+    rgba = _resample_nearest(rgba, shape)
+
+    if outline and geometry is not None:
+        plot = _get_outline_plot(
+            mesh, basis, slice_index, shape[0] * shape[1], outline_by
+        )
+        image_value = _get_outline_images(geometry, [plot])[0]
+        edges = _resample_nearest(_get_edges(image_value), shape)
+        rgba[edges] = outline_color
+
+    buffer = io.BytesIO()
+    Image.fromarray(rgba).save(buffer, format="PNG", compress_level=compress_level)
+    return buffer.getvalue()
+
+
+def _get_colormap(name):
+    import matplotlib
+
+    # the colormap registry was added in matplotlib 3.5
+    if hasattr(matplotlib, "colormaps"):
+        return matplotlib.colormaps[name]
+    import matplotlib.cm
+
+    return matplotlib.cm.get_cmap(name)
+
+
+def _get_colormap_lut(cmap):
+    """Returns the colormap as a (N + 3, 4) uint8 array of N colors followed
+    by the under, over and bad colors."""
+    colors = np.concatenate(
+        [cmap(np.linspace(0.0, 1.0, cmap.N)), cmap([-np.inf, np.inf, np.nan])]
+    )
+    return np.round(colors * 255).astype(np.uint8)
+
+
+def _get_lut_indices(normed_data, num_colors):
+    """Maps normalized data to the indices of the colormap lookup table."""
+    normed_data = np.ma.filled(np.ma.masked_invalid(normed_data), np.nan)
+    with np.errstate(invalid="ignore"):
+        indices = np.floor(normed_data * num_colors)
+        indices = np.clip(np.nan_to_num(indices), 0, num_colors - 1).astype(np.intp)
+        indices[normed_data < 0] = num_colors
+        indices[normed_data > 1] = num_colors + 1
+    indices[np.isnan(normed_data)] = num_colors + 2
+    return indices
+
+
+def _resample_nearest(array, shape):
+    """Resizes the first two dimensions of the array with nearest sampling."""
+    if array.shape[:2] == tuple(shape):
+        return array
+    rows = np.arange(shape[0]) * array.shape[0] // shape[0]
+    columns = np.arange(shape[1]) * array.shape[1] // shape[1]
+    return array[rows[:, np.newaxis], columns]
+
+
+def _get_edges(image_value):
+    """Finds the pixels on the boundaries between different values."""
+    edges = np.zeros(image_value.shape, dtype=bool)
+    vertical_change = image_value[:-1, :] != image_value[1:, :]
+    horizontal_change = image_value[:, :-1] != image_value[:, 1:]
+    edges[:-1, :] |= vertical_change
+    edges[:, :-1] |= horizontal_change
+    return edges
@@ -0,0 +1,143 @@
+"""Sparse handling of mesh tallies that are mostly zeros. The non-zero voxels
+are held as flat mesh indices, with x varying fastest as in the OpenMC mesh
+filter bins, and a matching array of values for each type of value."""
+
+import typing
+
+import numpy as np
+
+from .core import (
+    _BASIS_AXES,
+    _check_mesh_dimension,
+    _get_slice_index_range,
+    _get_tally_block,
+)
+
+# the largest number of voxels read densely at a time
+_CHUNK_VOXELS = 1000000
+
+
+def _get_sparse_tally_slices(
+    mesh,
+    basis,
+    tally,
+    values,
+    score,
+    slice_index,
+    window=None,
+):
+    """Returns a dictionary of oriented 2D slices, one for each of the values,
+    extracted and combined as non-zero voxels and only made dense once sliced."""
+
+    if "rel_err" in values:
+        raise ValueError(
+            "The rel_err value is not supported for sparse tallies as it is "
+            "undefined for voxels without a score"
+        )
+
+    _check_mesh_dimension(mesh, basis)
+    index_range = _get_slice_index_range(mesh.dimension, basis, slice_index, window)
+
+    if isinstance(tally, typing.Sequence):
+        indices, arrays = _sum_sparse_tally_arrays(
+            [
+                _get_sparse_tally_arrays(mesh, one_tally, values, score, index_range)
+                for one_tally in tally
+            ]
+        )
+    else:
+        indices, arrays = _get_sparse_tally_arrays(
+            mesh, tally, values, score, index_range
+        )
+
+    return _get_sparse_slices(
+        indices, arrays, mesh.dimension, basis, slice_index, window
+    )
+
+
+def _get_sparse_tally_arrays(mesh, tally, values, score, index_range):
+    """Finds the flat mesh indices of the voxels in the index_range that are
+    non-zero for any of the values and returns them with the values of those
+    voxels. The block is read in chunks of z layers, each read only from the
+    statepoint when the tally results have not been loaded, so no more than
+    one chunk is ever held densely."""
+
+    (i0, i1), (j0, j1), (k0, k1) = index_range
+    chunk_size = max(1, _CHUNK_VOXELS // ((i1 - i0) * (j1 - j0)))
+
+    chunk_indices = []
+    chunk_arrays = {value: [] for value in values}
+    for start in range(k0, k1, chunk_size):
+        chunk_range = ((i0, i1), (j0, j1), (start, min(start + chunk_size, k1)))
+        block = _get_tally_block(mesh, tally, values, score, chunk_range)
+
+        non_zero = np.zeros(next(iter(block.values())).shape, dtype=bool)
+        for array in block.values():
+            non_zero |= array != 0
+        voxels = np.nonzero(non_zero)
+
+        # the positions within the chunk become flat indices of the whole mesh
+        offsets = [axis_range[0] for axis_range in chunk_range]
+        chunk_indices.append(
+            np.ravel_multi_index(
+                [axis + offset for axis, offset in zip(voxels, offsets)],
+                mesh.dimension,
+                order="F",
+            )
+        )
+        for value, array in block.items():
+            chunk_arrays[value].append(array[voxels])
+
+    indices = np.concatenate(chunk_indices)
+    return indices, {
+        value: np.concatenate(arrays) for value, arrays in chunk_arrays.items()
+    }
+
+
+def _sum_sparse_tally_arrays(sparse_arrays):
+    """Adds together the non-zero voxels of several tallies on the same mesh,
+    in the same way as the dense data of several tallies are added."""
+
+    indices = np.concatenate([one_indices for one_indices, _ in sparse_arrays])
+    combined_indices, positions = np.unique(indices, return_inverse=True)
+
+    combined = {}
+    for value in sparse_arrays[0][1]:
+        array = np.concatenate([arrays[value] for _, arrays in sparse_arrays])
+        combined[value] = np.bincount(
+            positions, weights=array, minlength=len(combined_indices)
+        )
+    return combined_indices, combined
+
+
+def _get_sparse_slices(indices, arrays, dimension, basis, slice_index, window=None):
+    """Selects the non-zero voxels within the slice and window and places them
+    in dense 2D arrays oriented in the same way as the dense slices."""
+
+    voxel_indices = np.unravel_index(indices, dimension, order="F")
+    horizontal_axis, vertical_axis = _BASIS_AXES[basis]
+    normal_axis = ({0, 1, 2} - {horizontal_axis, vertical_axis}).pop()
+
+    in_slice = voxel_indices[normal_axis] == slice_index
+    horizontal = voxel_indices[horizontal_axis][in_slice]
+    vertical = voxel_indices[vertical_axis][in_slice]
+
+    if window is None:
+        window = ((0, dimension[horizontal_axis]), (0, dimension[vertical_axis]))
+    (start_h, stop_h), (start_v, stop_v) = window
+    in_window = (
+        (horizontal >= start_h)
+        & (horizontal < stop_h)
+        & (vertical >= start_v)
+        & (vertical < stop_v)
+    )
+    columns = horizontal[in_window] - start_h
+    # the top row of the image is the largest vertical index
+    rows = stop_v - 1 - vertical[in_window]
+
+    slices = {}
+    for value, array in arrays.items():
+        data = np.zeros((stop_v - start_v, stop_h - start_h))
+        data[rows, columns] = array[in_slice][in_window]
+        slices[value] = data
+    return slices
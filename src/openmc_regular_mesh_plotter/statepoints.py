@@ -0,0 +1,863 @@
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import math
+import re
+import time
+import typing
+from pathlib import Path
+
+import numpy as np
+import openmc
+import openmc.checkvalue as cv
+
+from .core import (
+    _BASES,
+    _BASIS_AXES,
+    _check_mesh_dimension,
+    _check_meshes_match,
+    _check_regular_mesh,
+    _check_single_bin_filters,
+    _default_outline_kwargs,
+    _get_axis_labels,
+    _get_extent,
+    _get_figure,
+    _get_imshow_kwargs,
+    _get_mean_and_std_dev,
+    _get_mesh,
+    _get_outline_images,
+    _get_outline_plot,
+    _get_relative_error,
+    _get_score,
+    _get_slice_index_range,
+    _get_slice_mesh_indices,
+    _get_tally_score_slices,
+    _normalize_data,
+    _plot_outline,
+    _pop_norm,
+    _read_statepoint_block,
+)
+from .sparse import _get_sparse_slices
+
+__all__ = [
+    "plot_all_mesh_tallies",
+    "plot_mesh_tally_convergence",
+    "plot_mesh_tally_ensemble",
+    "save_mesh_tally_convergence_frames",
+]
+
+
+def plot_mesh_tally_convergence(
+    statepoints: typing.Sequence[typing.Union[str, Path]],
+    tally_id: typing.Optional[int] = None,
+    tally_name: typing.Optional[str] = None,
+    basis: str = "xy",
+    slice_index: typing.Optional[int] = None,
+    score: typing.Optional[str] = None,
+    axis_units: str = "cm",
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    colorbar: bool = True,
+    colorbar_kwargs: dict = {},
+    use_pyplot: bool = True,
+    **kwargs,
+) -> "numpy.ndarray":
+    """Plots the same slice of a mesh tally from a series of statepoints as
+    small multiples with a shared color scale, followed by the trend of the
+    relative error of each voxel.
+
+    Only the slice is read from each statepoint file and one statepoint is
+    read at a time. The trend map shows the per voxel gradient of
+    log(rel_err) against log(realizations), which is -0.5 for a voxel
+    converging as expected, and the trend plot shows the median and 90th
+    percentile relative error of the slice.
+    Parameters
+    ----------
+    statepoints : sequence of str or pathlib.Path
+        The statepoint files, ordered by the number of batches.
+    tally_id : int
+        The id of the mesh tally to plot.
+    tally_name : str
+        The name of the mesh tally to plot, alternative to tally_id.
+    basis : {'xy', 'xz', 'yz'}
+        The basis directions for the plot
+    slice_index : int
+        The mesh index to plot
+    score : str
+        Score to plot, e.g. 'flux'
+    axis_units : {'km', 'm', 'cm', 'mm'}
+        Units used on the plot axis
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to ploting.
+    colorbar : bool
+        Whether or not to add colorbars to the plot.
+    colorbar_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.colorbar.Colorbar`.
+    use_pyplot : bool
+        Whether the figure is created with pyplot or as a standalone
+        matplotlib.figure.Figure with an Agg canvas.
+    **kwargs
+        Keyword arguments passed to :func:`matplotlib.pyplot.imshow`. Defaults
+        to {"interpolation", "none"}.
+    Returns
+    -------
+    numpy.ndarray
+        The matplotlib.Axes of each statepoint followed by the trend axes
+    """
+    cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
+    cv.check_length("statepoints", statepoints, 1)
+
+    num_plots = len(statepoints) + 2
+    ncols = math.ceil(math.sqrt(num_plots))
+    nrows = math.ceil(num_plots / ncols)
+    fig, axes = _get_figure(
+        use_pyplot,
+        nrows=nrows,
+        ncols=ncols,
+        figsize=(4 * ncols, 3.5 * nrows),
+        constrained_layout=True,
+    )
+    axes = axes.flatten()
+    for axis in axes[num_plots:]:
+        axis.set_axis_off()
+
+    default_imshow_kwargs = _get_imshow_kwargs(kwargs)
+
+    # the norm is shared by all the images and its limits are only set once
+    # every slice has been seen
+    norm = _pop_norm(default_imshow_kwargs)
+    vmin, vmax = norm.vmin, norm.vmax
+
+    trend = _RelativeErrorTrend()
+    for axis, (mesh, num_realizations, mean, std_dev) in zip(
+        axes,
+        _iter_statepoint_slices(
+            statepoints, tally_id, tally_name, basis, slice_index, score
+        ),
+    ):
+        trend.add(num_realizations, mean, std_dev)
+        data = _normalize_data(mean, mesh, volume_normalization, scaling_factor)
+        vmin, vmax = _update_limits(vmin, vmax, data, norm)
+
+        extent = _get_extent(mesh, basis, axis_units)
+        xlabel, ylabel = _get_axis_labels(basis, axis_units)
+        axis.imshow(data, extent=extent, norm=norm, **default_imshow_kwargs)
+        axis.set_title(f"{num_realizations} realizations")
+        axis.set_xlabel(xlabel)
+        axis.set_ylabel(ylabel)
+
+    norm.vmin, norm.vmax = vmin, vmax
+    if colorbar:
+        fig.colorbar(
+            axes[len(statepoints) - 1].images[0],
+            ax=axes[: len(statepoints)].tolist(),
+            **colorbar_kwargs,
+        )
+
+    trend_map_axis = axes[len(statepoints)]
+    trend_image = trend_map_axis.imshow(
+        trend.get_gradient(),
+        extent=extent,
+        cmap="coolwarm",
+        vmin=-1.0,
+        vmax=0.0,
+        interpolation="none",
+    )
+    trend_map_axis.set_title("rel_err trend")
+    trend_map_axis.set_xlabel(xlabel)
+    trend_map_axis.set_ylabel(ylabel)
+    if colorbar:
+        fig.colorbar(
+            trend_image,
+            ax=trend_map_axis,
+            label="d log(rel_err) / d log(realizations)",
+        )
+
+    trend_plot_axis = axes[len(statepoints) + 1]
+    trend_plot_axis.plot(
+        trend.num_realizations, trend.median, marker="o", label="median"
+    )
+    trend_plot_axis.plot(
+        trend.num_realizations, trend.percentile_90, marker="o", label="90th percentile"
+    )
+    trend_plot_axis.set_xscale("log")
+    trend_plot_axis.set_yscale("log")
+    trend_plot_axis.set_xlabel("realizations")
+    trend_plot_axis.set_ylabel("rel_err")
+    trend_plot_axis.legend()
+
+    return axes[:num_plots]
+
+
+def save_mesh_tally_convergence_frames(
+    statepoints: typing.Sequence[typing.Union[str, Path]],
+    output_dir: typing.Union[str, Path],
+    tally_id: typing.Optional[int] = None,
+    tally_name: typing.Optional[str] = None,
+    basis: str = "xy",
+    slice_index: typing.Optional[int] = None,
+    score: typing.Optional[str] = None,
+    axis_units: str = "cm",
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    colorbar: bool = True,
+    colorbar_kwargs: dict = {},
+    savefig_kwargs: dict = {},
+    **kwargs,
+) -> typing.List[Path]:
+    """Saves the same slice of a mesh tally from a series of statepoints as
+    a sequence of image files with a shared color scale.
+
+    The statepoints are read twice, once to find the color scale limits and
+    once to plot the frames, with only one slice in memory at a time.
+    Parameters
+    ----------
+    statepoints : sequence of str or pathlib.Path
+        The statepoint files, ordered by the number of batches.
+    output_dir : str or pathlib.Path
+        The directory to save the frames to, it is created if needed.
+    tally_id : int
+        The id of the mesh tally to plot.
+    tally_name : str
+        The name of the mesh tally to plot, alternative to tally_id.
+    basis : {'xy', 'xz', 'yz'}
+        The basis directions for the plot
+    slice_index : int
+        The mesh index to plot
+    score : str
+        Score to plot, e.g. 'flux'
+    axis_units : {'km', 'm', 'cm', 'mm'}
+        Units used on the plot axis
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to ploting.
+    colorbar : bool
+        Whether or not to add a colorbar to each frame.
+    colorbar_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.colorbar.Colorbar`.
+    savefig_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.figure.Figure.savefig`.
+    **kwargs
+        Keyword arguments passed to :func:`matplotlib.pyplot.imshow`. Defaults
+        to {"interpolation", "none"}.
+    Returns
+    -------
+    list of pathlib.Path
+        The paths of the saved frames, in the order of the statepoints
+    """
+    cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
+    cv.check_length("statepoints", statepoints, 1)
+
+    default_imshow_kwargs = _get_imshow_kwargs(kwargs)
+
+    norm = _pop_norm(default_imshow_kwargs)
+
+    slices = lambda: _iter_statepoint_slices(
+        statepoints, tally_id, tally_name, basis, slice_index, score
+    )
+
+    if norm.vmin is None or norm.vmax is None:
+        vmin, vmax = norm.vmin, norm.vmax
+        for mesh, _, mean, _ in slices():
+            data = _normalize_data(mean, mesh, volume_normalization, scaling_factor)
+            vmin, vmax = _update_limits(vmin, vmax, data, norm)
+        norm.vmin, norm.vmax = vmin, vmax
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = []
+    for counter, (mesh, num_realizations, mean, _) in enumerate(slices()):
+        data = _normalize_data(mean, mesh, volume_normalization, scaling_factor)
+
+        fig, axis = _get_figure(use_pyplot=False)
+        xlabel, ylabel = _get_axis_labels(basis, axis_units)
+        im = axis.imshow(
+            data,
+            extent=_get_extent(mesh, basis, axis_units),
+            norm=norm,
+            **default_imshow_kwargs,
+        )
+        axis.set_title(f"{num_realizations} realizations")
+        axis.set_xlabel(xlabel)
+        axis.set_ylabel(ylabel)
+        if colorbar:
+            fig.colorbar(im, ax=axis, **colorbar_kwargs)
+
+        path = output_dir / f"frame_{str(counter).zfill(4)}.png"
+        fig.savefig(path, **savefig_kwargs)
+        paths.append(path)
+
+    return paths
+
+
+def plot_all_mesh_tallies(
+    statepoint_path: typing.Union[str, Path],
+    out_dir: typing.Union[str, Path],
+    bases: typing.Sequence[str] = ("xy", "xz", "yz"),
+    workers: typing.Optional[int] = None,
+    value: str = "mean",
+    axis_units: str = "cm",
+    outline: bool = False,
+    outline_by: str = "cell",
+    geometry: typing.Optional["openmc.Geometry"] = None,
+    pixels: int = 40000,
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    colorbar: bool = True,
+    colorbar_kwargs: dict = {},
+    outline_kwargs: dict = _default_outline_kwargs,
+    savefig_kwargs: dict = {},
+    **kwargs,
+) -> dict:
+    """Saves a plot of the middle slice of every RegularMesh tally in the
+    statepoint, for each score and basis, rendering the tallies in parallel
+    across a pool of processes.
+
+    Tallies are grouped by mesh so that the geometry outline of each mesh
+    and basis is rasterised once, in a single OpenMC geometry plotting run,
+    and shared by all the tallies on that mesh. Each process reads its tally
+    from the statepoint once and saves one image per score and basis.
+    Tallies that do not use a RegularMesh, have other filters with more than
+    one bin or have more than one nuclide are skipped.
+    Parameters
+    ----------
+    statepoint_path : str or pathlib.Path
+        The statepoint file to plot the mesh tallies of.
+    out_dir : str or pathlib.Path
+        The directory to save the images to, it is created if needed.
+    bases : sequence of {'xy', 'xz', 'yz'}
+        The basis directions to plot each tally in. Bases that are flat for
+        a mesh with a single voxel along an axis are skipped for that mesh.
+    workers : int
+        The number of processes used to render the tallies. Defaults to the
+        number of processors on the machine.
+    value : str
+        A string for the type of value to return  - 'mean' (default),
+        'std_dev', 'rel_err', 'sum', or 'sum_sq' are accepted
+    axis_units : {'km', 'm', 'cm', 'mm'}
+        Units used on the plot axis
+    outline : True
+        If set then an outline will be added to the plots. The outline can be
+        by cell or by material.
+    outline_by : {'cell', 'material'}
+        Indicate whether the plot should be colored by cell or by material
+    geometry : openmc.Geometry
+        The geometry to use for the outline. Defaults to the geometry of the
+        summary.h5 file next to the statepoint.
+    pixels : int
+        This sets the total number of pixels in each outline.
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to ploting.
+    colorbar : bool
+        Whether or not to add a colorbar to each plot.
+    colorbar_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.colorbar.Colorbar`.
+    outline_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.pyplot.contour`. Defaults
+        to "colors": "black", "linestyles": "solid", "linewidths": 1
+    savefig_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.figure.Figure.savefig`.
+    **kwargs
+        Keyword arguments passed to :func:`matplotlib.pyplot.imshow`. Defaults
+        to {"interpolation", "none"}.
+    Returns
+    -------
+    dict
+        The manifest with the "statepoint", a list of "files" with the path,
+        tally_id, tally_name, mesh_id, score, basis, slice_index and render
+        "seconds" of each image, the "skipped" tally ids with the reason,
+        the "outline_seconds" and the "total_seconds".
+    """
+
+    start = time.perf_counter()
+
+    for basis in bases:
+        cv.check_value("basis", basis, _BASES)
+    cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
+    cv.check_type("outline", outline, bool)
+    cv.check_type("pixels", pixels, int)
+    if workers is not None:
+        cv.check_greater_than("workers", workers, 0)
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    with openmc.StatePoint(statepoint_path) as statepoint:
+        meshes, mesh_tallies, skipped = _group_tallies_by_mesh(statepoint)
+        if outline and geometry is None:
+            if statepoint.summary is None:
+                msg = (
+                    "An outline was requested but no geometry was given and "
+                    "there is no summary.h5 file next to the statepoint"
+                )
+                raise ValueError(msg)
+            geometry = statepoint.summary.geometry
+
+    # the slice of each mesh and basis that is plotted for every tally
+    slices = {}
+    for mesh_id, mesh in meshes.items():
+        for basis in bases:
+            if 1 in [mesh.dimension[i] for i in _BASIS_AXES[basis]]:
+                continue
+            basis_to_index = {"xy": 2, "xz": 1, "yz": 0}[basis]
+            slices[mesh_id, basis] = int(mesh.dimension[basis_to_index] / 2)
+
+    outline_start = time.perf_counter()
+    outline_images = {key: None for key in slices}
+    if outline and slices:
+        plots = [
+            _get_outline_plot(meshes[mesh_id], basis, slice_index, pixels, outline_by)
+            for (mesh_id, basis), slice_index in slices.items()
+        ]
+        outline_images = dict(zip(slices, _get_outline_images(geometry, plots)))
+    outline_seconds = time.perf_counter() - outline_start
+
+    default_imshow_kwargs = _get_imshow_kwargs(kwargs)
+
+    plot_kwargs = {
+        "value": value,
+        "axis_units": axis_units,
+        "volume_normalization": volume_normalization,
+        "scaling_factor": scaling_factor,
+        "colorbar": colorbar,
+        "colorbar_kwargs": colorbar_kwargs,
+        "outline_kwargs": outline_kwargs,
+        "savefig_kwargs": savefig_kwargs,
+        "imshow_kwargs": default_imshow_kwargs,
+    }
+
+    files = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for mesh_id, tallies in mesh_tallies.items():
+            mesh_slices = {
+                basis: (slices[mesh_id, basis], outline_images[mesh_id, basis])
+                for basis in bases
+                if (mesh_id, basis) in slices
+            }
+            for tally_id in tallies:
+                futures.append(
+                    executor.submit(
+                        _plot_statepoint_tally,
+                        statepoint_path,
+                        tally_id,
+                        out_dir,
+                        mesh_slices,
+                        plot_kwargs,
+                    )
+                )
+        for future in futures:
+            files.extend(future.result())
+
+    return {
+        "statepoint": str(statepoint_path),
+        "files": files,
+        "skipped": skipped,
+        "outline_seconds": outline_seconds,
+        "total_seconds": time.perf_counter() - start,
+    }
+
+
+def plot_mesh_tally_ensemble(
+    statepoints: typing.Sequence[typing.Union[str, Path]],
+    tally_id: typing.Optional[int] = None,
+    tally_name: typing.Optional[str] = None,
+    basis: str = "xy",
+    slice_index: typing.Optional[int] = None,
+    score: typing.Optional[str] = None,
+    value: str = "mean",
+    weighting: str = "realizations",
+    axes: typing.Optional["matplotlib.axes.Axes"] = None,
+    axis_units: str = "cm",
+    volume_normalization: bool = True,
+    scaling_factor: typing.Optional[float] = None,
+    colorbar: bool = True,
+    colorbar_kwargs: dict = {},
+    use_pyplot: bool = True,
+    **kwargs,
+) -> "matplotlib.axes.Axes":
+    """Plots the combined slice of a mesh tally from independent runs of the
+    same model, such as runs with different seeds, with the statistics of
+    all their realizations.
+
+    The statepoints are streamed one at a time and only the slice is read
+    from each file, with the per voxel statistics accumulated in buffers the
+    size of the slice. With 'realizations' weighting the sums and sums of
+    squares of every realization are pooled, which suits runs with the same
+    number of particles per batch. With 'particles' weighting the mean of
+    each run is weighted by its total number of particles and the standard
+    errors are combined in quadrature.
+    Parameters
+    ----------
+    statepoints : sequence of str or pathlib.Path
+        The statepoint files of the independent runs.
+    tally_id : int
+        The id of the mesh tally to plot.
+    tally_name : str
+        The name of the mesh tally to plot, alternative to tally_id.
+    basis : {'xy', 'xz', 'yz'}
+        The basis directions for the plot
+    slice_index : int
+        The mesh index to plot
+    score : str
+        Score to plot, e.g. 'flux'
+    value : {'mean', 'std_dev', 'rel_err'}
+        The combined value to plot, std_dev is the standard error of the
+        combined mean.
+    weighting : {'realizations', 'particles'}
+        How the runs are combined.
+    axes : matplotlib.Axes
+        Axes to draw to
+    axis_units : {'km', 'm', 'cm', 'mm'}
+        Units used on the plot axis
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to ploting.
+    colorbar : bool
+        Whether or not to add a colorbar to the plot.
+    colorbar_kwargs : dict
+        Keyword arguments passed to :func:`matplotlib.colorbar.Colorbar`.
+    use_pyplot : bool
+        Whether a new figure is created with pyplot, when axes is not given,
+        or as a standalone matplotlib.figure.Figure with an Agg canvas.
+    **kwargs
+        Keyword arguments passed to :func:`matplotlib.pyplot.imshow`. Defaults
+        to {"interpolation", "none"}.
+    Returns
+    -------
+    matplotlib.axes.Axes
+        The axes of the plot
+    """
+
+    cv.check_value("axis_units", axis_units, ["km", "m", "cm", "mm"])
+    cv.check_value("value", value, ["mean", "std_dev", "rel_err"])
+    cv.check_value("weighting", weighting, ["realizations", "particles"])
+    cv.check_type("volume_normalization", volume_normalization, bool)
+    cv.check_length("statepoints", statepoints, 1)
+
+    first_mesh = None
+    total_realizations = 0
+    total_weight = 0.0
+    for (
+        mesh,
+        slice_index,
+        num_realizations,
+        num_particles,
+        indices,
+        sums,
+        sums_sq,
+    ) in _iter_statepoint_results(
+        statepoints, tally_id, tally_name, basis, slice_index, score
+    ):
+        if first_mesh is None:
+            first_mesh = mesh
+            # the buffers are the size of the slice and are reused for each run
+            buffer_a = np.zeros(len(indices))
+            buffer_b = np.zeros(len(indices))
+        else:
+            _check_meshes_match(first_mesh, mesh)
+
+        total_realizations += num_realizations
+        if weighting == "realizations":
+            buffer_a += sums
+            buffer_b += sums_sq
+        else:
+            mean, std_dev = _get_mean_and_std_dev(sums, sums_sq, num_realizations)
+            weight = float(num_particles) * num_realizations
+            total_weight += weight
+            buffer_a += weight * mean
+            buffer_b += (weight * std_dev) ** 2
+
+    if weighting == "realizations":
+        mean, std_dev = _get_mean_and_std_dev(buffer_a, buffer_b, total_realizations)
+    elif total_weight > 0:
+        mean = buffer_a / total_weight
+        std_dev = np.sqrt(buffer_b) / total_weight
+    else:
+        mean, std_dev = np.zeros_like(buffer_a), np.zeros_like(buffer_b)
+
+    slices = _get_sparse_slices(
+        indices,
+        {"mean": mean, "std_dev": std_dev},
+        first_mesh.dimension,
+        basis,
+        slice_index,
+    )
+    if value == "rel_err":
+        data = _get_relative_error(slices["mean"], slices["std_dev"])
+    else:
+        data = _normalize_data(
+            slices[value], first_mesh, volume_normalization, scaling_factor
+        )
+
+    default_imshow_kwargs = _get_imshow_kwargs(kwargs)
+
+    if axes is None:
+        fig, axes = _get_figure(use_pyplot)
+        xlabel, ylabel = _get_axis_labels(basis, axis_units)
+        axes.set_xlabel(xlabel)
+        axes.set_ylabel(ylabel)
+
+    im = axes.imshow(
+        data,
+        extent=_get_extent(first_mesh, basis, axis_units),
+        **default_imshow_kwargs,
+    )
+    axes.set_title(f"{len(statepoints)} runs, {total_realizations} realizations")
+    if colorbar:
+        axes.figure.colorbar(im, ax=axes, **colorbar_kwargs)
+
+    return axes
+
+
+class _RelativeErrorTrend:
+    """Accumulates the least squares gradient of log(rel_err) against
+    log(realizations) for each voxel, along with the median and 90th
+    percentile rel_err of each statepoint, without keeping earlier slices."""
+
+    def __init__(self):
+        self.num_realizations = []
+        self.median = []
+        self.percentile_90 = []
+        self._sums = None
+
+    def add(self, num_realizations, mean, std_dev):
+        rel_err = _get_relative_error(mean, std_dev)
+        finite = np.isfinite(rel_err) & (rel_err > 0)
+
+        self.num_realizations.append(num_realizations)
+        if finite.any():
+            self.median.append(np.median(rel_err[finite]))
+            self.percentile_90.append(np.percentile(rel_err[finite], 90))
+        else:
+            self.median.append(np.nan)
+            self.percentile_90.append(np.nan)
+
+        if self._sums is None:
+            self._sums = {
+                key: np.zeros(rel_err.shape) for key in ["n", "x", "y", "xx", "xy"]
+            }
+        x = math.log(num_realizations)
+        y = np.log(rel_err, where=finite, out=np.zeros(rel_err.shape))
+        self._sums["n"] += finite
+        self._sums["x"] += finite * x
+        self._sums["y"] += y
+        self._sums["xx"] += finite * x**2
+        self._sums["xy"] += y * x
+
+    def get_gradient(self):
+        sums = self._sums
+        denominator = sums["n"] * sums["xx"] - sums["x"] ** 2
+        numerator = sums["n"] * sums["xy"] - sums["x"] * sums["y"]
+        # voxels with fewer than two finite values have no gradient
+        valid = (sums["n"] >= 2) & (denominator > 0)
+        gradient = np.divide(
+            numerator,
+            denominator,
+            out=np.full(denominator.shape, np.nan),
+            where=valid,
+        )
+        return np.ma.masked_invalid(gradient)
+
+
+def _update_limits(vmin, vmax, data, norm):
+    """Widens the vmin and vmax limits to include the data that the norm
+    would show, which excludes non positive values for log norms."""
+    import matplotlib.colors
+
+    data = np.ma.masked_invalid(data)
+    if isinstance(norm, matplotlib.colors.LogNorm):
+        data = np.ma.masked_less_equal(data, 0)
+    if data.count() == 0:
+        return vmin, vmax
+    if vmin is None or data.min() < vmin:
+        vmin = data.min()
+    if vmax is None or data.max() > vmax:
+        vmax = data.max()
+    return vmin, vmax
+
+
+def _iter_statepoint_slices(
+    statepoints, tally_id, tally_name, basis, slice_index, score
+):
+    """Yields the mesh, number of realizations and the unnormalised mean and
+    std_dev slices of the tally from each statepoint in turn. Only the rows
+    of the results that are in the slice are read from each file."""
+
+    for (
+        mesh,
+        slice_index,
+        num_realizations,
+        _,
+        indices,
+        sums,
+        sums_sq,
+    ) in _iter_statepoint_results(
+        statepoints, tally_id, tally_name, basis, slice_index, score
+    ):
+        mean, std_dev = _get_mean_and_std_dev(sums, sums_sq, num_realizations)
+        slices = _get_sparse_slices(
+            indices,
+            {"mean": mean, "std_dev": std_dev},
+            mesh.dimension,
+            basis,
+            slice_index,
+        )
+        yield mesh, num_realizations, slices["mean"], slices["std_dev"]
+
+
+def _iter_statepoint_results(
+    statepoints, tally_id, tally_name, basis, slice_index, score
+):
+    """Yields the mesh, slice index, number of realizations, number of
+    particles per batch, the flat mesh indices of the slice and the sum and
+    sum of squares of the results of those voxels from each statepoint in
+    turn."""
+
+    cv.check_value("basis", basis, _BASES)
+    if tally_id is None and tally_name is None:
+        raise ValueError("One of tally_id or tally_name must be specified")
+
+    for statepoint in statepoints:
+        with openmc.StatePoint(statepoint, autolink=False) as sp:
+            tally = sp.get_tally(id=tally_id, name=tally_name)
+            mesh = _get_mesh(tally)
+            _check_regular_mesh(mesh)
+            _check_mesh_dimension(mesh, basis)
+            if slice_index is None:
+                # finds the mid index
+                basis_to_index = {"xy": 2, "xz": 1, "yz": 0}[basis]
+                slice_index = int(mesh.dimension[basis_to_index] / 2)
+
+            indices, sums, sums_sq = _read_tally_slice(
+                statepoint, tally, mesh, basis, slice_index, score
+            )
+            num_particles = sp.n_particles
+
+        yield mesh, slice_index, tally.num_realizations, num_particles, indices, sums, sums_sq
+
+
+def _read_tally_slice(statepoint, tally, mesh, basis, slice_index, score):
+    """Reads the rows of the tally results that are within the slice and
+    returns their flat mesh indices along with their sum and sum_sq."""
+
+    score = _get_score(tally, score)
+    if len(tally.nuclides) != 1:
+        raise ValueError("Only tallies with a single nuclide are supported")
+    column = tally.scores.index(score)
+
+    _check_single_bin_filters(tally.filters)
+
+    indices = _get_slice_mesh_indices(mesh.dimension, basis, slice_index)
+    sums, sums_sq = _read_statepoint_block(
+        statepoint,
+        tally.id,
+        mesh.dimension,
+        _get_slice_index_range(mesh.dimension, basis, slice_index),
+        column,
+    )
+    return indices, sums, sums_sq
+
+
+def _group_tallies_by_mesh(statepoint):
+    """Returns the RegularMesh objects by id, the ids of the plottable tallies
+    on each mesh and the ids of the other tallies with the reason they were
+    skipped."""
+
+    meshes = {}
+    mesh_tallies = {}
+    skipped = []
+    for tally_id, tally in statepoint.tallies.items():
+        mesh_filters = [f for f in tally.filters if isinstance(f, openmc.MeshFilter)]
+        if len(mesh_filters) != 1:
+            continue
+        mesh = mesh_filters[0].mesh
+        if not isinstance(mesh, openmc.RegularMesh):
+            reason = f"{type(mesh).__name__} is not a RegularMesh"
+        elif mesh.n_dimension != 3:
+            reason = f"mesh n_dimension is {mesh.n_dimension} not 3"
+        elif any(f.num_bins > 1 for f in tally.filters if f is not mesh_filters[0]):
+            reason = "other filters have more than one bin"
+        elif len(tally.nuclides) != 1:
+            reason = "more than one nuclide"
+        else:
+            meshes[mesh.id] = mesh
+            mesh_tallies.setdefault(mesh.id, []).append(tally_id)
+            continue
+        skipped.append({"tally_id": tally_id, "reason": reason})
+    return meshes, mesh_tallies, skipped
+
+
+def _plot_statepoint_tally(
+    statepoint_path, tally_id, out_dir, mesh_slices, plot_kwargs
+):
+    """Reads the tally from the statepoint and saves a plot of each score for
+    each basis in mesh_slices, which maps the basis to the slice index and
+    outline image. Runs in the worker processes of plot_all_mesh_tallies."""
+
+    with openmc.StatePoint(statepoint_path, autolink=False) as statepoint:
+        tally = statepoint.get_tally(id=tally_id)
+        mesh = tally.find_filter(filter_type=openmc.MeshFilter).mesh
+        tally_name = tally.name or f"Tally {tally_id}"
+        axis_units = plot_kwargs["axis_units"]
+
+        files = []
+        for basis, (slice_index, image_value) in mesh_slices.items():
+            score_slices = _get_tally_score_slices(
+                mesh, basis, tally, plot_kwargs["value"], tally.scores, slice_index
+            )
+            for score, data in score_slices.items():
+                start = time.perf_counter()
+                data = _normalize_data(
+                    data,
+                    mesh,
+                    plot_kwargs["volume_normalization"],
+                    plot_kwargs["scaling_factor"],
+                    basis,
+                    slice_index,
+                )
+
+                fig, axis = _get_figure(use_pyplot=False)
+                xlabel, ylabel = _get_axis_labels(basis, axis_units)
+                # each plot gets its own copy so a norm is not shared
+                im = axis.imshow(
+                    data,
+                    extent=_get_extent(mesh, basis, axis_units),
+                    **copy.deepcopy(plot_kwargs["imshow_kwargs"]),
+                )
+                axis.set_title(f"{tally_name} {score}")
+                axis.set_xlabel(xlabel)
+                axis.set_ylabel(ylabel)
+                if plot_kwargs["colorbar"]:
+                    fig.colorbar(im, ax=axis, **plot_kwargs["colorbar_kwargs"])
+                if image_value is not None:
+                    _plot_outline(
+                        axis,
+                        image_value,
+                        _get_extent(mesh, basis, axis_units),
+                        plot_kwargs["outline_kwargs"],
+                    )
+
+                safe_score = re.sub(r"[^\w.-]+", "_", score)
+                path = Path(out_dir) / f"tally_{tally_id}_{safe_score}_{basis}.png"
+                fig.savefig(path, **plot_kwargs["savefig_kwargs"])
+
+                files.append(
+                    {
+                        "path": path,
+                        "tally_id": tally_id,
+                        "tally_name": tally.name,
+                        "mesh_id": mesh.id,
+                        "score": score,
+                        "basis": basis,
+                        "slice_index": slice_index,
+                        "seconds": time.perf_counter() - start,
+                    }
+                )
+    return files
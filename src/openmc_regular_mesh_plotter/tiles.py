@@ -0,0 +1,448 @@
+import copy
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import threading
+import typing
+import warnings
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import openmc.checkvalue as cv
+
+from .core import (
+    _BASES,
+    _check_regular_mesh,
+    _get_mesh,
+    _get_outline_images,
+    _get_outline_plot,
+    get_mesh_tally_slice,
+)
+from .render import (
+    _get_colormap,
+    _get_colormap_lut,
+    _get_edges,
+    _get_lut_indices,
+    _resample_nearest,
+)
+
+__all__ = ["MeshTallyTiles", "serve_mesh_tally_tiles"]
+
+
+class MeshTallyTiles:
+    """A multi-resolution pyramid of colored PNG tiles of a slice of a mesh
+    tally, for zoomable viewing, that are rendered on demand and kept in an
+    on-disk cache.
+
+    The deepest level has one pixel per mesh voxel and each level above it
+    averages blocks of 2 by 2 pixels of the level below, until the whole
+    slice fits in a single tile at level 0. Tiles are addressed by level,
+    column and row, with row 0 at the top, as in the z/x/y scheme of web map
+    viewers. Every level is colored with the same norm, found from the full
+    resolution slice, and the outline of each tile is rasterised by OpenMC
+    over the window of the tile alone.
+
+    Tiles are stored under a directory of the cache named by a hash of the
+    slice data and rendering settings, so a changed tally never serves stale
+    tiles. When the tiles of the pyramid grow beyond max_cache_bytes its
+    least recently used tiles are deleted, leaving the tiles of other
+    pyramids sharing the cache directory alone. The slice is read from the
+    statepoint of the tally, when its results have not been loaded, without
+    loading the rest of the mesh.
+    Parameters
+    ----------
+    tally : openmc.Tally
+        The openmc tally to tile. Tally must contain a MeshFilter that uses a RegularMesh.
+    cache_dir : str or pathlib.Path
+        The directory the tiles are cached in
+    basis : {'xy', 'xz', 'yz'}
+        The basis directions for the slice
+    slice_index : int
+        The mesh index to tile
+    score : str
+        Score to tile, e.g. 'flux'
+    value : str
+        A string for the type of value to return  - 'mean' (default),
+        'std_dev', 'rel_err', 'sum', or 'sum_sq' are accepted
+    cmap : str or matplotlib.colors.Colormap
+        The colormap used to color the tally values
+    norm : matplotlib.colors.Normalize
+        The normalization used to map the tally values to the colormap.
+        Defaults to a linear scale between the minimum and maximum values.
+    outline : True
+        If set then an outline will be added to the tiles. The outline can
+        be by cell or by material.
+    outline_by : {'cell', 'material'}
+        Indicate whether the outline should be by cell or by material
+    geometry : openmc.Geometry
+        The geometry to use for the outline.
+    outline_color : tuple of ints
+        The RGBA color of the outline with values from 0 to 255
+    tile_size : int
+        The number of pixels along each side of a tile
+    max_cache_bytes : int
+        The largest total size of the tiles of this pyramid kept in the cache
+    volume_normalization : bool, optional
+        Whether or not to normalize the data by the volume of the mesh elements.
+    scaling_factor : float
+        A optional multiplier to apply to the tally data prior to rendering.
+    compress_level : int
+        The zlib compression level from 0 to 9 used for the PNG tiles.
+    """
+
+    def __init__(
+        self,
+        tally: typing.Union["openmc.Tally", typing.Sequence["openmc.Tally"]],
+        cache_dir: typing.Union[str, Path],
+        basis: str = "xy",
+        slice_index: typing.Optional[int] = None,
+        score: typing.Optional[str] = None,
+        value: str = "mean",
+        cmap: typing.Union[str, "matplotlib.colors.Colormap"] = "viridis",
+        norm: typing.Optional["matplotlib.colors.Normalize"] = None,
+        outline: bool = False,
+        outline_by: str = "cell",
+        geometry: typing.Optional["openmc.Geometry"] = None,
+        outline_color: typing.Sequence[int] = (0, 0, 0, 255),
+        tile_size: int = 256,
+        max_cache_bytes: int = 2**30,
+        volume_normalization: bool = True,
+        scaling_factor: typing.Optional[float] = None,
+        compress_level: int = 1,
+    ):
+        import matplotlib.colors
+
+        cv.check_value("basis", basis, _BASES)
+        cv.check_type("outline", outline, bool)
+        cv.check_value("outline_by", outline_by, ["cell", "material"])
+        cv.check_length("outline_color", outline_color, 4, 4)
+        cv.check_type("tile_size", tile_size, int)
+        cv.check_greater_than("tile_size", tile_size, 0)
+        cv.check_greater_than("max_cache_bytes", max_cache_bytes, 0)
+
+        self.mesh = _get_mesh(tally)
+        _check_regular_mesh(self.mesh)
+        self.basis = basis
+        self.outline = outline and geometry is not None
+        self.outline_by = outline_by
+        self.geometry = geometry
+        self.outline_color = tuple(outline_color)
+        self.tile_size = tile_size
+        self.max_cache_bytes = max_cache_bytes
+        self.compress_level = compress_level
+
+        data, self.extent = get_mesh_tally_slice(
+            tally,
+            basis=basis,
+            slice_index=slice_index,
+            score=score,
+            value=value,
+            volume_normalization=volume_normalization,
+            scaling_factor=scaling_factor,
+        )
+        if slice_index is None:
+            basis_to_index = {"xy": 2, "xz": 1, "yz": 0}[basis]
+            slice_index = int(self.mesh.dimension[basis_to_index] / 2)
+        self.slice_index = slice_index
+
+        self.cmap = _get_colormap(cmap) if isinstance(cmap, str) else cmap
+        if norm is None:
+            norm = matplotlib.colors.Normalize()
+        elif not norm.scaled():
+            # as in render_mesh_tally_image the caller's norm is not changed
+            norm = copy.deepcopy(norm)
+        self.norm = norm
+        self.norm.autoscale_None(np.ma.masked_invalid(data))
+        self._lut = _get_colormap_lut(self.cmap)
+
+        # the levels are held from the coarsest, level 0, to the full slice
+        self.num_levels = 1 + max(0, math.ceil(math.log2(max(data.shape) / tile_size)))
+        self._levels = [np.ascontiguousarray(data, dtype=float)]
+        for _ in range(self.num_levels - 1):
+            self._levels.insert(0, _block_reduce(self._levels[0]))
+
+        key = hashlib.sha1(self._levels[-1].tobytes())
+        key.update(
+            repr(
+                (
+                    self.mesh.dimension,
+                    self.mesh.lower_left,
+                    self.mesh.upper_right,
+                    basis,
+                    slice_index,
+                    self.cmap.name,
+                    self.norm.vmin,
+                    self.norm.vmax,
+                    type(self.norm).__name__,
+                    self.outline,
+                    outline_by,
+                    self.outline_color,
+                    tile_size,
+                    compress_level,
+                )
+            ).encode()
+        )
+        self.cache_dir = Path(cache_dir)
+        self.directory = self.cache_dir / key.hexdigest()
+
+        # tile paths and sizes from the least to the most recently used, of
+        # this pyramid only so pyramids sharing the cache do not evict each other
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        cached = [
+            (path.stat().st_mtime, path, path.stat().st_size)
+            for path in self.directory.glob("*/*/*.png")
+        ]
+        for _, path, size in sorted(cached):
+            self._cache[path] = size
+        self._cache_bytes = sum(self._cache.values())
+
+    def get_num_tiles(self, level: int) -> typing.Tuple[int, int]:
+        """Returns the number of (columns, rows) of tiles in the level."""
+        _check_tile_index("level", level, self.num_levels)
+        rows, columns = self._levels[level].shape
+        return math.ceil(columns / self.tile_size), math.ceil(rows / self.tile_size)
+
+    def get_tile(self, level: int, column: int, row: int) -> bytes:
+        """Returns the PNG bytes of a tile, read from the cache or rendered
+        and stored in the cache. Tiles at the edges of the slice are padded
+        with transparent pixels to the full tile size."""
+        num_columns, num_rows = self.get_num_tiles(level)
+        _check_tile_index("column", column, num_columns)
+        _check_tile_index("row", row, num_rows)
+
+        path = self._get_tile_path(level, column, row)
+        with self._lock:
+            if path in self._cache:
+                try:
+                    # the modification time orders the tiles when reopened
+                    os.utime(path)
+                    png = path.read_bytes()
+                except FileNotFoundError:
+                    # the file was removed from the cache directory by
+                    # something else, so the tile is rendered again
+                    self._cache_bytes -= self._cache.pop(path)
+                else:
+                    self._cache.move_to_end(path)
+                    return png
+
+        image_value = None
+        if self.outline:
+            plot = self._get_tile_outline_plot(level, column, row)
+            image_value = _get_outline_images(self.geometry, [plot])[0]
+        return self._store_tile(
+            path, self._render_tile(level, column, row, image_value)
+        )
+
+    def build(self, levels: typing.Optional[typing.Sequence[int]] = None) -> int:
+        """Renders every tile of the levels, all levels by default, that is
+        not already in the cache. The outlines of the tiles of each level are
+        rasterised in a single OpenMC geometry plotting run.
+
+        Returns
+        -------
+        int
+            The number of tiles rendered
+        """
+        if levels is None:
+            levels = range(self.num_levels)
+
+        num_rendered = 0
+        for level in levels:
+            num_columns, num_rows = self.get_num_tiles(level)
+            tiles = [
+                (column, row)
+                for column in range(num_columns)
+                for row in range(num_rows)
+                if self._get_tile_path(level, column, row) not in self._cache
+            ]
+            if not tiles:
+                continue
+            image_values = [None] * len(tiles)
+            if self.outline:
+                plots = [
+                    self._get_tile_outline_plot(level, column, row)
+                    for column, row in tiles
+                ]
+                image_values = _get_outline_images(self.geometry, plots)
+            for (column, row), image_value in zip(tiles, image_values):
+                self._store_tile(
+                    self._get_tile_path(level, column, row),
+                    self._render_tile(level, column, row, image_value),
+                )
+            num_rendered += len(tiles)
+        return num_rendered
+
+    def get_metadata(self) -> dict:
+        """Returns the description of the pyramid needed by a tile viewer."""
+        return {
+            "basis": self.basis,
+            "slice_index": self.slice_index,
+            "extent": list(self.extent),
+            "shape": list(self._levels[-1].shape),
+            "tile_size": self.tile_size,
+            "num_levels": self.num_levels,
+            "num_tiles": [
+                self.get_num_tiles(level) for level in range(self.num_levels)
+            ],
+            "vmin": float(self.norm.vmin),
+            "vmax": float(self.norm.vmax),
+        }
+
+    def _get_tile_path(self, level, column, row):
+        return self.directory / str(level) / str(column) / f"{row}.png"
+
+    def _get_tile_window(self, level, column, row):
+        """Returns the rows and columns of the tile within its level and the
+        window of full resolution mesh indices it covers."""
+        rows, columns = self._levels[level].shape
+        row_range = (row * self.tile_size, min((row + 1) * self.tile_size, rows))
+        column_range = (
+            column * self.tile_size,
+            min((column + 1) * self.tile_size, columns),
+        )
+
+        factor = 2 ** (self.num_levels - 1 - level)
+        full_rows, full_columns = self._levels[-1].shape
+        horizontal = (
+            column_range[0] * factor,
+            min(column_range[1] * factor, full_columns),
+        )
+        # the top row of the slice is the largest vertical index
+        vertical = (
+            full_rows - min(row_range[1] * factor, full_rows),
+            full_rows - row_range[0] * factor,
+        )
+        return row_range, column_range, [horizontal, vertical]
+
+    def _get_tile_outline_plot(self, level, column, row):
+        row_range, column_range, window = self._get_tile_window(level, column, row)
+        shape = (row_range[1] - row_range[0], column_range[1] - column_range[0])
+        plot = _get_outline_plot(
+            self.mesh,
+            self.basis,
+            self.slice_index,
+            shape[0] * shape[1],
+            self.outline_by,
+            window,
+        )
+        # one outline pixel for each pixel of the tile
+        plot.pixels = (shape[1], shape[0])
+        return plot
+
+    def _render_tile(self, level, column, row, image_value=None):
+        from PIL import Image
+
+        row_range, column_range, _ = self._get_tile_window(level, column, row)
+        data = self._levels[level][slice(*row_range), slice(*column_range)]
+
+        rgba = np.zeros((self.tile_size, self.tile_size, 4), dtype=np.uint8)
+        tile = rgba[: data.shape[0], : data.shape[1]]
+        tile[...] = self._lut[_get_lut_indices(self.norm(data), self.cmap.N)]
+        if image_value is not None:
+            tile[_resample_nearest(_get_edges(image_value), data.shape)] = (
+                self.outline_color
+            )
+
+        buffer = io.BytesIO()
+        Image.fromarray(rgba).save(
+            buffer, format="PNG", compress_level=self.compress_level
+        )
+        return buffer.getvalue()
+
+    def _store_tile(self, path, png):
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(png)
+            self._cache_bytes += len(png) - self._cache.pop(path, 0)
+            self._cache[path] = len(png)
+            while self._cache_bytes > self.max_cache_bytes and len(self._cache) > 1:
+                oldest, size = self._cache.popitem(last=False)
+                oldest.unlink(missing_ok=True)
+                self._cache_bytes -= size
+        return png
+
+
+def _check_tile_index(name, index, number):
+    cv.check_greater_than(name, index, 0, equality=True)
+    cv.check_less_than(name, index, number, equality=False)
+
+
+def _block_reduce(data):
+    """Averages blocks of 2 by 2 values, ignoring NaN values, with the blocks
+    at odd sized edges averaging the values present."""
+    rows, columns = data.shape
+    padded = np.full((rows + rows % 2, columns + columns % 2), np.nan)
+    padded[:rows, :columns] = data
+    blocks = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2)
+    with warnings.catch_warnings():
+        # blocks of only NaN values stay NaN
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.nanmean(blocks, axis=(1, 3))
+
+
+def serve_mesh_tally_tiles(
+    tiles: MeshTallyTiles,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+) -> "http.server.ThreadingHTTPServer":
+    """Makes a local HTTP server for the tiles of a MeshTallyTiles pyramid.
+
+    Tiles are served at "/<level>/<column>/<row>.png" and the metadata of
+    the pyramid at "/metadata.json". Each request is handled in its own
+    thread and tiles missing from the cache are rendered on request.
+
+    .. code-block:: python
+
+        tiles = MeshTallyTiles(tally, cache_dir="tiles", basis="xz")
+        server = serve_mesh_tally_tiles(tiles, port=8000)
+        server.serve_forever()
+
+    Parameters
+    ----------
+    tiles : MeshTallyTiles
+        The tile pyramid to serve
+    host : str
+        The address the server listens on
+    port : int
+        The port the server listens on, 0 picks a free port
+    Returns
+    -------
+    http.server.ThreadingHTTPServer
+        The server, which is not yet serving requests
+    """
+    import http.server
+
+    cv.check_type("tiles", tiles, MeshTallyTiles)
+
+    class TileRequestHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metadata.json":
+                return self._send(
+                    json.dumps(tiles.get_metadata()).encode(), "application/json"
+                )
+            match = re.fullmatch(r"/(\d+)/(\d+)/(\d+)\.png", self.path)
+            if match is None:
+                return self.send_error(404)
+            try:
+                png = tiles.get_tile(*(int(number) for number in match.groups()))
+            except ValueError:
+                return self.send_error(404)
+            return self._send(png, "image/png")
+
+        def _send(self, body, content_type):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return http.server.ThreadingHTTPServer((host, port), TileRequestHandler)
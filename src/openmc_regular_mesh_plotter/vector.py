@@ -0,0 +1,376 @@
+import numpy as np
+import openmc
+
+from .core import (
+    _AXIS_SCALING_FACTORS,
+    _BASIS_AXES,
+    _get_voxel_edges,
+    _get_window_extent,
+)
+
+
+def _plot_vector_outline(
+    axes,
+    geometry,
+    mesh,
+    basis,
+    slice_index,
+    outline_by,
+    window,
+    axis_units,
+    outline_kwargs,
+    num_points=256,
+):
+    """Draws the outline of the cells or materials where the slice plane cuts
+    the geometry as vector paths. The intersection of each surface with the
+    plane is found analytically as a conic, sampled with num_points points
+    and only the parts that separate different cells or materials are drawn.
+
+    Returns the LineCollection, or None if the geometry has surfaces that are
+    not quadrics or nested universes, in which case nothing is drawn."""
+    from matplotlib.collections import LineCollection
+
+    cells = list(geometry.root_universe.cells.values())
+    if not all(
+        cell.fill is None or isinstance(cell.fill, openmc.Material) for cell in cells
+    ):
+        return None
+
+    surfaces = geometry.get_all_surfaces()
+    quadrics = {}
+    for surface_id, surface in surfaces.items():
+        quadric = _get_quadric(surface)
+        if quadric is None:
+            return None
+        quadrics[surface_id] = quadric
+
+    horizontal_axis, vertical_axis = _BASIS_AXES[basis]
+    normal_axis = ({0, 1, 2} - {horizontal_axis, vertical_axis}).pop()
+    edges = _get_voxel_edges(mesh, normal_axis)
+    # the plane is through the middle of the mesh voxels, as for the raster
+    plane_position = (edges[slice_index] + edges[slice_index + 1]) / 2
+
+    if window is None:
+        bounds = mesh.bounding_box.extent[basis]
+    else:
+        bounds = _get_window_extent(mesh, basis, window)
+    offset = 1e-6 * np.hypot(bounds[1] - bounds[0], bounds[3] - bounds[2])
+
+    def to_3d(points):
+        points_3d = np.empty((len(points), 3))
+        points_3d[:, horizontal_axis] = points[:, 0]
+        points_3d[:, vertical_axis] = points[:, 1]
+        points_3d[:, normal_axis] = plane_position
+        return points_3d
+
+    def classify(points):
+        try:
+            return _get_region_ids(to_3d(points), cells, quadrics, outline_by)
+        except _UnsupportedRegion:
+            return None
+
+    conics = [
+        _get_conic(quadric, horizontal_axis, vertical_axis, plane_position)
+        for quadric in quadrics.values()
+    ]
+    paths = []
+    for conic in conics:
+        # every other point is the middle of a segment and lies on the conic
+        for points in _sample_conic(conic, bounds, 2 * num_points - 1, conics):
+            curve, midpoints = points[::2], points[1::2]
+            if len(midpoints) == len(curve):
+                curve, midpoints = points[:-1:2], points[1:-1:2]
+            normals = _get_conic_gradient(conic, midpoints)
+            lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+            normals = np.divide(
+                normals, lengths, out=np.zeros_like(normals), where=lengths > 0
+            )
+            ids_before = classify(midpoints - offset * normals)
+            ids_after = classify(midpoints + offset * normals)
+            if ids_before is None or ids_after is None:
+                return None
+            # consecutive visible segments are joined into a single path
+            visible = ids_before != ids_after
+            changes = np.flatnonzero(np.diff(visible.astype(int))) + 1
+            for start, stop in zip(
+                np.concatenate([[0], changes]),
+                np.concatenate([changes, [len(visible)]]),
+            ):
+                if visible[start]:
+                    paths.append(curve[start : stop + 1])
+
+    axis_scaling_factor = _AXIS_SCALING_FACTORS[axis_units]
+    lines = LineCollection(
+        [path * axis_scaling_factor for path in paths], **outline_kwargs
+    )
+    axes.add_collection(lines)
+    return lines
+
+
+class _UnsupportedRegion(Exception):
+    pass
+
+
+def _get_quadric(surface):
+    """Returns the symmetric matrix, linear and constant terms of the surface
+    written as x.A.x + g.x + k = 0, or None if it is not a quadric. The terms
+    are found from the public Surface.evaluate at a few points, which has the
+    same sign as the halfspaces of the surface, and are checked against it at
+    other points so that surfaces such as tori are rejected."""
+
+    def evaluate(point):
+        return float(surface.evaluate(point))
+
+    try:
+        constant = evaluate((0.0, 0.0, 0.0))
+        matrix, linear = np.zeros((3, 3)), np.zeros(3)
+        for i, unit in enumerate(np.identity(3)):
+            plus, minus = evaluate(unit), evaluate(-unit)
+            matrix[i, i] = (plus + minus) / 2 - constant
+            linear[i] = (plus - minus) / 2
+        for i, j in [(0, 1), (0, 2), (1, 2)]:
+            point = np.identity(3)[i] + np.identity(3)[j]
+            diagonal = matrix[i, i] + matrix[j, j] + linear[i] + linear[j]
+            matrix[i, j] = matrix[j, i] = (evaluate(point) - diagonal - constant) / 2
+        check_points = np.array([[0.5, -0.3, 0.7], [-1.9, 2.3, -0.4]])
+        expected = np.array([evaluate(point) for point in check_points])
+    except (AttributeError, NotImplementedError):
+        return None
+
+    quadric = matrix, linear, constant
+    scale = max(np.abs(matrix).max(), np.abs(linear).max(), abs(constant), 1.0)
+    if not np.allclose(
+        _evaluate_quadric(quadric, check_points), expected, rtol=0, atol=1e-9 * scale
+    ):
+        return None
+    return quadric
+
+
+def _evaluate_quadric(quadric, points):
+    matrix, linear, constant = quadric
+    return np.einsum("ij,jk,ik->i", points, matrix, points) + points @ linear + constant
+
+
+def _get_region_ids(points, cells, quadrics, outline_by):
+    """Finds the id of the cell, or material, containing each point. Points
+    outside all of the cells are -1 and void cells have a material id of 0."""
+
+    values = {
+        surface_id: _evaluate_quadric(quadric, points)
+        for surface_id, quadric in quadrics.items()
+    }
+    ids = np.full(len(points), -1)
+    unassigned = np.ones(len(points), dtype=bool)
+    for cell in cells:
+        if cell.region is None:
+            inside = np.ones(len(points), dtype=bool)
+        else:
+            inside = _evaluate_region(cell.region, values)
+        if outline_by == "cell":
+            region_id = cell.id
+        else:
+            region_id = 0 if cell.fill is None else cell.fill.id
+        ids[inside & unassigned] = region_id
+        unassigned &= ~inside
+    return ids
+
+
+def _evaluate_region(region, values):
+    if isinstance(region, openmc.Halfspace):
+        if region.side == "+":
+            return values[region.surface.id] > 0
+        return values[region.surface.id] < 0
+    if isinstance(region, openmc.Intersection):
+        return np.logical_and.reduce([_evaluate_region(r, values) for r in region])
+    if isinstance(region, openmc.Union):
+        return np.logical_or.reduce([_evaluate_region(r, values) for r in region])
+    if isinstance(region, openmc.Complement):
+        return ~_evaluate_region(region.node, values)
+    raise _UnsupportedRegion(f"regions of type {type(region)} are not supported")
+
+
+def _get_conic(quadric, horizontal_axis, vertical_axis, plane_position):
+    """Cuts the quadric with the plane and returns the coefficients of the
+    conic a u^2 + b u v + c v^2 + d u + e v + f = 0 in the plane."""
+
+    matrix, linear, constant = quadric
+    normal_axis = ({0, 1, 2} - {horizontal_axis, vertical_axis}).pop()
+    h, v, n = horizontal_axis, vertical_axis, normal_axis
+    return (
+        matrix[h, h],
+        2 * matrix[h, v],
+        matrix[v, v],
+        linear[h] + 2 * matrix[h, n] * plane_position,
+        linear[v] + 2 * matrix[v, n] * plane_position,
+        matrix[n, n] * plane_position**2 + linear[n] * plane_position + constant,
+    )
+
+
+def _get_conic_gradient(conic, points):
+    a, b, c, d, e, _ = conic
+    u, v = points[:, 0], points[:, 1]
+    return np.stack([2 * a * u + b * v + d, b * u + 2 * c * v + e], axis=1)
+
+
+def _sample_conic(conic, bounds, num_points, other_conics=()):
+    """Returns a list of (N, 2) arrays of points along the conic, limited to
+    the parts of the conic within the (umin, umax, vmin, vmax) bounds. Every
+    other point is the middle of a segment. Straight lines are clipped
+    exactly to the bounds and split where they cross the other conics."""
+
+    a, b, c, d, e, f = conic
+    u0, u1, v0, v1 = bounds
+    corners = np.array([[u0, v0], [u1, v0], [u0, v1], [u1, v1]], dtype=float)
+    tolerance = 1e-12 * max(abs(a), abs(b), abs(c), abs(d), abs(e), 1.0)
+
+    # lines are found as a point and direction in the rotated coordinates
+    curves, lines = [], []
+    rotation = np.identity(2)
+
+    if max(abs(a), abs(b), abs(c)) <= tolerance:
+        # a straight line from a plane
+        if max(abs(d), abs(e)) <= tolerance:
+            return []
+        point = -f * np.array([d, e]) / (d**2 + e**2)
+        lines.append((point, np.array([-e, d])))
+    else:
+        eigenvalues, rotation = np.linalg.eigh(np.array([[a, b / 2], [b / 2, c]]))
+        # in the rotated (p, q) coordinates the conic has no cross term
+        dp, eq = rotation.T @ np.array([d, e])
+        zero = np.abs(eigenvalues) <= 1e-12 * np.abs(eigenvalues).max()
+        rotated_corners = corners @ rotation
+
+        if zero.any():
+            # a parabola or parallel lines, ordered so the p term is quadratic
+            if zero[0]:
+                eigenvalues = eigenvalues[::-1]
+                rotation = rotation[:, ::-1]
+                dp, eq = eq, dp
+                rotated_corners = rotated_corners[:, ::-1]
+            lp = eigenvalues[0]
+            if abs(eq) <= tolerance:
+                discriminant = dp**2 - 4 * lp * f
+                if discriminant < 0:
+                    return []
+                for root in {
+                    (-dp + np.sqrt(discriminant)) / (2 * lp),
+                    (-dp - np.sqrt(discriminant)) / (2 * lp),
+                }:
+                    lines.append((np.array([root, 0.0]), np.array([0.0, 1.0])))
+            else:
+                p_range = rotated_corners[:, 0].min(), rotated_corners[:, 0].max()
+                p = np.linspace(*p_range, num_points)
+                curves.append(np.stack([p, -(lp * p**2 + dp * p + f) / eq], axis=1))
+        else:
+            lp, lq = eigenvalues
+            p0, q0 = -dp / (2 * lp), -eq / (2 * lq)
+            g = lp * p0**2 + lq * q0**2 - f
+            radius = np.linalg.norm(rotated_corners - [p0, q0], axis=1).max()
+            if lp * lq > 0:
+                # an ellipse
+                if g / lp <= 0:
+                    return []
+                t = np.linspace(0, 2 * np.pi, num_points)
+                curves.append(
+                    np.stack(
+                        [
+                            p0 + np.sqrt(g / lp) * np.cos(t),
+                            q0 + np.sqrt(g / lq) * np.sin(t),
+                        ],
+                        axis=1,
+                    )
+                )
+            elif abs(g) <= tolerance:
+                # a pair of crossing lines
+                slope = np.sqrt(-lp / lq)
+                for sign in [1, -1]:
+                    lines.append((np.array([p0, q0]), np.array([1.0, sign * slope])))
+            else:
+                # a hyperbola with a branch either side of its center
+                if g / lp > 0:
+                    semi_axis, other_semi_axis = np.sqrt(g / lp), np.sqrt(-g / lq)
+                else:
+                    semi_axis, other_semi_axis = np.sqrt(g / lq), np.sqrt(-g / lp)
+                t_max = np.arcsinh(radius / other_semi_axis)
+                t = np.linspace(-t_max, t_max, num_points)
+                for sign in [1, -1]:
+                    along = sign * semi_axis * np.cosh(t)
+                    across = other_semi_axis * np.sinh(t)
+                    if g / lp > 0:
+                        curves.append(np.stack([p0 + along, q0 + across], axis=1))
+                    else:
+                        curves.append(np.stack([p0 + across, q0 + along], axis=1))
+
+    curves = _clip_curves([curve @ rotation.T for curve in curves], bounds)
+    for point, direction in lines:
+        line = _sample_line(
+            rotation @ point,
+            rotation @ direction,
+            bounds,
+            (num_points + 1) // 2,
+            other_conics,
+        )
+        if line is not None:
+            curves.append(line)
+    return curves
+
+
+def _sample_line(point, direction, bounds, num_points, other_conics):
+    """Samples the part of the line within the bounds with the points where
+    it crosses the other conics added, followed by the middle of each
+    segment, so that changes of cell along the line are exact."""
+
+    direction = direction / np.linalg.norm(direction)
+    s_min, s_max = -np.inf, np.inf
+    for axis, (lower, upper) in enumerate([bounds[0:2], bounds[2:4]]):
+        if abs(direction[axis]) < 1e-15:
+            if not lower <= point[axis] <= upper:
+                return None
+            continue
+        s_lower = (lower - point[axis]) / direction[axis]
+        s_upper = (upper - point[axis]) / direction[axis]
+        s_min = max(s_min, min(s_lower, s_upper))
+        s_max = min(s_max, max(s_lower, s_upper))
+    if s_min >= s_max:
+        return None
+
+    s = [np.linspace(s_min, s_max, num_points)]
+    for a, b, c, d, e, f in other_conics:
+        # the conic along the line is a quadratic in s
+        (px, py), (dx, dy) = point, direction
+        quadratic = a * dx**2 + b * dx * dy + c * dy**2
+        linear = 2 * a * px * dx + b * (px * dy + py * dx) + 2 * c * py * dy
+        linear += d * dx + e * dy
+        constant = a * px**2 + b * px * py + c * py**2 + d * px + e * py + f
+        s.append(np.roots([quadratic, linear, constant]))
+    s = np.concatenate(s)
+    s = np.unique(
+        s.real[(np.abs(s.imag) < 1e-12) & (s.real >= s_min) & (s.real <= s_max)]
+    )
+
+    points = np.empty((2 * len(s) - 1, 2))
+    points[0::2] = point + s[:, np.newaxis] * direction
+    points[1::2] = (points[0:-1:2] + points[2::2]) / 2
+    return points
+
+
+def _clip_curves(curves, bounds):
+    """Splits the curves into the runs of points within the bounds."""
+
+    u0, u1, v0, v1 = bounds
+    tolerance = 1e-9 * max(u1 - u0, v1 - v0)
+    clipped = []
+    for curve in curves:
+        inside = (
+            (curve[:, 0] >= u0 - tolerance)
+            & (curve[:, 0] <= u1 + tolerance)
+            & (curve[:, 1] >= v0 - tolerance)
+            & (curve[:, 1] <= v1 + tolerance)
+        )
+        changes = np.flatnonzero(np.diff(inside.astype(int))) + 1
+        for start, stop in zip(
+            np.concatenate([[0], changes]), np.concatenate([changes, [len(inside)]])
+        ):
+            if inside[start] and stop - start > 2:
+                clipped.append(curve[start:stop])
+    return clipped
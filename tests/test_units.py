@@ -1,6 +1,47 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import io
+import json
+import subprocess
+import sys
+import threading
+import types
+import urllib.request
+
+import h5py
+import numpy as np
 import openmc
-from matplotlib.colors import LogNorm
-from openmc_regular_mesh_plotter import plot_mesh_tally
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.colors import LogNorm, Normalize
+from openmc_regular_mesh_plotter import (
+    MeshTallyTiles,
+    aplot_mesh_tallies,
+    aplot_mesh_tally,
+    browse_mesh_tally,
+    export_mesh_tally,
+    get_mesh_tally_histogram,
+    get_mesh_tally_slice,
+    plot_all_mesh_tallies,
+    plot_mesh_tally,
+    plot_mesh_tally_comparison,
+    plot_mesh_tally_convergence,
+    plot_mesh_tally_ensemble,
+    plot_mesh_tally_histogram,
+    plot_mesh_tally_live,
+    plot_mesh_tally_orthoslices,
+    plot_mesh_tally_scores,
+    render_mesh_tally_image,
+    save_mesh_tally_convergence_frames,
+    serve_mesh_tally_tiles,
+)
+from openmc_regular_mesh_plotter import core, export, interactive, sparse
+from openmc_regular_mesh_plotter.core import (
+    _get_outline_images,
+    _get_outline_pixels,
+    _get_outline_plot,
+)
+from openmc_regular_mesh_plotter.render import _get_edges
 import pytest
 
 
@@ -241,4 +282,1410 @@ def test_plot_with_energy_filters(model):
     plot_mesh_tally(tally=tally_result_1)
 
 
-# todo catch errors when 2d mesh used and 1d axis selected for plotting'
+def test_plot_with_rel_err_threshold(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    tallies = openmc.Tallies([mesh_tally])
+
+    model.tallies = tallies
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    plot = plot_mesh_tally(tally=tally_result, basis="xz")
+    unmasked_data = plot.images[0].get_array()
+
+    # a very large threshold only masks the voxels without any score
+    plot = plot_mesh_tally(tally=tally_result, basis="xz", rel_err_threshold=1e9)
+    masked_data = plot.images[0].get_array()
+    assert masked_data.shape == unmasked_data.shape
+    mask = np.ma.getmaskarray(masked_data)
+    assert mask.sum() == np.count_nonzero(unmasked_data == 0)
+    assert np.allclose(masked_data.compressed(), unmasked_data[~mask])
+
+    plot = plot_mesh_tally(
+        tally=tally_result,
+        basis="xz",
+        rel_err_threshold=0.1,
+        rel_err_style="hatch",
+    )
+    assert not np.ma.is_masked(plot.images[0].get_array())
+
+    # the boundaries of the hatching are on the voxel edges of the image
+    plot = plot_mesh_tally(
+        tally=tally_result,
+        basis="xz",
+        rel_err_threshold=1e-9,
+        rel_err_style="hatch",
+    )
+    vertices = np.concatenate(
+        [path.vertices for path in plot.collections[0].get_paths()]
+    )
+    x_edges = np.linspace(mesh.lower_left[0], mesh.upper_right[0], 11)
+    z_edges = np.linspace(mesh.lower_left[2], mesh.upper_right[2], 31)
+    x_distances = np.abs(vertices[:, 0, np.newaxis] - x_edges).min(axis=1)
+    z_distances = np.abs(vertices[:, 1, np.newaxis] - z_edges).min(axis=1)
+    assert np.all(np.minimum(x_distances, z_distances) < 1e-3)
+    assert np.isclose(vertices[:, 0].min(), x_edges[0])
+    assert np.isclose(vertices[:, 0].max(), x_edges[-1])
+
+    with pytest.raises(ValueError):
+        plot_mesh_tally(tally=tally_result, rel_err_threshold=-1)
+
+
+def test_plot_mesh_tally_orthoslices(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    tallies = openmc.Tallies([mesh_tally])
+
+    model.tallies = tallies
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    plots = plot_mesh_tally_orthoslices(
+        tally=tally_result,
+        point=(-25.0, 25.0, 25.0),
+        outline=True,
+        geometry=geometry,
+    )
+    assert len(plots) == 3
+    assert plots[0].xaxis.get_label().get_text() == "x [cm]"
+    assert plots[0].yaxis.get_label().get_text() == "y [cm]"
+    assert plots[1].xaxis.get_label().get_text() == "x [cm]"
+    assert plots[1].yaxis.get_label().get_text() == "z [cm]"
+    assert plots[2].xaxis.get_label().get_text() == "y [cm]"
+    assert plots[2].yaxis.get_label().get_text() == "z [cm]"
+    assert plots[2].get_xlim() == (-200.0, 250.0)
+    assert plots[2].get_ylim() == (-300.0, 350.0)
+
+    # all three slices share the same color scale
+    norms = [plot.images[0].norm for plot in plots]
+    assert norms[0] is norms[1] is norms[2]
+
+    # the slices match those plotted individually through the same voxel
+    plot = plot_mesh_tally(tally=tally_result, basis="xz", slice_index=10)
+    assert np.allclose(plot.images[0].get_array(), plots[1].images[0].get_array())
+
+    with pytest.raises(ValueError):
+        plot_mesh_tally_orthoslices(tally=tally_result, point=(0, 0, 1000))
+
+
+def test_browse_mesh_tally(model, monkeypatch):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    tallies = openmc.Tallies([mesh_tally])
+
+    model.tallies = tallies
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    browser = browse_mesh_tally(
+        tally=tally_result,
+        outline=True,
+        geometry=geometry,
+        outlines_per_run=8,
+    )
+    assert browser.basis == "xy"
+    assert browser.slice_index == 15
+    image = browser.axes.images[0]
+
+    browser.set_slice_index(29)
+    plot = plot_mesh_tally(tally=tally_result, basis="xy", slice_index=29)
+    assert np.allclose(image.get_array(), plot.images[0].get_array())
+
+    browser.set_basis("yz")
+    assert browser.slice_index == 5
+    assert browser.axes.images[0] is image
+    assert browser.axes.xaxis.get_label().get_text() == "y [cm]"
+    assert browser.axes.yaxis.get_label().get_text() == "z [cm]"
+    assert list(image.get_extent()) == [-200.0, 250.0, -300.0, 350.0]
+
+    browser.set_slice_index(3)
+    plot = plot_mesh_tally(tally=tally_result, basis="yz", slice_index=3)
+    assert np.allclose(image.get_array(), plot.images[0].get_array())
+
+    with pytest.raises(ValueError):
+        browser.set_slice_index(10)
+
+    # an outline whose background batch failed is rasterised when drawn
+    browser._executor.shutdown(wait=True)
+    failed = Future()
+    failed.set_exception(RuntimeError("plotting failed"))
+    browser._outlines.pop(("yz", 7))
+    browser._pending[("yz", 7)] = failed
+    browser.set_slice_index(7)
+    assert ("yz", 7) in browser._outlines
+
+    # a failed batch is no longer pending
+    def fail(geometry, plots):
+        raise RuntimeError("plotting failed")
+
+    monkeypatch.setattr(interactive, "_get_outline_images", fail)
+    browser._pending[("yz", 8)] = failed
+    with pytest.raises(RuntimeError):
+        browser._rasterise("yz", [8], [None])
+    assert ("yz", 8) not in browser._pending
+
+    browser.close()
+
+
+def test_export_mesh_tally(model, tmp_path, monkeypatch):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    tallies = openmc.Tallies([mesh_tally])
+
+    model.tallies = tallies
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    path = export_mesh_tally(
+        tally=tally_result, path=tmp_path / "slices.h5", axis_units="m"
+    )
+
+    with h5py.File(path, "r") as f:
+        assert f.attrs["score"] == "flux"
+        assert f.attrs["mesh_id"] == mesh.id
+        assert f.attrs["axis_units"] == "m"
+        for basis, shape in [("xy", (30, 20, 10)), ("xz", (20, 30, 10))]:
+            for value in ["mean", "std_dev"]:
+                dataset = f[basis][value]
+                assert dataset.shape == shape
+                assert dataset.chunks == (1,) + shape[1:]
+        dataset = f["yz"]["std_dev"]
+        assert dataset.shape == (10, 30, 20)
+        assert list(dataset.attrs["extent"]) == [-2.0, 2.5, -3.0, 3.5]
+
+        plot = plot_mesh_tally(
+            tally=tally_result, basis="yz", slice_index=3, value="std_dev"
+        )
+        assert np.allclose(plot.images[0].get_array(), dataset[3])
+        full_slices = f["xz"]["mean"][()]
+
+    # reading a few slices at a time writes the same datasets
+    monkeypatch.setattr(export, "_CHUNK_VOXELS", 700)
+    path = export_mesh_tally(
+        tally=tally_result, path=tmp_path / "chunked.h5", axis_units="m"
+    )
+    with h5py.File(path, "r") as f:
+        assert np.array_equal(f["xz"]["mean"][()], full_slices)
+
+
+def test_plot_with_auto_pixels(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    tallies = openmc.Tallies([mesh_tally])
+
+    model.tallies = tallies
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    plot = plot_mesh_tally(
+        tally=tally_result,
+        basis="xz",
+        outline=True,
+        geometry=geometry,
+        pixels="auto",
+    )
+    assert plot.xaxis.get_label().get_text() == "x [cm]"
+
+    # the outline pixels follow the size of the axes on screen
+    small_pixels = _get_outline_pixels(plot, "auto", max_pixels=10**9)
+    plot.figure.set_dpi(plot.figure.get_dpi() * 2)
+    large_pixels = _get_outline_pixels(plot, "auto", max_pixels=10**9)
+    assert large_pixels == pytest.approx(4 * small_pixels, rel=0.05)
+    assert _get_outline_pixels(plot, "auto", max_pixels=1000) == 1000
+    assert _get_outline_pixels(plot, 40000, max_pixels=1000) == 40000
+
+
+def test_plot_with_region(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    tallies = openmc.Tallies([mesh_tally])
+
+    model.tallies = tallies
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    plot = plot_mesh_tally(tally=tally_result, basis="xz", slice_index=4)
+    full_data = plot.images[0].get_array()
+
+    plot = plot_mesh_tally(
+        tally=tally_result,
+        basis="xz",
+        slice_index=4,
+        axis_units="m",
+        region=(-0.5, 0.1, 1.0, 2.0),
+        outline=True,
+        geometry=geometry,
+    )
+    assert plot.get_xlim() == (-0.5, 0.1)
+    assert plot.get_ylim() == (1.0, 2.0)
+    # voxels are 15cm wide in x and 650/30cm wide in z
+    assert plot.images[0].get_extent() == pytest.approx([-0.55, 0.2, 0.9, 2.2])
+    # only the voxels covering the region are extracted
+    cropped_data = plot.images[0].get_array()
+    assert cropped_data.shape == (6, 5)
+    assert np.allclose(cropped_data, full_data[6:12, 3:8])
+
+    with pytest.raises(ValueError):
+        plot_mesh_tally(tally=tally_result, basis="xz", region=(100, 200, 0, 10))
+
+
+def test_plot_without_pyplot_in_threads(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    tallies = openmc.Tallies([mesh_tally])
+
+    model.tallies = tallies
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    def render(index):
+        plot = plot_mesh_tally(
+            tally=tally_result,
+            basis=["xy", "xz", "yz"][index % 3],
+            slice_index=index % 10,
+            outline=index % 4 == 0,
+            geometry=geometry,
+            use_pyplot=False,
+        )
+        buffer = io.BytesIO()
+        plot.figure.savefig(buffer, format="png")
+        assert buffer.getvalue().startswith(b"\x89PNG")
+        return plot.images[0].get_array()
+
+    figure_numbers = plt.get_fignums()
+    expected = [render(index) for index in range(32)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(render, range(32)))
+
+    for result, expected_result in zip(results, expected):
+        assert np.array_equal(result, expected_result)
+    # no figures were registered with pyplot
+    assert plt.get_fignums() == figure_numbers
+
+    # colorbars are added to the figure of axes passed in
+    fig, axes = plt.subplots()
+    plot_mesh_tally(tally=tally_result, axes=axes)
+    assert len(fig.axes) == 2
+
+
+def test_render_mesh_tally_image(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    tallies = openmc.Tallies([mesh_tally])
+
+    model.tallies = tallies
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    png = render_mesh_tally_image(
+        tally=tally_result, basis="xz", slice_index=3, scale=4, cmap="viridis"
+    )
+    assert png.startswith(b"\x89PNG")
+    image = plt.imread(io.BytesIO(png))
+    assert image.shape == (30 * 4, 10 * 4, 4)
+
+    # colors match those of the matplotlib colormap
+    plot = plot_mesh_tally(tally=tally_result, basis="xz", slice_index=3)
+    data = plot.images[0].get_array()
+    norm = Normalize(vmin=data.min(), vmax=data.max())
+    expected_color = plt.get_cmap("viridis")(norm(data[5, 7]))
+    assert image[5 * 4 + 1, 7 * 4 + 1] == pytest.approx(expected_color, abs=2 / 255)
+
+    png = render_mesh_tally_image(
+        tally=tally_result,
+        basis="xz",
+        scale=4,
+        outline=True,
+        geometry=geometry,
+        outline_color=(255, 0, 0, 255),
+    )
+    image = plt.imread(io.BytesIO(png))
+    assert ((image == (1.0, 0.0, 0.0, 1.0)).all(axis=-1)).any()
+
+    # an unscaled norm passed in is left unscaled
+    caller_norm = LogNorm()
+    png = render_mesh_tally_image(tally=tally_result, norm=caller_norm)
+    assert png.startswith(b"\x89PNG")
+    assert caller_norm.vmin is None and caller_norm.vmax is None
+
+
+def test_plot_sparse_mesh_tally(model, monkeypatch):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally_1 = openmc.Tally(name="mesh-tal-1")
+    mesh_tally_1.filters = [mesh_filter]
+    mesh_tally_1.scores = ["flux"]
+    mesh_tally_2 = openmc.Tally(name="mesh-tal-2")
+    mesh_tally_2.filters = [mesh_filter]
+    mesh_tally_2.scores = ["heating"]
+    tallies = openmc.Tallies([mesh_tally_1, mesh_tally_2])
+
+    model.tallies = tallies
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result_1 = statepoint.get_tally(name="mesh-tal-1")
+        tally_result_2 = statepoint.get_tally(name="mesh-tal-2")
+
+    # chunks of a few z layers are read from the statepoint, keeping the
+    # results of the tallies unloaded
+    monkeypatch.setattr(sparse, "_CHUNK_VOXELS", 50)
+    for tally in [tally_result_1, [tally_result_1, tally_result_2]]:
+        for basis in ["xy", "xz", "yz"]:
+            for kwargs in [
+                {},
+                {"value": "std_dev"},
+                {"rel_err_threshold": 0.2},
+                {"region": (-50, 10, 0, 100)},
+            ]:
+                dense_plot = plot_mesh_tally(
+                    tally=tally, basis=basis, slice_index=4, **kwargs
+                )
+                sparse_plot = plot_mesh_tally(
+                    tally=tally, basis=basis, slice_index=4, sparse=True, **kwargs
+                )
+                dense_data = dense_plot.images[0].get_array()
+                sparse_data = sparse_plot.images[0].get_array()
+                assert np.array_equal(
+                    np.ma.getmaskarray(dense_data), np.ma.getmaskarray(sparse_data)
+                )
+                assert np.ma.allclose(dense_data, sparse_data)
+                plt.close("all")
+    assert core._get_unread_statepoint(tally_result_1) is not None
+    assert core._get_unread_statepoint(tally_result_2) is not None
+
+    with pytest.raises(ValueError):
+        plot_mesh_tally(tally=tally_result_1, value="rel_err", sparse=True)
+
+
+def test_plot_sparse_mesh_tally_with_cell_filter(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    cells = list(geometry.get_all_cells().values())
+    mesh_tally = openmc.Tally(name="cell-mesh-tal")
+    mesh_tally.filters = [openmc.MeshFilter(mesh), openmc.CellFilter(cells)]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="cell-mesh-tal")
+
+    # the results of the two cell bins would land on the same voxels
+    with pytest.raises(ValueError):
+        plot_mesh_tally(tally=tally_result, sparse=True)
+
+
+def test_aplot_mesh_tallies(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally_1 = openmc.Tally(name="mesh-tal-1")
+    mesh_tally_1.filters = [mesh_filter]
+    mesh_tally_1.scores = ["flux"]
+    mesh_tally_2 = openmc.Tally(name="mesh-tal-2")
+    mesh_tally_2.filters = [mesh_filter]
+    mesh_tally_2.scores = ["heating"]
+    tallies = openmc.Tallies([mesh_tally_1, mesh_tally_2])
+
+    model.tallies = tallies
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result_1 = statepoint.get_tally(name="mesh-tal-1")
+        tally_result_2 = statepoint.get_tally(name="mesh-tal-2")
+
+    figure_numbers = plt.get_fignums()
+    plots = asyncio.run(
+        aplot_mesh_tallies(
+            [tally_result_1, tally_result_2, tally_result_1],
+            max_concurrent=2,
+            basis="xz",
+            axis_units="m",
+            outline=True,
+            geometry=geometry,
+        )
+    )
+    assert len(plots) == 3
+    assert plt.get_fignums() == figure_numbers
+    for plot, tally in zip(plots, [tally_result_1, tally_result_2, tally_result_1]):
+        assert plot.xaxis.get_label().get_text() == "x [m]"
+        assert plot.yaxis.get_label().get_text() == "z [m]"
+        expected = plot_mesh_tally(tally=tally, basis="xz", axis_units="m")
+        assert np.array_equal(
+            plot.images[0].get_array(), expected.images[0].get_array()
+        )
+        # the outline contour has been added
+        assert len(plot.collections) > 0
+
+    plot = asyncio.run(
+        aplot_mesh_tally(
+            tally_result_1,
+            basis="yz",
+            outline=True,
+            geometry=geometry,
+            pixels="auto",
+            region=(-100, 100, -100, 100),
+        )
+    )
+    assert plot.get_xlim() == (-100.0, 100.0)
+
+    index_range = ((2, 8), (5, 15), (10, 20))
+    for basis in ["xy", "xz", "yz"]:
+        plot = asyncio.run(
+            aplot_mesh_tally(
+                tally_result_1,
+                basis=basis,
+                outline=True,
+                geometry=geometry,
+                index_range=index_range,
+            )
+        )
+        expected = plot_mesh_tally(
+            tally=tally_result_1, basis=basis, index_range=index_range
+        )
+        assert np.array_equal(
+            plot.images[0].get_array(), expected.images[0].get_array()
+        )
+        # the outline covers the block rather than the whole mesh
+        x_min, x_max, y_min, y_max = plot.images[0].get_extent()
+        vertices = np.concatenate(
+            [path.vertices for path in plot.collections[-1].get_paths()]
+        )
+        assert vertices[:, 0].min() >= x_min and vertices[:, 0].max() <= x_max
+        assert vertices[:, 1].min() >= y_min and vertices[:, 1].max() <= y_max
+        plt.close("all")
+
+    with pytest.raises(ValueError):
+        asyncio.run(
+            aplot_mesh_tally(
+                tally_result_1, basis="xy", slice_index=25, index_range=index_range
+            )
+        )
+
+
+def test_plot_mesh_tally_convergence(model, tmp_path):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    statepoints = []
+    for batches in [2, 4, 8]:
+        model.settings.batches = batches
+        statepoints.append(model.run(cwd=tmp_path / f"batches_{batches}"))
+
+    plots = plot_mesh_tally_convergence(
+        statepoints, tally_name="mesh-tal", basis="xz", norm=LogNorm()
+    )
+    # one plot per statepoint then the trend map and trend plot
+    assert len(plots) == 5
+    assert plots[0].get_title() == "2 realizations"
+    assert plots[2].get_title() == "8 realizations"
+    # all the statepoints share the same color scale
+    assert plots[0].images[0].norm is plots[2].images[0].norm
+    assert len(plots[4].lines) == 2
+
+    with openmc.StatePoint(statepoints[-1]) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+    expected = plot_mesh_tally(tally=tally_result, basis="xz")
+    assert np.allclose(plots[2].images[0].get_array(), expected.images[0].get_array())
+
+    frames = save_mesh_tally_convergence_frames(
+        statepoints, tmp_path / "frames", tally_name="mesh-tal", basis="yz"
+    )
+    assert len(frames) == 3
+    assert all(frame.is_file() for frame in frames)
+
+    with pytest.raises(ValueError):
+        plot_mesh_tally_convergence(statepoints)
+
+
+def test_plot_rectilinear_mesh_tally(model):
+    geometry = model.geometry
+
+    mesh = openmc.RectilinearMesh()
+    mesh.x_grid = [-100, -80, -50, -20, 0, 10, 20, 50]
+    mesh.y_grid = np.linspace(-200, 250, 13)
+    mesh.z_grid = np.geomspace(1, 651, 10) - 301
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    volumes = (
+        np.diff(mesh.x_grid)[:, None, None]
+        * np.diff(mesh.y_grid)[None, :, None]
+        * np.diff(mesh.z_grid)[None, None, :]
+    )
+    mean = tally_result.get_reshaped_data(value="mean", expand_dims=True).squeeze()
+    mean = mean.reshape(mesh.dimension, order="F") / volumes
+
+    plot = plot_mesh_tally(tally=tally_result, basis="xz", slice_index=5)
+    quad_mesh = plot.collections[0]
+    assert plot.get_xlim() == (-100.0, 50.0)
+    assert plot.get_ylim() == (-300.0, 350.0)
+    # pcolormesh rows start at the bottom of the plot
+    assert np.allclose(quad_mesh.get_array().reshape(9, 7), mean[:, 5, :].T)
+
+    plot = plot_mesh_tally(
+        tally=tally_result, basis="yz", outline=True, geometry=geometry
+    )
+    assert len(plot.collections) == 2
+
+    with pytest.raises(NotImplementedError):
+        render_mesh_tally_image(tally=tally_result)
+
+
+def test_plot_all_mesh_tallies(model, tmp_path):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally_1 = openmc.Tally(name="mesh-tal-1")
+    mesh_tally_1.filters = [mesh_filter]
+    mesh_tally_1.scores = ["flux", "heating"]
+    mesh_tally_2 = openmc.Tally(name="mesh-tal-2")
+    mesh_tally_2.filters = [mesh_filter, openmc.EnergyFilter([0, 1e6, 20e6])]
+    mesh_tally_2.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally_1, mesh_tally_2])
+
+    sp_filename = model.run(cwd=tmp_path)
+
+    manifest = plot_all_mesh_tallies(
+        sp_filename, tmp_path / "images", bases=("xy", "yz"), workers=2, outline=True
+    )
+    # the tally with two energy bins is skipped
+    assert len(manifest["files"]) == 4
+    assert [skipped["tally_id"] for skipped in manifest["skipped"]] == [mesh_tally_2.id]
+    assert all(file["path"].is_file() for file in manifest["files"])
+    assert {(file["score"], file["basis"]) for file in manifest["files"]} == {
+        ("flux", "xy"),
+        ("flux", "yz"),
+        ("heating", "xy"),
+        ("heating", "yz"),
+    }
+    assert manifest["total_seconds"] >= manifest["outline_seconds"]
+
+
+def test_plot_mesh_tally_ensemble(model, tmp_path):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    statepoints = []
+    for seed in [1, 2, 3]:
+        model.settings.seed = seed
+        statepoints.append(model.run(cwd=tmp_path / f"seed_{seed}"))
+
+    sums, sums_sq = 0, 0
+    for statepoint in statepoints:
+        with openmc.StatePoint(statepoint) as sp:
+            tally_result = sp.get_tally(name="mesh-tal")
+            sums = sums + tally_result.sum
+            sums_sq = sums_sq + tally_result.sum_sq
+    num_realizations = 3 * model.settings.batches
+    mean = (sums / num_realizations).reshape(mesh.dimension, order="F")
+
+    plot = plot_mesh_tally_ensemble(
+        statepoints, tally_name="mesh-tal", basis="xy", slice_index=4
+    )
+    assert plot.get_title() == f"3 runs, {num_realizations} realizations"
+    expected = np.rot90(mean[:, :, 4]) / np.prod(mesh.width)
+    assert np.allclose(plot.images[0].get_array(), expected)
+
+    for weighting in ["realizations", "particles"]:
+        plot = plot_mesh_tally_ensemble(
+            statepoints,
+            tally_name="mesh-tal",
+            basis="yz",
+            value="std_dev",
+            weighting=weighting,
+        )
+        assert (plot.images[0].get_array() >= 0).all()
+
+    with pytest.raises(ValueError):
+        plot_mesh_tally_ensemble(statepoints, tally_name="mesh-tal", value="sum")
+
+
+def test_mesh_tally_histogram(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    edges, histograms, volumes = get_mesh_tally_histogram(
+        tally_result, bins=20, chunk_size=7
+    )
+    # each chunk was read from the statepoint without loading all the results
+    assert core._get_unread_statepoint(tally_result) is not None
+
+    voxel_volume = np.prod(mesh.width)
+    values = tally_result.mean.ravel() / voxel_volume
+    expected, expected_edges = np.histogram(
+        values, bins=20, weights=np.full(values.shape, voxel_volume)
+    )
+    assert np.allclose(edges, expected_edges)
+    assert np.allclose(histograms["all"], expected)
+    assert np.isclose(volumes["all"], voxel_volume * values.size)
+
+    # a derived tally only has the mean and std_dev of its results
+    derived_edges, histograms, volumes = get_mesh_tally_histogram(
+        tally_result * 2.0, bins=20
+    )
+    assert np.allclose(derived_edges, 2.0 * expected_edges)
+    assert np.allclose(histograms["all"], expected)
+
+    # the whole mesh is filled with the one material
+    material_id = model.materials[0].id
+    edges, histograms, volumes = get_mesh_tally_histogram(
+        tally_result, bins=edges, by_material=True, geometry=geometry
+    )
+    assert list(histograms) == [material_id]
+    assert np.allclose(histograms[material_id], expected)
+
+    plot = plot_mesh_tally_histogram(
+        tally_result, by_material=True, geometry=geometry, log_bins=True
+    )
+    assert plot.get_xscale() == "log"
+    assert len(plot.patches) == 1
+
+    with pytest.raises(ValueError):
+        get_mesh_tally_histogram(tally_result, by_material=True)
+
+
+def test_plot_with_index_range(model, tmp_path):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    index_range = ((2, 7), (5, 15), (10, 25))
+    # the slice defaults to the middle of the index_range
+    full_plot = plot_mesh_tally(tally=tally_result, basis="xz", slice_index=10)
+    plot = plot_mesh_tally(
+        tally=tally_result,
+        basis="xz",
+        index_range=index_range,
+        outline=True,
+        geometry=geometry,
+    )
+    # the rows of the image start at the top of the plot
+    full_data = full_plot.images[0].get_array()
+    assert np.array_equal(plot.images[0].get_array(), full_data[30 - 25 : 30 - 10, 2:7])
+    assert plot.images[0].get_extent() == pytest.approx(
+        [-70.0, 5.0, -83.33, 241.67], abs=0.01
+    )
+
+    path = export_mesh_tally(
+        tally_result, tmp_path / "block.h5", bases=["yz"], index_range=index_range
+    )
+    with h5py.File(path, "r") as f:
+        assert f["yz/mean"].shape == (5, 15, 10)
+
+    with pytest.raises(ValueError):
+        plot_mesh_tally(tally=tally_result, index_range=index_range, slice_index=2)
+
+
+def test_plot_with_value_contours(model, tmp_path):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    plot = plot_mesh_tally(
+        tally=tally_result,
+        basis="xz",
+        value_contours=3,
+        norm=LogNorm(),
+        value_contours_path=tmp_path / "contours.npz",
+    )
+    norm = plot.images[0].norm
+    levels = np.geomspace(norm.vmin, norm.vmax, 5)[1:-1]
+
+    contours = np.load(tmp_path / "contours.npz")
+    assert np.allclose(contours["levels"], levels)
+    for name in contours.files:
+        if name != "levels":
+            # the lines are within the extent of the plot
+            line = contours[name]
+            assert line.shape[1] == 2
+            assert (line[:, 0] >= -100).all() and (line[:, 0] <= 50).all()
+            assert (line[:, 1] >= -300).all() and (line[:, 1] <= 350).all()
+
+    plot = plot_mesh_tally(tally=tally_result, basis="xy", value_contours=[1e-3])
+
+
+def test_get_mesh_tally_slice(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    for basis in ["xy", "xz", "yz"]:
+        for value in ["mean", "std_dev"]:
+            data, extent = get_mesh_tally_slice(
+                tally_result, basis=basis, value=value, scaling_factor=10.0
+            )
+            plot = plot_mesh_tally(
+                tally=tally_result, basis=basis, value=value, scaling_factor=10.0
+            )
+            assert np.array_equal(data, plot.images[0].get_array())
+            assert extent == list(plot.images[0].get_extent())
+            plt.close("all")
+
+    data, extent = get_mesh_tally_slice(
+        tally_result, basis="yz", index_range=((0, 10), (5, 15), (0, 30))
+    )
+    assert data.shape == (30, 10)
+    # the y voxels are 22.5 cm wide, starting at -200 cm
+    assert extent == [-87.5, 137.5, -300.0, 350.0]
+
+
+def test_plot_with_underlay(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    for underlay in ["material", "cell"]:
+        plot = plot_mesh_tally(
+            tally=tally_result,
+            basis="xy",
+            outline=True,
+            geometry=geometry,
+            underlay=underlay,
+            underlay_kwargs={"alpha": 0.5, "zorder": -1},
+        )
+        assert len(plot.images) == 2
+        underlay_image = plot.images[1]
+        assert underlay_image.get_array().shape[-1] == 4
+        assert underlay_image.get_zorder() == -1
+        assert underlay_image.get_extent() == plot.images[0].get_extent()
+        assert underlay_image.get_interpolation() == "nearest"
+        plt.close("all")
+
+    # the defaults of the underlay can be overridden
+    plot = plot_mesh_tally(
+        tally=tally_result,
+        geometry=geometry,
+        underlay="material",
+        underlay_kwargs={"interpolation": "bilinear", "aspect": "auto"},
+    )
+    assert plot.images[1].get_interpolation() == "bilinear"
+    assert plot.get_aspect() == "auto"
+    plt.close("all")
+
+    with pytest.raises(ValueError):
+        plot_mesh_tally(tally=tally_result, underlay="material")
+
+
+def test_mesh_tally_tiles(model, tmp_path):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    tiles = MeshTallyTiles(
+        tally_result,
+        tmp_path,
+        basis="xz",
+        tile_size=8,
+        outline=True,
+        geometry=geometry,
+    )
+    # the 10 by 30 slice needs 8, 15 and 30 rows of pixels
+    assert tiles.num_levels == 3
+    assert tiles.get_num_tiles(0) == (1, 1)
+    assert tiles.get_num_tiles(2) == (2, 4)
+
+    assert tiles.build() == 1 + 2 + 8
+    assert tiles.build() == 0
+    assert len(list(tmp_path.rglob("*.png"))) == 11
+
+    png = tiles.get_tile(2, 1, 3)
+    assert png.startswith(b"\x89PNG")
+    with pytest.raises(ValueError):
+        tiles.get_tile(2, 2, 0)
+
+    # a tile removed from the cache directory is rendered again
+    tile_path = tiles._get_tile_path(2, 1, 3)
+    tile_path.unlink()
+    assert tiles.get_tile(2, 1, 3) == png
+    assert tile_path.exists()
+
+    # tiles compressed at another level are cached apart
+    other_tiles = MeshTallyTiles(
+        tally_result,
+        tmp_path,
+        basis="xz",
+        tile_size=8,
+        outline=True,
+        geometry=geometry,
+        compress_level=9,
+    )
+    assert other_tiles.directory != tiles.directory
+
+    server = serve_mesh_tally_tiles(tiles, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{url}/2/1/3.png") as response:
+            assert response.read() == png
+        with urllib.request.urlopen(f"{url}/metadata.json") as response:
+            assert json.loads(response.read())["num_levels"] == 3
+    finally:
+        server.shutdown()
+
+    small_cache = tmp_path / "small"
+    tiles = MeshTallyTiles(
+        tally_result, small_cache, basis="xz", tile_size=4, max_cache_bytes=2000
+    )
+    tiles.build()
+    assert sum(path.stat().st_size for path in small_cache.rglob("*.png")) <= 2000
+    # the slice was read from the statepoint without loading the whole mesh
+    assert core._get_unread_statepoint(tally_result) is not None
+
+    # a second pyramid in the same cache only evicts its own tiles
+    xz_tiles = set(small_cache.rglob("*.png"))
+    tiles = MeshTallyTiles(
+        tally_result, small_cache, basis="xy", tile_size=4, max_cache_bytes=2000
+    )
+    tiles.build()
+    assert xz_tiles <= set(small_cache.rglob("*.png"))
+    xy_tiles = set(tiles.directory.rglob("*.png"))
+    assert xy_tiles.isdisjoint(xz_tiles)
+    assert sum(path.stat().st_size for path in xy_tiles) <= 2000
+
+
+def test_plot_with_vector_outline(model, monkeypatch):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    raster_runs = []
+    monkeypatch.setattr(
+        core,
+        "_get_outline_images",
+        lambda *args: raster_runs.append(args) or _get_outline_images(*args),
+    )
+
+    for basis, slice_index in [("xy", 15), ("xz", 10), ("yz", 5)]:
+        plot = plot_mesh_tally(
+            tally=tally_result,
+            basis=basis,
+            slice_index=slice_index,
+            outline=True,
+            geometry=geometry,
+            outline_method="vector",
+        )
+        lines = [c for c in plot.collections if isinstance(c, LineCollection)]
+        assert len(lines) == 1
+        assert raster_runs == []
+        points = np.concatenate(lines[0].get_segments())
+
+        # the vector outline follows the edges of the raster outline
+        outline_plot = _get_outline_plot(mesh, basis, slice_index, 40000, "cell")
+        image_value = _get_outline_images(geometry, [outline_plot])[0]
+        x_min, x_max, y_min, y_max = plot.images[0].get_extent()
+        pixel_width = (x_max - x_min) / image_value.shape[1]
+        pixel_height = (y_max - y_min) / image_value.shape[0]
+        rows, columns = np.nonzero(_get_edges(image_value))
+        edge_points = np.column_stack(
+            [
+                x_min + (columns + 0.5) * pixel_width,
+                y_max - (rows + 0.5) * pixel_height,
+            ]
+        )
+        tolerance = 2 * max(pixel_width, pixel_height)
+        # the raster has no edges along the outside of the image
+        inside = (
+            (points[:, 0] > x_min + tolerance)
+            & (points[:, 0] < x_max - tolerance)
+            & (points[:, 1] > y_min + tolerance)
+            & (points[:, 1] < y_max - tolerance)
+        )
+        assert inside.any()
+        distances = np.linalg.norm(
+            points[inside, np.newaxis] - edge_points[np.newaxis], axis=2
+        )
+        assert distances.min(axis=1).max() < tolerance
+        plt.close("all")
+
+    # tori are not quadrics so the raster outline is used instead
+    torus_cell = openmc.Cell(region=-openmc.ZTorus(a=10, b=2, c=2))
+    torus_geometry = openmc.Geometry([torus_cell])
+    plot = plot_mesh_tally(
+        tally=tally_result,
+        outline=True,
+        geometry=torus_geometry,
+        outline_method="vector",
+    )
+    assert not any(isinstance(c, LineCollection) for c in plot.collections)
+    assert len(raster_runs) == 1
+
+
+def test_tally_block_read_from_statepoint(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    cells = list(geometry.get_all_cells().values())
+    cell_tally = openmc.Tally(name="cell-mesh-tal")
+    cell_tally.filters = [openmc.CellFilter(cells), mesh_filter]
+    cell_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally, cell_tally])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        unread_tally = statepoint.get_tally(name="mesh-tal")
+        cell_tally_result = statepoint.get_tally(name="cell-mesh-tal")
+    with openmc.StatePoint(sp_filename) as statepoint:
+        loaded_tally = statepoint.get_tally(name="mesh-tal")
+        loaded_tally.sum
+
+    index_range = ((2, 7), (5, 15), (10, 20))
+    for basis in ["xy", "xz", "yz"]:
+        for value in ["mean", "std_dev"]:
+            data, extent = get_mesh_tally_slice(
+                unread_tally, basis=basis, value=value, index_range=index_range
+            )
+            # only the rows of the block were read from the statepoint
+            assert core._get_unread_statepoint(unread_tally) is not None
+            loaded_data, loaded_extent = get_mesh_tally_slice(
+                loaded_tally, basis=basis, value=value, index_range=index_range
+            )
+            assert np.allclose(data, loaded_data)
+            assert extent == loaded_extent
+
+    # the public results are used when the private attributes are unexpected
+    with openmc.StatePoint(sp_filename) as statepoint:
+        odd_tally = statepoint.get_tally(name="mesh-tal")
+    odd_tally._results_read = None
+    assert core._get_unread_statepoint(odd_tally) is None
+    data, extent = get_mesh_tally_slice(odd_tally, index_range=index_range)
+    loaded_data, loaded_extent = get_mesh_tally_slice(
+        loaded_tally, index_range=index_range
+    )
+    assert np.allclose(data, loaded_data)
+
+    # the results of the cell bins can not be combined in the mesh voxels
+    with pytest.raises(ValueError):
+        get_mesh_tally_slice(cell_tally_result)
+
+
+def test_plot_mesh_tally_comparison(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+
+    mesh_tally_1 = openmc.Tally(name="mesh-tal-1")
+    mesh_tally_1.filters = [mesh_filter]
+    mesh_tally_1.scores = ["flux"]
+
+    mesh_tally_2 = openmc.Tally(name="mesh-tal-2")
+    mesh_tally_2.filters = [mesh_filter]
+    mesh_tally_2.scores = ["heating"]
+
+    model.tallies = openmc.Tallies([mesh_tally_1, mesh_tally_2])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result_1 = statepoint.get_tally(name="mesh-tal-1")
+        tally_result_2 = statepoint.get_tally(name="mesh-tal-2")
+
+    def get_image(**kwargs):
+        plot = plot_mesh_tally(basis="xz", use_pyplot=False, **kwargs)
+        return plot.images[0].get_array().filled(np.nan)
+
+    mean_1 = get_image(tally=tally_result_1)
+    mean_2 = get_image(tally=tally_result_2)
+    std_dev_1 = get_image(tally=tally_result_1, value="std_dev")
+    std_dev_2 = get_image(tally=tally_result_2, value="std_dev")
+
+    def get_comparison(mode, **kwargs):
+        plot = plot_mesh_tally_comparison(
+            tally_result_1,
+            tally_result_2,
+            mode=mode,
+            basis="xz",
+            use_pyplot=False,
+            **kwargs,
+        )
+        return plot.images[0].get_array()
+
+    diff = get_comparison("diff")
+    assert np.allclose(diff, mean_1 - mean_2)
+    diff_std_dev = get_comparison("diff", value="std_dev")
+    assert np.allclose(diff_std_dev, np.sqrt(std_dev_1**2 + std_dev_2**2))
+
+    # ratios are masked where the second tally is zero
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected_ratio = np.ma.masked_invalid(mean_1 / mean_2)
+    ratio = get_comparison("ratio")
+    assert np.array_equal(np.ma.getmaskarray(ratio), np.ma.getmaskarray(expected_ratio))
+    assert np.ma.allclose(ratio, expected_ratio)
+    rel_diff = get_comparison("rel_diff")
+    assert np.ma.allclose(rel_diff, expected_ratio - 1)
+
+    # a tally compared with itself is a ratio of one wherever it is non zero
+    plot = plot_mesh_tally_comparison(
+        tally_result_1, tally_result_1, mode="ratio", basis="xz", use_pyplot=False
+    )
+    self_ratio = plot.images[0].get_array()
+    assert np.ma.allclose(self_ratio.compressed(), 1)
+
+    index_range = [[2, 8], [5, 15], [10, 20]]
+    diff = get_comparison("diff", index_range=index_range)
+    expected = get_image(tally=tally_result_1, index_range=index_range) - get_image(
+        tally=tally_result_2, index_range=index_range
+    )
+    assert diff.shape == (10, 6)
+    assert np.allclose(diff, expected)
+
+    with pytest.raises(ValueError):
+        plot_mesh_tally_comparison(tally_result_1, tally_result_2, mode="sum")
+
+
+def test_get_mesh_tally_slice_without_matplotlib(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    sp_filename = model.run()
+
+    # a fresh interpreter shows whether slicing the data imports matplotlib
+    script = "\n".join(
+        [
+            "import sys",
+            "import openmc",
+            "import openmc_regular_mesh_plotter as p",
+            f"with openmc.StatePoint({str(sp_filename)!r}) as statepoint:",
+            "    tally = statepoint.get_tally(name='mesh-tal')",
+            "    data, extent = p.get_mesh_tally_slice(tally, basis='xz')",
+            "assert data.shape == (30, 10)",
+            "assert 'matplotlib' not in sys.modules",
+        ]
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+def test_plot_with_mask(model):
+    geometry = model.geometry
+    # the inner box of the geometry becomes a void
+    inner_cell, outer_cell = geometry.get_all_cells().values()
+    inner_cell.fill = None
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    # the middle y slice passes through the void so the voxels with centers
+    # inside the inner box are masked, with the top row of the image at max z
+    x_edges = np.linspace(-100, 50, 11)
+    z_edges = np.linspace(-300, 350, 31)
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    z_centers = (z_edges[:-1] + z_edges[1:]) / 2
+    in_void = ((z_centers > -150) & (z_centers < 175))[::-1, np.newaxis] & (
+        (x_centers > -50) & (x_centers < 25)
+    )
+
+    plot = plot_mesh_tally(
+        tally=tally_result, basis="xz", geometry=geometry, mask="void"
+    )
+    assert np.array_equal(np.ma.getmaskarray(plot.images[0].get_array()), in_void)
+
+    plot = plot_mesh_tally(
+        tally=tally_result,
+        basis="xz",
+        geometry=geometry,
+        mask=[outer_cell.fill.id],
+    )
+    assert np.array_equal(np.ma.getmaskarray(plot.images[0].get_array()), ~in_void)
+
+    # the mesh covers the geometry so no voxel is outside of it
+    plot = plot_mesh_tally(
+        tally=tally_result, basis="xz", geometry=geometry, mask="outside"
+    )
+    assert not np.ma.is_masked(plot.images[0].get_array())
+    plt.close("all")
+
+    with pytest.raises(ValueError):
+        plot_mesh_tally(tally=tally_result, mask="void")
+
+
+def test_plot_mesh_tally_scores(model):
+    geometry = model.geometry
+
+    mesh = openmc.RegularMesh().from_domain(geometry, dimension=[10, 20, 30])
+    mesh_filter = openmc.MeshFilter(mesh)
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [mesh_filter]
+    mesh_tally.scores = ["flux", "heating", "absorption"]
+    model.tallies = openmc.Tallies([mesh_tally])
+
+    sp_filename = model.run()
+    with openmc.StatePoint(sp_filename) as statepoint:
+        tally_result = statepoint.get_tally(name="mesh-tal")
+
+    axes = plot_mesh_tally_scores(tally_result, basis="yz", use_pyplot=False)
+    assert len(axes) == 3
+    # the unused panel of the 2 by 2 grid is hidden
+    assert not axes[0].figure.axes[3].axison
+    for axis, score in zip(axes, tally_result.scores):
+        assert axis.get_title() == score
+        plot = plot_mesh_tally(
+            tally=tally_result, basis="yz", score=score, use_pyplot=False
+        )
+        assert np.allclose(axis.images[0].get_array(), plot.images[0].get_array())
+        assert axis.images[0].get_extent() == plot.images[0].get_extent()
+
+    axes = plot_mesh_tally_scores(
+        tally_result,
+        scores=["heating", "flux"],
+        basis="xy",
+        value="std_dev",
+        shared_norm=True,
+        ncols=2,
+        use_pyplot=False,
+    )
+    norms = [axis.images[0].norm for axis in axes]
+    assert norms[0] is norms[1]
+    all_data = [axis.images[0].get_array() for axis in axes]
+    assert norms[0].vmin == min(data.min() for data in all_data)
+    assert norms[0].vmax == max(data.max() for data in all_data)
+    plot = plot_mesh_tally(
+        tally=tally_result, basis="xy", score="flux", value="std_dev", use_pyplot=False
+    )
+    assert np.allclose(all_data[1], plot.images[0].get_array())
+    plt.close("all")
+
+    with pytest.raises(ValueError):
+        plot_mesh_tally_scores(tally_result, scores=[])
+
+
+def test_plot_mesh_tally_live(monkeypatch):
+    # stands in for openmc.lib with a tally whose results are set by the test
+    class RegularMesh:
+        dimension = (4, 5, 6)
+        lower_left = (0.0, 0.0, 0.0)
+        upper_right = (4.0, 10.0, 12.0)
+
+    class MeshFilter:
+        def __init__(self, mesh):
+            self.mesh = mesh
+            self.n_bins = int(np.prod(mesh.dimension))
+
+    sums = np.arange(1.0, 4 * 5 * 6 + 1)
+    lib_tally = types.SimpleNamespace(
+        id=1,
+        scores=["flux"],
+        nuclides=["total"],
+        filters=[MeshFilter(RegularMesh())],
+        num_realizations=2,
+        results=np.zeros((sums.size, 1, 3)),
+    )
+    lib_tally.results[:, 0, 1] = sums
+    lib_tally.results[:, 0, 2] = sums**2
+    lib = types.SimpleNamespace(
+        MeshFilter=MeshFilter, RegularMesh=RegularMesh, tallies={1: lib_tally}
+    )
+    monkeypatch.setitem(sys.modules, "openmc.lib", lib)
+    monkeypatch.setattr(openmc, "lib", lib, raising=False)
+
+    def get_expected(mean):
+        # the middle z slice of the x fastest bins, divided by the voxel volume
+        return np.rot90(mean.reshape((4, 5, 6), order="F")[:, :, 3], 1) / 4.0
+
+    live = plot_mesh_tally_live(tally_id=1, basis="xy", use_pyplot=False)
+    assert live.image.get_extent() == [0.0, 4.0, 0.0, 10.0]
+    assert np.allclose(live.image.get_array(), get_expected(sums / 2))
+
+    # two more batches are added to the shared results
+    lib_tally.results[:, 0, 1] += 2 * sums
+    lib_tally.num_realizations = 4
+    image = live.update()
+    expected = get_expected(3 * sums / 4)
+    assert image is live.image
+    assert np.allclose(image.get_array(), expected)
+    assert live.axes.get_title() == "4 realizations"
+    # the limits follow the data
+    assert image.norm.vmin == pytest.approx(expected.min())
+    assert image.norm.vmax == pytest.approx(expected.max())
+
+    # a given vmin is kept while vmax follows the data
+    live = plot_mesh_tally_live(tally_id=1, basis="xz", vmin=0, use_pyplot=False)
+    lib_tally.results[:, 0, 1] *= 2
+    live.update()
+    assert live.image.norm.vmin == 0
+    assert live.image.norm.vmax == pytest.approx(live.image.get_array().max())
+    plt.close("all")
+
+    with pytest.raises(ValueError):
+        plot_mesh_tally_live(tally_id=1, score="heating")
+
+
+def test_plot_with_unsupported_mesh():
+    mesh = openmc.CylindricalMesh(r_grid=[0.0, 1.0, 2.0], z_grid=[0.0, 1.0])
+    mesh_tally = openmc.Tally(name="mesh-tal")
+    mesh_tally.filters = [openmc.MeshFilter(mesh)]
+    mesh_tally.scores = ["flux"]
+
+    with pytest.raises(NotImplementedError):
+        plot_mesh_tally(tally=mesh_tally)
+    with pytest.raises(NotImplementedError):
+        get_mesh_tally_slice(mesh_tally)
+    with pytest.raises(NotImplementedError):
+        get_mesh_tally_histogram(mesh_tally)
+
+
+# todo catch errors when 2d mesh used and 1d axis selected for plotting